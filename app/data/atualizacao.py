@@ -0,0 +1,166 @@
+# app/data/atualizacao.py
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from data.dataset import TRAVA_DATASET
+from data.ingestao import (
+    assinatura_ledger,
+    converter_fontes,
+    ingerir,
+    origem_da_versao,
+    versao_fontes,
+    versao_publicada,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AtualizadorBase:
+    """
+    Mantém o dataset em dia com a origem sem bloquear quem está lendo.
+
+    Enquanto uma nova exportação é convertida numa thread de fundo, as sessões
+    continuam recebendo a versão publicada anteriormente (stale-while-revalidate).
+    Ao terminar, a nova versão passa a ser a publicada de uma só vez e
+    `ao_publicar(anterior, publicada)` é chamado (o loader atualiza o cache).
+    Só a primeira carga, sem nenhuma versão publicada, precisa esperar.
+
+    Versões publicadas por outro processo (lotes do serviço de ingestão) são
+    percebidas pela mudança no ledger e também chamam `ao_publicar`.
+    """
+
+    def __init__(self, caminho: str, aba: str, ao_publicar: Optional[Callable[[Optional[str], str], None]] = None):
+        self.caminho = caminho
+        self.aba = aba
+        self.ao_publicar = ao_publicar
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._publicada: Optional[str] = None
+        self._assinatura_ledger = None
+        self._versao_com_erro: Optional[str] = None
+        self._progresso: Dict[str, Any] = {}
+        self.erro: Optional[str] = None
+
+    def verificar(self) -> Optional[str]:
+        """
+        Dispara a atualização em segundo plano se a origem mudou e devolve a
+        versão publicada (None se ainda não há nenhuma), sem esperar.
+        """
+        atual = versao_fontes(self.caminho)
+        self._recarregar_publicada()
+        with self._lock:
+            if atual != origem_da_versao(self._publicada) and atual != self._versao_com_erro:
+                self._iniciar(atual)
+            return self._publicada
+
+    def _recarregar_publicada(self) -> None:
+        """Relê a versão publicada quando o ledger foi regravado fora da thread de atualização."""
+        assinatura = assinatura_ledger(self.caminho)
+        if assinatura == self._assinatura_ledger or self.em_andamento():
+            # A thread de atualização publica a própria versão ao terminar
+            return
+        publicada = versao_publicada(self.caminho)
+        with self._lock:
+            anterior = self._publicada
+            mudou = self._assinatura_ledger is not None and publicada != anterior
+            self._assinatura_ledger = assinatura
+            self._publicada = publicada
+        if mudou and self.ao_publicar:
+            with TRAVA_DATASET:
+                self.ao_publicar(anterior, publicada)
+            logger.info("Versão publicada por outro processo: %s", publicada)
+
+    def versao_disponivel(self) -> str:
+        """Versão que as leituras devem usar agora; sem versão anterior, espera a atualização."""
+        publicada = self.verificar()
+        if publicada is None:
+            with self._lock:
+                thread = self._thread
+            if thread is not None:
+                thread.join()
+            with self._lock:
+                if self._publicada is None:
+                    raise RuntimeError(self.erro or "Base de dados ainda não foi gerada.")
+                publicada = self._publicada
+        return publicada
+
+    def em_andamento(self) -> bool:
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def publicada(self) -> Optional[str]:
+        with self._lock:
+            return self._publicada
+
+    def tentar_novamente(self) -> None:
+        """Permite reprocessar uma versão da origem cuja atualização falhou."""
+        with self._lock:
+            self._versao_com_erro = None
+            self.erro = None
+
+    def progresso(self) -> Dict[str, Any]:
+        """
+        Estado da atualização em curso: fase, arquivo atual, linhas convertidas,
+        total de linhas (se conhecido), tempo decorrido e ETA em segundos.
+        """
+        with self._lock:
+            estado = dict(self._progresso)
+        if not estado:
+            return estado
+        agora = time.monotonic()
+        estado["decorrido_s"] = agora - estado.pop("inicio")
+        decorrido_arquivo = agora - estado.pop("inicio_arquivo")
+        linhas, total = estado["linhas"], estado["linhas_total"]
+        estado["eta_s"] = None
+        if linhas and total and decorrido_arquivo > 0:
+            estado["eta_s"] = max(total - linhas, 0) / (linhas / decorrido_arquivo)
+        return estado
+
+    def _iniciar(self, versao: str) -> None:
+        """Sobe a thread de atualização, se não houver uma rodando (chamar com _lock)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        agora = time.monotonic()
+        self._progresso = {
+            "fase": "convertendo", "versao": versao, "arquivo": None,
+            "linhas": 0, "linhas_total": None, "inicio": agora, "inicio_arquivo": agora,
+        }
+        self._thread = threading.Thread(target=self._executar, args=(versao,), name="atualizador-base", daemon=True)
+        self._thread.start()
+
+    def _registrar(self, arquivo: str, linhas: int, total: Optional[int]) -> None:
+        with self._lock:
+            if self._progresso.get("arquivo") != arquivo:
+                self._progresso["arquivo"] = arquivo
+                self._progresso["inicio_arquivo"] = time.monotonic()
+            self._progresso["linhas"] = linhas
+            self._progresso["linhas_total"] = total
+
+    def _executar(self, versao: str) -> None:
+        inicio = time.perf_counter()
+        try:
+            converter_fontes(self.caminho, aba=self.aba, progresso=self._registrar)
+            with self._lock:
+                self._progresso["fase"] = "gravando"
+            # Publicar dentro da trava: nenhuma leitura vê o dataset novo com a versão antiga
+            with TRAVA_DATASET:
+                ingerir(self.caminho, aba=self.aba)
+                publicada = versao_publicada(self.caminho)
+                with self._lock:
+                    anterior = self._publicada
+                    self._publicada = publicada
+                    self._progresso = {}
+                    self.erro = None
+                if self.ao_publicar:
+                    self.ao_publicar(anterior, publicada)
+            logger.info("Nova versão da base publicada em %.1fs.", time.perf_counter() - inicio)
+        except Exception as e:
+            logger.exception("Falha ao atualizar a base; mantendo a versão anterior.")
+            with self._lock:
+                self._versao_com_erro = versao
+                self._progresso = {}
+                self.erro = str(e)
@@ -0,0 +1,263 @@
+# app/data/banco.py
+
+import os
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from data.dataset import Data, abrir_dataset, aplicar_categorias
+from data.ingestao import meses_publicados
+from data.natureza import carregar_regras, categorias_natureza
+from utils.arquivos import trava_exclusiva
+
+logger = logging.getLogger(__name__)
+
+# Banco SQLite local com a base do dataset (prefixo "_": ignorado pelo pyarrow)
+NOME_BANCO = "_vendas.sqlite"
+TABELA = "vendas"
+# Período, filtros da barra lateral e ANO_MES (sincronização por mês)
+COLUNAS_INDICE = ["EMISSAO", "CLIENTE", "COD.PRD", "VENDEDOR", "NATUREZA", "ANO_MES"]
+# Agregações aceitas em agregar_banco, no vocabulário do pandas
+FUNCOES_AGREGACAO = {
+    "sum": "SUM({})",
+    "mean": "AVG({})",
+    "min": "MIN({})",
+    "max": "MAX({})",
+    "count": "COUNT({})",
+    "nunique": "COUNT(DISTINCT {})",
+}
+
+Filtros = Dict[str, Any]
+
+
+def caminho_banco(diretorio: str) -> str:
+    return os.path.join(diretorio, NOME_BANCO)
+
+
+def _identificador(nome: str) -> str:
+    """Nome de coluna entre aspas (as colunas têm pontos, como VL.BRUTO)."""
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _colunas_tabela(con: sqlite3.Connection) -> List[str]:
+    return [linha[1] for linha in con.execute(f"PRAGMA table_info({TABELA})")]
+
+
+def _tipo_sql(tipo: pa.DataType) -> str:
+    if pa.types.is_integer(tipo):
+        return "INTEGER"
+    if pa.types.is_floating(tipo):
+        return "REAL"
+    if pa.types.is_timestamp(tipo):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def _criar_tabela(con: sqlite3.Connection, schema: pa.Schema) -> None:
+    colunas = ", ".join(f"{_identificador(c.name)} {_tipo_sql(c.type)}" for c in schema)
+    con.execute(f"CREATE TABLE {TABELA} ({colunas})")
+
+
+def _inserir(con: sqlite3.Connection, df: pd.DataFrame) -> None:
+    """Insere as linhas com tipos nativos do Python (datas como texto AAAA-MM-DD HH:MM:SS)."""
+    valores = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            serie = serie.dt.strftime("%Y-%m-%d %H:%M:%S")
+        serie = serie.astype(object)
+        valores[coluna] = serie.where(serie.notna(), None)
+    marcadores = ", ".join("?" * len(df.columns))
+    con.executemany(
+        f"INSERT INTO {TABELA} VALUES ({marcadores})",
+        zip(*(valores[c].tolist() for c in df.columns)),
+    )
+
+
+def sincronizar_banco(diretorio: str) -> str:
+    """
+    Deixa o banco SQLite igual ao dataset particionado, regravando só os meses alterados.
+
+    Os digests por mês do ledger da ingestão são guardados no próprio banco
+    (tabela _meses); meses novos ou com digest diferente são apagados e
+    reinseridos, e meses que saíram do dataset são apagados, numa única
+    transação (leitores veem a versão anterior até o commit). Se as colunas do
+    dataset mudarem, a tabela é recriada. Retorna o caminho do banco.
+    """
+    caminho = caminho_banco(diretorio)
+    publicados = meses_publicados(diretorio)
+    with trava_exclusiva(caminho + ".lock"), closing(sqlite3.connect(caminho, isolation_level=None)) as con:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS _meses (ANO_MES TEXT PRIMARY KEY, DIGEST TEXT)")
+            gravados = dict(con.execute("SELECT ANO_MES, DIGEST FROM _meses").fetchall())
+            if gravados == publicados:
+                con.execute("COMMIT")
+                return caminho
+
+            dataset = abrir_dataset(diretorio)
+            colunas = _colunas_tabela(con)
+            if colunas and colunas != dataset.schema.names:
+                logger.info("Banco: colunas do dataset mudaram; recriando a tabela.")
+                con.execute(f"DROP TABLE {TABELA}")
+                con.execute("DELETE FROM _meses")
+                colunas, gravados = [], {}
+            if not colunas:
+                _criar_tabela(con, dataset.schema)
+
+            alterados = sorted(m for m, digest in publicados.items() if gravados.get(m) != digest)
+            removidos = sorted(set(gravados) - set(publicados))
+            apagar = [m for m in alterados + removidos if m in gravados]
+            if apagar:
+                marcadores = ", ".join("?" * len(apagar))
+                con.execute(f"DELETE FROM {TABELA} WHERE ANO_MES IN ({marcadores})", apagar)
+                con.execute(f"DELETE FROM _meses WHERE ANO_MES IN ({marcadores})", apagar)
+            if alterados:
+                _inserir(con, dataset.to_table(filter=ds.field("ANO_MES").isin(alterados)).to_pandas())
+                con.executemany("INSERT INTO _meses VALUES (?, ?)", [(m, publicados[m]) for m in alterados])
+            for coluna in COLUNAS_INDICE:
+                if coluna in dataset.schema.names:
+                    nome_indice = "idx_" + "".join(c if c.isalnum() else "_" for c in coluna.lower())
+                    con.execute(f"CREATE INDEX IF NOT EXISTS {nome_indice} ON {TABELA} ({_identificador(coluna)})")
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+    logger.info("Banco: %d meses regravados, %d removidos.", len(alterados), len(removidos))
+    return caminho
+
+
+def _condicoes(
+    data_ini: Optional[Data],
+    data_fim: Optional[Data],
+    naturezas: Optional[Iterable[str]],
+    filtros: Optional[Filtros],
+    colunas: List[str],
+) -> Tuple[str, List[Any]]:
+    """Cláusula WHERE para o período, as naturezas e os filtros no formato do Agrupador."""
+    condicoes, parametros = [], []
+    if data_ini is not None:
+        condicoes.append('"EMISSAO" >= ?')
+        parametros.append(str(pd.Timestamp(data_ini)))
+    if data_fim is not None:
+        condicoes.append('"EMISSAO" <= ?')
+        parametros.append(str(pd.Timestamp(data_fim)))
+    if naturezas is not None:
+        naturezas = list(naturezas)
+        condicoes.append(f'"NATUREZA" IN ({", ".join("?" * len(naturezas))})')
+        parametros.extend(naturezas)
+    for coluna, valor in (filtros or {}).items():
+        if valor is None:
+            continue
+        if coluna not in colunas:
+            raise KeyError(coluna)
+        if isinstance(valor, list):
+            condicoes.append(f"{_identificador(coluna)} IN ({', '.join('?' * len(valor))})")
+            parametros.extend(valor)
+        else:
+            condicoes.append(f"{_identificador(coluna)} = ?")
+            parametros.append(valor)
+    where = " WHERE " + " AND ".join(condicoes) if condicoes else ""
+    return where, parametros
+
+
+def _tipar(
+    df: pd.DataFrame,
+    schema: pa.Schema,
+    categorias: Optional[Dict[str, List[str]]],
+    dimensoes: bool = True,
+) -> pd.DataFrame:
+    """Devolve aos resultados do SQLite os tipos da leitura do dataset (datas e, com `dimensoes`, categóricas)."""
+    for campo in schema:
+        if campo.name not in df.columns:
+            continue
+        if pa.types.is_timestamp(campo.type):
+            df[campo.name] = pd.to_datetime(df[campo.name])
+        elif pa.types.is_integer(campo.type) and not df[campo.name].isna().any():
+            df[campo.name] = df[campo.name].astype(campo.type.to_pandas_dtype())
+        elif pa.types.is_floating(campo.type):
+            df[campo.name] = df[campo.name].astype(float)
+    if not dimensoes:
+        return df
+    df = aplicar_categorias(df, categorias)
+    if "NATUREZA" in df.columns:
+        df["NATUREZA"] = pd.Categorical(df["NATUREZA"], categories=categorias_natureza(carregar_regras()))
+    return df
+
+
+def _consultar(diretorio: str, sql: str, parametros: List[Any]) -> pd.DataFrame:
+    uri = "file:" + caminho_banco(diretorio) + "?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as con:
+        return pd.read_sql_query(sql, con, params=parametros)
+
+
+def consultar_banco(
+    diretorio: str,
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    colunas: Optional[List[str]] = None,
+    filtros: Optional[Filtros] = None,
+    categorias: Optional[Dict[str, List[str]]] = None,
+) -> pd.DataFrame:
+    """
+    Lê do banco só as linhas e colunas pedidas (equivalente a ler_particionado).
+
+    O período, as naturezas e os `filtros` (formato do Agrupador: coluna →
+    valor, lista de valores ou None) viram a cláusula WHERE e usam os índices.
+    As linhas saem na mesma ordem da leitura do dataset.
+    """
+    schema = abrir_dataset(diretorio).schema
+    if colunas is None:
+        colunas = schema.names
+    colunas = [c for c in dict.fromkeys(colunas) if c in schema.names]
+    where, parametros = _condicoes(data_ini, data_fim, naturezas, filtros, schema.names)
+    sql = (
+        f"SELECT {', '.join(map(_identificador, colunas))} FROM {TABELA}{where} "
+        f'ORDER BY "ANO_MES", rowid'
+    )
+    return _tipar(_consultar(diretorio, sql, parametros), schema, categorias)
+
+
+def agregar_banco(
+    diretorio: str,
+    por: List[str],
+    medidas: Optional[Dict[str, str]] = None,
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    filtros: Optional[Filtros] = None,
+    categorias: Optional[Dict[str, List[str]]] = None,
+) -> pd.DataFrame:
+    """
+    GROUP BY no banco: uma linha por combinação de `por`, com as `medidas`.
+
+    `medidas` segue o dicionário de DataFrame.agg (coluna → "sum", "mean",
+    "min", "max", "count" ou "nunique"); sem medidas, devolve as combinações
+    distintas. Chaves nulas formam um grupo próprio, como em
+    groupby(dropna=False).
+    """
+    schema = abrir_dataset(diretorio).schema
+    medidas = medidas or {}
+    for coluna in list(por) + list(medidas):
+        if coluna not in schema.names:
+            raise KeyError(coluna)
+    chaves = ", ".join(map(_identificador, por))
+    expressoes = [
+        f"{FUNCOES_AGREGACAO[funcao].format(_identificador(coluna))} AS {_identificador(coluna)}"
+        for coluna, funcao in medidas.items()
+    ]
+    where, parametros = _condicoes(data_ini, data_fim, naturezas, filtros, schema.names)
+    sql = f"SELECT {', '.join([chaves] + expressoes)} FROM {TABELA}{where} GROUP BY {chaves} ORDER BY {chaves}"
+    df = _consultar(diretorio, sql, parametros)
+    chaves = _tipar(df[list(por)].copy(), schema, categorias)
+    # Mínimos e máximos mantêm o tipo da coluna de origem; somas, médias e contagens, não
+    tipos = pa.schema([c for c in schema if medidas.get(c.name) in ("min", "max")])
+    valores = _tipar(df[list(medidas)].copy(), tipos, None, dimensoes=False)
+    return pd.concat([chaves, valores], axis=1)
@@ -0,0 +1,123 @@
+# app/data/cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+def tamanho_em_bytes(valor: Any) -> int:
+    """Estima a memória ocupada por um DataFrame/Series, dict deles ou objeto com `nbytes` (demais objetos contam 0)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True, index=True))
+    if isinstance(valor, dict):
+        return sum(tamanho_em_bytes(v) for v in valor.values())
+    return int(getattr(valor, "nbytes", 0))
+
+
+class CacheLRU:
+    """
+    Cache em memória compartilhado por todas as sessões do processo.
+
+    As entradas são mantidas em ordem de uso; ao ultrapassar o teto de memória
+    as mais antigas são descartadas (LRU). A última entrada inserida nunca é
+    descartada, mesmo que sozinha exceda o teto.
+    """
+
+    def __init__(self, nome: str, limite_bytes: int):
+        self.nome = nome
+        self.limite_bytes = limite_bytes
+        self._entradas: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._tamanhos: Dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+        self._construindo: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def obter(self, chave: Hashable, construir: Callable[[], Any]) -> Any:
+        """Retorna o valor da chave, construindo-o (uma única vez) em caso de miss."""
+        with self._lock:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.hits += 1
+                return self._entradas[chave]
+            lock_chave = self._construindo.setdefault(chave, threading.Lock())
+
+        # Sessões concorrentes pedindo a mesma chave aguardam a primeira
+        # construção em vez de recalcular; chaves diferentes não se bloqueiam.
+        with lock_chave:
+            with self._lock:
+                if chave in self._entradas:
+                    self._entradas.move_to_end(chave)
+                    self.hits += 1
+                    return self._entradas[chave]
+                self.misses += 1
+            try:
+                valor = construir()
+                with self._lock:
+                    self._inserir(chave, valor)
+            finally:
+                with self._lock:
+                    self._construindo.pop(chave, None)
+            return valor
+
+    def _inserir(self, chave: Hashable, valor: Any) -> None:
+        self._entradas[chave] = valor
+        self._tamanhos[chave] = tamanho_em_bytes(valor)
+        self._entradas.move_to_end(chave)
+        while self.bytes_em_uso > self.limite_bytes and len(self._entradas) > 1:
+            antiga, _ = self._entradas.popitem(last=False)
+            self._tamanhos.pop(antiga, None)
+            self.evictions += 1
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> None:
+        """Remove uma entrada específica ou, sem argumento, todo o cache."""
+        with self._lock:
+            if chave is None:
+                self._entradas.clear()
+                self._tamanhos.clear()
+            else:
+                self._entradas.pop(chave, None)
+                self._tamanhos.pop(chave, None)
+
+    def migrar(self, migrar: Callable[[Hashable, Any], Optional[Tuple[Hashable, Any]]]) -> None:
+        """
+        Troca cada entrada por `migrar(chave, valor)`: a nova (chave, valor), ou None para descartá-la.
+
+        `migrar` roda fora da trava, sobre as entradas do momento da chamada, e a
+        ordem de uso é mantida. Entradas inseridas nesse meio-tempo são mantidas
+        e prevalecem sobre as migradas de mesma chave.
+        """
+        with self._lock:
+            antigas = list(self._entradas.items())
+        migradas = [m for m in (migrar(chave, valor) for chave, valor in antigas) if m is not None]
+        with self._lock:
+            conhecidas = {chave for chave, _ in antigas}
+            recentes = [(c, v) for c, v in self._entradas.items() if c not in conhecidas]
+            self._entradas.clear()
+            self._tamanhos.clear()
+            for chave, valor in migradas + recentes:
+                self._inserir(chave, valor)
+
+    @property
+    def bytes_em_uso(self) -> int:
+        return sum(self._tamanhos.values())
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de uso do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "nome": self.nome,
+                "entradas": len(self._entradas),
+                "bytes_em_uso": self.bytes_em_uso,
+                "limite_bytes": self.limite_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,119 @@
+# app/data/consulta.py
+
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from data.banco import Filtros
+from data.dataset import Data
+from data.loader import consultar_cubo, cubo_mensal, filtrar_base, origem_linhas, ranking_cubo, rollup_cubo
+from data.processor import meses_do_periodo
+from data.rollup import HIERARQUIA_COMERCIAL, Rollup
+from data.top_n import Ranking, top_n
+
+
+class Consulta:
+    """
+    Seleção de uma página sobre a base: período, recorte da página e filtros da barra lateral.
+
+    `linhas()` devolve as notas selecionadas (loader.filtrar_base), para o
+    que precisa de detalhe por dia ou por linha. `agregar()` responde pelo
+    cubo mensal da versão quando a agregação e a seleção usam só colunas do
+    cubo e o período cobre meses inteiros; senão, agrupa as linhas
+    selecionadas. `ranking()` devolve os Top N e `rollup()` os totais da
+    hierarquia comercial pelo mesmo caminho. Os resultados ficam no cache de
+    linhas filtradas.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        filtros: Optional[Filtros] = None,
+        periodo: Optional[Tuple[Data, Data]] = None,
+        recorte: Optional[Filtros] = None,
+        variante: str = "",
+    ):
+        self.df = df
+        self.filtros = filtros
+        self.periodo = periodo
+        self.recorte = recorte
+        self.variante = variante
+        self._linhas: Optional[pd.DataFrame] = None
+
+    def linhas(self) -> pd.DataFrame:
+        """Linhas da base que atendem à seleção."""
+        if self._linhas is None:
+            self._linhas = filtrar_base(self.df, self.filtros, self.periodo, self.recorte, self.variante)
+        return self._linhas
+
+    def agregar(self, por: List[str], medidas: Dict[str, str]) -> pd.DataFrame:
+        """
+        O mesmo que linhas().groupby(por, observed=True).agg(medidas).reset_index().
+
+        Medidas no formato de DataFrame.agg ("sum", "mean", "count" ou "size"
+        saem do cubo). Sem `por`, uma linha com os totais.
+        """
+        cubo = self._cubo(por, medidas)
+        if cubo is None:
+            return self._agrupar(por, medidas)
+        versao, selecoes, meses = cubo
+        return consultar_cubo(versao, por, medidas, selecoes, meses)
+
+    def ranking(self, rankings: List[Ranking], k: int = 10) -> Dict[Ranking, pd.DataFrame]:
+        """
+        Os k maiores totais (soma) de cada (dimensão, medida) da seleção, numa passada (data.top_n).
+
+        Pelo cubo quando ele responde a todos os pares; senão, sobre linhas().
+        """
+        cubo = self._cubo([d for d, _ in rankings], {m: "sum" for _, m in rankings})
+        if cubo is None:
+            return top_n(self.linhas(), rankings, k)
+        versao, selecoes, meses = cubo
+        return ranking_cubo(versao, rankings, k, selecoes, meses)
+
+    def rollup(self, medidas: List[str], niveis: List[str] = HIERARQUIA_COMERCIAL) -> Rollup:
+        """
+        Totais da seleção em todos os níveis da hierarquia e no total geral (data.rollup).
+
+        A partir dos fatos do cubo quando ele responde; senão, de linhas().
+        """
+        cubo = self._cubo(niveis, {m: "sum" for m in medidas})
+        if cubo is None:
+            return Rollup(self.linhas(), medidas, niveis)
+        versao, selecoes, meses = cubo
+        return rollup_cubo(versao, medidas, niveis, selecoes, meses)
+
+    def _cubo(self, por: List[str], medidas: Dict[str, str]) -> Optional[tuple]:
+        """(versão, seleções, meses) para consultar o cubo mensal, ou None se ele não responde."""
+        origem = origem_linhas(self.df)
+        selecoes = self._selecoes(origem)
+        if selecoes is None or self.variante:
+            return None
+        meses = None if self.periodo is None else meses_do_periodo(self.df, *self.periodo)
+        if self.periodo is not None and meses is None:
+            return None
+        usadas = list(por) + [c for s in selecoes for c, v in s.items() if v is not None]
+        if not cubo_mensal(origem[0]).responde(usadas, medidas):
+            return None
+        return origem[0], selecoes, meses
+
+    def _selecoes(self, origem: Optional[tuple]) -> Optional[List[Filtros]]:
+        """
+        Seleções a aplicar no cubo: as da leitura (naturezas e filtros), o recorte e os filtros.
+
+        None quando a leitura foi limitada por período (o cubo não sabe reproduzir).
+        """
+        if origem is None:
+            return None
+        _, _, _, data_ini, data_fim, naturezas, filtros_leitura = origem
+        if data_ini is not None or data_fim is not None:
+            return None
+        selecoes = [{"NATUREZA": list(naturezas)}] if naturezas is not None else []
+        selecoes.append({coluna: list(valor) if isinstance(valor, tuple) else valor for coluna, valor in filtros_leitura or ()})
+        return [s for s in selecoes + [self.recorte, self.filtros] if s]
+
+    def _agrupar(self, por: List[str], medidas: Dict[str, str]) -> pd.DataFrame:
+        linhas = self.linhas()
+        if not por:
+            return linhas.agg(medidas).to_frame().T.reset_index(drop=True)
+        return linhas.groupby(por, observed=True).agg(medidas).reset_index()
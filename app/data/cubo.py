@@ -0,0 +1,160 @@
+# app/data/cubo.py
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.processor import Agrupador
+
+# Dimensões e medidas do cubo mensal; colunas ausentes na base ficam de fora
+DIMENSOES_CUBO = ["ANO_MES", "NATUREZA", "SUPERVISOR", "VENDEDOR", "REDE", "CLIENTE", "COD.PRD", "DESC"]
+MEDIDAS_CUBO = ["VL.BRUTO", "QTDE", "CONTRATO", "PRECO_UNIT"]
+# Funções de agregação (formato de DataFrame.agg) que o cubo sabe responder
+FUNCOES_CUBO = ["sum", "mean", "count", "size"]
+LINHAS = "LINHAS"
+
+
+def coluna_contagem(medida: str) -> str:
+    """Coluna do cubo com a quantidade de valores não nulos da medida."""
+    return f"N_{medida}"
+
+
+def somar_fatos(df: pd.DataFrame, dimensoes: List[str], medidas: List[str]) -> pd.DataFrame:
+    """
+    Fatos de `df` por `dimensoes`: soma e quantidade não nula de cada medida e linhas da base.
+
+    Nulos nas dimensões viram grupos: as consultas decidem se os descartam.
+    """
+    agrupado = df.groupby(dimensoes, observed=True, dropna=False, sort=False)
+    somas = agrupado[medidas].sum()
+    contagens = agrupado[medidas].count().rename(columns=coluna_contagem)
+    return pd.concat([somas, contagens, agrupado.size().rename(LINHAS)], axis=1).reset_index()
+
+
+def fatos_mensais(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fatos do cubo mensal das linhas de `df`, com as dimensões em texto, no formato gravado junto ao dataset.
+
+    Usa as dimensões e medidas do cubo presentes em `df`.
+    """
+    dimensoes = [c for c in DIMENSOES_CUBO if c in df.columns]
+    medidas = [c for c in MEDIDAS_CUBO if c in df.columns]
+    df = df[dimensoes + medidas].astype({c: object for c in dimensoes})
+    return somar_fatos(df, dimensoes, medidas)
+
+
+def somar_fatos_mensais(atual: pd.DataFrame, lote: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma aos fatos gravados (fatos_mensais) os de um lote novo.
+
+    Só as linhas dos meses do lote são reagrupadas; colunas do lote que os
+    fatos gravados não têm são ignoradas, e as que faltam no lote contam zero.
+    """
+    dimensoes = [c for c in DIMENSOES_CUBO if c in atual.columns]
+    tocados = atual["ANO_MES"].isin(lote["ANO_MES"].unique()).to_numpy()
+    somados = (
+        pd.concat([atual[tocados], lote.reindex(columns=atual.columns)], ignore_index=True)
+        .groupby(dimensoes, dropna=False, sort=False).sum().reset_index()
+    )
+    return pd.concat([atual[~tocados], somados.astype(atual.dtypes.to_dict())], ignore_index=True)
+
+
+def colunas_fatos(medidas: Dict[str, str]) -> List[str]:
+    """Colunas dos fatos necessárias para calcular as medidas (formato de DataFrame.agg)."""
+    return list(dict.fromkeys(
+        [c for c, f in medidas.items() if f != "size"]
+        + [coluna_contagem(c) for c, f in medidas.items() if f in ("mean", "count")]
+        + ([LINHAS] if "size" in medidas.values() else [])
+    ))
+
+
+def calcular_medidas(totais: pd.DataFrame, medidas: Dict[str, str]) -> pd.DataFrame:
+    """Medidas a partir dos fatos somados por grupo: médias e contagens saem de soma / quantidade."""
+    resultado = pd.DataFrame(index=totais.index)
+    for coluna, funcao in medidas.items():
+        if funcao == "sum":
+            resultado[coluna] = totais[coluna]
+        elif funcao == "mean":
+            quantidade = totais[coluna_contagem(coluna)]
+            resultado[coluna] = totais[coluna].where(quantidade > 0) / quantidade.where(quantidade > 0)
+        elif funcao == "count":
+            resultado[coluna] = totais[coluna_contagem(coluna)].astype(np.int64)
+        else:
+            resultado[coluna] = totais[LINHAS].astype(np.int64)
+    return resultado
+
+
+class CuboMensal:
+    """
+    Fatos mensais da base: uma linha por combinação presente de DIMENSOES_CUBO.
+
+    Guarda a soma de cada medida, a quantidade de valores não nulos (médias e
+    contagens saem de soma / quantidade) e a de linhas da base. Agregações
+    por qualquer subconjunto das dimensões, com filtros sobre elas, são
+    respondidas reagrupando o cubo, sem reler as notas. O loader o monta uma
+    vez por versão do dataset a partir dos fatos que a ingestão mantém
+    (dos_fatos); os lotes do ERP só somam os seus meses a eles.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.dimensoes = [c for c in DIMENSOES_CUBO if c in df.columns]
+        self.medidas = [c for c in MEDIDAS_CUBO if c in df.columns]
+        self.fatos = somar_fatos(df, self.dimensoes, self.medidas)
+        self.linhas_base = len(df)
+
+    @classmethod
+    def dos_fatos(cls, fatos: pd.DataFrame) -> "CuboMensal":
+        """Cubo a partir de fatos já somados (fatos_mensais, com as categorias da base aplicadas)."""
+        cubo = cls.__new__(cls)
+        cubo.dimensoes = [c for c in DIMENSOES_CUBO if c in fatos.columns]
+        cubo.medidas = [c for c in MEDIDAS_CUBO if c in fatos.columns]
+        cubo.fatos = fatos
+        cubo.linhas_base = int(fatos[LINHAS].sum())
+        return cubo
+
+    @property
+    def nbytes(self) -> int:
+        """Memória do cubo (usada pelo cache do processo)."""
+        return int(self.fatos.memory_usage(deep=True, index=True).sum())
+
+    def responde(self, colunas: List[str], medidas: Dict[str, str]) -> bool:
+        """Se o cubo tem as colunas usadas (dimensões e filtros) e sabe calcular as medidas."""
+        return (
+            set(colunas) <= set(self.dimensoes)
+            and all(c in self.medidas and f in FUNCOES_CUBO for c, f in medidas.items())
+        )
+
+    def selecionar(self, filtros: Optional[List[Dict]] = None, meses: Optional[tuple] = None) -> pd.DataFrame:
+        """Linhas do cubo nas seleções (formato do Agrupador, todas aplicadas) e nos meses (inclusive)."""
+        fatos = self.fatos
+        for selecao in filtros or []:
+            if selecao:
+                fatos = Agrupador(fatos).filtrar(selecao)
+        if meses is not None:
+            ano_mes = fatos["ANO_MES"]
+            fatos = fatos[((ano_mes >= meses[0]) & (ano_mes <= meses[1])).to_numpy(dtype=bool, na_value=False)]
+        return fatos
+
+    def consultar(
+        self,
+        por: List[str],
+        medidas: Dict[str, str],
+        filtros: Optional[List[Dict]] = None,
+        meses: Optional[tuple] = None,
+        dropna: bool = True,
+    ) -> pd.DataFrame:
+        """
+        O mesmo que df.groupby(por, observed=True).agg(medidas).reset_index() sobre as linhas da base.
+
+        `filtros` e `meses` como em selecionar. Sem `por`, devolve uma linha
+        com os totais.
+        """
+        fatos = self.selecionar(filtros, meses)
+        colunas = colunas_fatos(medidas)
+        if por:
+            totais = fatos.groupby(por, observed=True, dropna=dropna)[colunas].sum()
+        else:
+            totais = fatos[colunas].sum().to_frame().T
+        resultado = calcular_medidas(totais, medidas)
+        return resultado.reset_index() if por else resultado.reset_index(drop=True)
@@ -0,0 +1,340 @@
+# app/data/dataset.py
+
+import os
+import glob
+import shutil
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
+
+from data.natureza import carregar_regras, categorias_natureza
+from utils.arquivos import caminho_temporario, publicar_arquivo
+
+# Partições Hive: <base>.dataset/ANO_MES=2024-01/NATUREZA=VENDA/part-0.parquet
+COLUNAS_PARTICAO = ["ANO_MES", "NATUREZA"]
+PARTICIONAMENTO = ds.partitioning(
+    pa.schema([("ANO_MES", pa.string()), ("NATUREZA", pa.string())]), flavor="hive"
+)
+
+# Colunas de dimensão entregues como categóricas (NATUREZA segue a tabela de regras)
+COLUNAS_CATEGORICAS = ["CLIENTE", "CLIENTE_NORM", "VENDEDOR", "SUPERVISOR", "REDE", "DESC", "COD.PRD", "TP"]
+
+# Cópia de cada partição em Arrow IPC sem compressão, aberta com mmap pelas leituras:
+# <partição>/_snapshot.arrow (o prefixo "_" a esconde da leitura do Parquet)
+NOME_SNAPSHOT = "_snapshot.arrow"
+# Arquivos acrescentados por lotes do ERP: <partição>/lote-00000001.parquet
+PREFIXO_LOTE = "lote-"
+# Lotes acumulados numa partição, fora do snapshot, até ela ser regravada
+LOTES_POR_SNAPSHOT = 8
+
+Data = Union[date, pd.Timestamp, str]
+
+# Leituras e regravações de partições no mesmo processo não se intercalam
+TRAVA_DATASET = threading.RLock()
+
+
+def remover_meses(diretorio: str, meses: Iterable[str]) -> None:
+    """Apaga as partições dos meses informados (todas as naturezas)."""
+    for mes in meses:
+        caminho = os.path.join(diretorio, f"ANO_MES={mes}")
+        if os.path.exists(caminho):
+            shutil.rmtree(caminho)
+
+
+def gravar_particionado(df: pd.DataFrame, diretorio: str) -> None:
+    """
+    Grava linhas enriquecidas no dataset particionado por ANO_MES e NATUREZA.
+
+    Os meses gravados devem ter sido removidos antes (remover_meses); partições
+    de outros meses não são tocadas.
+    """
+    tabela = pa.Table.from_pandas(
+        df.assign(NATUREZA=df["NATUREZA"].astype(str)), preserve_index=False
+    )
+    ds.write_dataset(
+        tabela,
+        diretorio,
+        format="parquet",
+        partitioning=PARTICIONAMENTO,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def gravar_lote(df: pd.DataFrame, diretorio: str, lote: int) -> None:
+    """
+    Acrescenta as linhas enriquecidas de um lote como arquivos novos nas partições.
+
+    Os arquivos existentes não são tocados. As colunas seguem o schema do
+    dataset (as ausentes no lote ficam nulas, as desconhecidas são ignoradas)
+    e cada arquivo é gravado à parte e publicado por rename.
+    """
+    schema = ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO).schema
+    schema = pa.schema([campo for campo in schema if campo.name not in COLUNAS_PARTICAO])
+    df = df.assign(NATUREZA=df["NATUREZA"].astype(str))
+    for (mes, natureza), grupo in df.groupby(COLUNAS_PARTICAO, sort=True):
+        pasta = os.path.join(diretorio, f"ANO_MES={mes}", f"NATUREZA={natureza}")
+        os.makedirs(pasta, exist_ok=True)
+        destino = os.path.join(pasta, f"{PREFIXO_LOTE}{lote:08d}.parquet")
+        # Temporário com prefixo "_" na raiz: leitores do dataset não o enxergam
+        temp = os.path.join(diretorio, "_" + os.path.basename(caminho_temporario(destino)))
+        tabela = pa.Table.from_pandas(grupo.reindex(columns=schema.names), schema=schema, preserve_index=False)
+        pq.write_table(tabela, temp)
+        publicar_arquivo(temp, destino)
+
+
+def _numero_lote(arquivo: str) -> int:
+    """Número do lote de um arquivo lote-*.parquet (0 nos arquivos da exportação)."""
+    nome = os.path.basename(arquivo)
+    if not nome.startswith(PREFIXO_LOTE):
+        return 0
+    return int(nome[len(PREFIXO_LOTE):-len(".parquet")])
+
+
+def arquivos_lote(diretorio: str, depois_de: int = 0) -> List[str]:
+    """Arquivos gravados por lotes de número maior que `depois_de`."""
+    arquivos = glob.glob(os.path.join(diretorio, "ANO_MES=*", "NATUREZA=*", f"{PREFIXO_LOTE}*.parquet"))
+    return sorted(a for a in arquivos if _numero_lote(a) > depois_de)
+
+
+def _formato_parquet() -> ds.ParquetFileFormat:
+    return ds.ParquetFileFormat(read_options={"dictionary_columns": COLUNAS_CATEGORICAS})
+
+
+def abrir_dataset(diretorio: str) -> ds.Dataset:
+    """Abre o dataset lendo as colunas de dimensão direto como dicionário (sem strings por linha)."""
+    return ds.dataset(diretorio, format=_formato_parquet(), partitioning=PARTICIONAMENTO)
+
+
+def _lote_snapshot(caminho: str) -> Optional[int]:
+    """Último lote contido no snapshot da partição (None se ela não tem snapshot)."""
+    if not os.path.exists(caminho):
+        return None
+    with pa.memory_map(caminho, "r") as arquivo:
+        metadados = pa.ipc.open_file(arquivo).schema.metadata or {}
+    return int(metadados.get(b"lote", b"0"))
+
+
+def _arquivos_pendentes(pasta: str) -> List[str]:
+    """Arquivos Parquet da partição que ainda não estão no snapshot dela."""
+    arquivos = sorted(glob.glob(os.path.join(pasta, "*.parquet")))
+    incluido = _lote_snapshot(os.path.join(pasta, NOME_SNAPSHOT))
+    if incluido is None:
+        return arquivos
+    return [a for a in arquivos if _numero_lote(a) > incluido]
+
+
+def gravar_snapshot(
+    diretorio: str,
+    lote: int = 0,
+    meses: Optional[Iterable[str]] = None,
+    lotes_pendentes: int = 1,
+) -> None:
+    """
+    Grava o snapshot Arrow IPC (sem compressão) das partições desatualizadas.
+
+    Cada partição (de `meses`, ou todas) com pelo menos `lotes_pendentes`
+    arquivos fora do snapshot é relida e regravada num único bloco, com os
+    dicionários das colunas de dimensão unificados (o formato de arquivo IPC
+    não aceita um dicionário por bloco). `lote` é o último lote do ERP já
+    gravado; os posteriores são lidos do Parquet (abrir_snapshot). O custo
+    acompanha as partições regravadas, não a base inteira.
+    """
+    pastas = glob.glob(os.path.join(diretorio, "ANO_MES=*", "NATUREZA=*"))
+    if meses is not None:
+        meses = set(meses)
+        pastas = [p for p in pastas if os.path.basename(os.path.dirname(p))[len("ANO_MES="):] in meses]
+    for pasta in sorted(pastas):
+        if len(_arquivos_pendentes(pasta)) < lotes_pendentes:
+            continue
+        tabela = ds.dataset(pasta, format=_formato_parquet()).to_table().unify_dictionaries().combine_chunks()
+        tabela = tabela.replace_schema_metadata({b"lote": str(lote).encode()})
+        caminho = os.path.join(pasta, NOME_SNAPSHOT)
+        temp = caminho_temporario(caminho)
+        with pa.OSFile(temp, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        publicar_arquivo(temp, caminho)
+    # Snapshot único da base inteira, de versões anteriores
+    antigo = os.path.join(diretorio, NOME_SNAPSHOT)
+    if os.path.exists(antigo):
+        os.remove(antigo)
+
+
+def abrir_snapshot(diretorio: str, filtro: Optional[ds.Expression] = None) -> Optional[ds.Dataset]:
+    """
+    Abre os snapshots das partições com mmap, ou None se não há nenhum.
+
+    Não há descompressão: as colunas apontam direto para as páginas dos
+    arquivos, carregadas sob demanda e compartilhadas, pelo cache do sistema,
+    entre os processos da mesma máquina. As partições fora de `filtro`
+    (ANO_MES, NATUREZA) não são abertas. Arquivos de lotes posteriores ao
+    snapshot da partição, e partições ainda sem snapshot, são lidos do
+    Parquet no mesmo dataset.
+    """
+    snapshots = sorted(glob.glob(os.path.join(diretorio, "ANO_MES=*", "NATUREZA=*", NOME_SNAPSHOT)))
+    if not snapshots:
+        return None
+    dataset = ds.dataset(
+        snapshots, format="ipc", partitioning=PARTICIONAMENTO, partition_base_dir=diretorio,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    # Só os snapshots das partições selecionadas dizem até que lote já contêm
+    incluido = {
+        os.path.dirname(fragmento.path): int((fragmento.physical_schema.metadata or {}).get(b"lote", b"0"))
+        for fragmento in dataset.get_fragments(filter=filtro)
+    }
+    com_snapshot = {os.path.dirname(s) for s in snapshots}
+    pendentes = [
+        a for a in sorted(glob.glob(os.path.join(diretorio, "ANO_MES=*", "NATUREZA=*", "*.parquet")))
+        if os.path.dirname(a) not in com_snapshot
+        or _numero_lote(a) > incluido.get(os.path.dirname(a), float("inf"))
+    ]
+    if not pendentes:
+        return dataset
+    delta = ds.dataset(
+        pendentes, format=_formato_parquet(), partitioning=PARTICIONAMENTO, partition_base_dir=diretorio,
+        schema=dataset.schema,
+    )
+    return ds.dataset([dataset, delta])
+
+
+def categorias_dataset(diretorio: str) -> Dict[str, List[str]]:
+    """Valores distintos de cada coluna de dimensão em todo o dataset, em ordem alfabética."""
+    dataset = abrir_dataset(diretorio)
+    colunas = [c for c in COLUNAS_CATEGORICAS if c in dataset.schema.names]
+    tabela = dataset.to_table(columns=colunas)
+    categorias = {}
+    for coluna in colunas:
+        valores = set()
+        for bloco in tabela.column(coluna).chunks:
+            valores.update(v for v in bloco.dictionary.to_pylist() if v is not None)
+        categorias[coluna] = sorted(valores)
+    return categorias
+
+
+def aplicar_categorias(df: pd.DataFrame, categorias: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    """
+    Fixa a ordem das categorias das colunas de dimensão.
+
+    Com `categorias` (gravadas na ingestão), todas as leituras da mesma versão
+    do dataset têm as mesmas categorias, qualquer que seja o filtro; valores
+    ausentes da lista vão para o fim. Sem ela, usa a ordem alfabética do que
+    foi lido.
+    """
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype("category")
+        lidas = serie.cat.categories
+        if categorias and coluna in categorias:
+            estaveis = pd.Index(categorias[coluna])
+            ordem = estaveis.append(lidas.difference(estaveis).sort_values())
+        else:
+            ordem = lidas.sort_values()
+        df[coluna] = serie.cat.set_categories(ordem)
+    return df
+
+
+def _tipo_arrow(tipo: pa.DataType) -> Optional[pd.ArrowDtype]:
+    # Dicionários continuam virando Categorical: ArrowDtype(dictionary) tem suporte parcial no pandas
+    if pa.types.is_dictionary(tipo):
+        return None
+    return pd.ArrowDtype(tipo)
+
+
+def filtro_particoes(
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+) -> Optional[ds.Expression]:
+    """
+    Monta o filtro do dataset.
+
+    As condições sobre ANO_MES e NATUREZA eliminam partições inteiras sem
+    abri-las; a condição sobre EMISSAO recorta os dias dentro dos meses lidos.
+    """
+    condicoes = []
+    if data_ini is not None:
+        inicio = pd.Timestamp(data_ini)
+        condicoes.append(ds.field("ANO_MES") >= inicio.strftime("%Y-%m"))
+        condicoes.append(ds.field("EMISSAO") >= pa.scalar(inicio, type=pa.timestamp("ns")))
+    if data_fim is not None:
+        fim = pd.Timestamp(data_fim)
+        condicoes.append(ds.field("ANO_MES") <= fim.strftime("%Y-%m"))
+        condicoes.append(ds.field("EMISSAO") <= pa.scalar(fim, type=pa.timestamp("ns")))
+    if naturezas is not None:
+        condicoes.append(ds.field("NATUREZA").isin(list(naturezas)))
+
+    filtro = None
+    for condicao in condicoes:
+        filtro = condicao if filtro is None else filtro & condicao
+    return filtro
+
+
+def ler_particionado(
+    diretorio: str,
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    colunas: Optional[List[str]] = None,
+    categorias: Optional[Dict[str, List[str]]] = None,
+    dtype_backend: str = "numpy",
+) -> pd.DataFrame:
+    """
+    Lê do dataset apenas as partições (e colunas) que atendem ao filtro.
+
+    Colunas pedidas que não existem na base (opcionais, como CONTRATO) são
+    ignoradas. As colunas de dimensão saem categóricas (ver aplicar_categorias).
+    Com dtype_backend="pyarrow", as demais colunas ficam em memória Arrow
+    (pd.ArrowDtype), sem cópia para arrays NumPy nem objetos Python.
+    Havendo snapshots Arrow (gravar_snapshot), lê deles em vez do Parquet.
+    """
+    filtro = filtro_particoes(data_ini, data_fim, naturezas)
+    dataset = abrir_snapshot(diretorio, filtro)
+    if dataset is None:
+        dataset = abrir_dataset(diretorio)
+    if colunas is not None:
+        colunas = [c for c in dict.fromkeys(colunas) if c in dataset.schema.names]
+    return _para_pandas(dataset.to_table(columns=colunas, filter=filtro), categorias, dtype_backend)
+
+
+def ler_lotes(
+    diretorio: str,
+    depois_de: int,
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    colunas: Optional[List[str]] = None,
+    categorias: Optional[Dict[str, List[str]]] = None,
+    dtype_backend: str = "numpy",
+) -> pd.DataFrame:
+    """
+    Lê só as linhas dos lotes do ERP de número maior que `depois_de`.
+
+    Mesmos filtros e tipos de ler_particionado; o custo acompanha o tamanho
+    dos lotes, não o da base.
+    """
+    dataset = ds.dataset(
+        arquivos_lote(diretorio, depois_de), format=_formato_parquet(), partitioning=PARTICIONAMENTO,
+        partition_base_dir=diretorio, schema=abrir_dataset(diretorio).schema,
+    )
+    if colunas is not None:
+        colunas = [c for c in dict.fromkeys(colunas) if c in dataset.schema.names]
+    tabela = dataset.to_table(columns=colunas, filter=filtro_particoes(data_ini, data_fim, naturezas))
+    return _para_pandas(tabela, categorias, dtype_backend)
+
+
+def _para_pandas(tabela: pa.Table, categorias: Optional[Dict[str, List[str]]], dtype_backend: str) -> pd.DataFrame:
+    types_mapper = _tipo_arrow if dtype_backend == "pyarrow" else None
+    df = aplicar_categorias(tabela.to_pandas(types_mapper=types_mapper), categorias)
+    if "NATUREZA" in df.columns:
+        df["NATUREZA"] = pd.Categorical(df["NATUREZA"], categories=categorias_natureza(carregar_regras()))
+    return df
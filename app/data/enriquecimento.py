@@ -0,0 +1,98 @@
+# app/data/enriquecimento.py
+
+import numpy as np
+import pandas as pd
+
+from data.natureza import CAMINHO_REGRAS, classificar_natureza_vetorizado
+from utils.conversor import hash_arquivo
+
+# Incrementar sempre que a lógica de enriquecer() mudar: a base enriquecida
+# gravada com outra versão é reconstruída na próxima carga.
+VERSAO_ENRIQUECIMENTO = 2
+
+COLUNAS_DERIVADAS = ["ANO_MES", "MES", "NATUREZA", "TICKET_MEDIO", "CLIENTE_NORM"]
+
+# Agregado mensal mantido junto ao dataset (totais por mês, natureza e cliente)
+CHAVES_MENSAL = ["ANO_MES", "NATUREZA", "CLIENTE"]
+MEDIDAS_MENSAL = ["VL.BRUTO", "QTDE"]
+
+
+def normalizar_texto(serie: pd.Series) -> pd.Series:
+    """Remove espaços das pontas e coloca em maiúsculas, processando só os valores distintos."""
+    codigos, valores = pd.factorize(serie)
+    normalizados = np.array([str(v).strip().upper() for v in valores] + [None], dtype=object)
+    return pd.Series(normalizados[codigos], index=serie.index, name=serie.name)
+
+
+def enriquecer(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Acrescenta as colunas derivadas à base tipada.
+
+    - ANO_MES: período "AAAA-MM" (texto)
+    - MES: período como inteiro AAAAMM
+    - NATUREZA: classificação pela tabela de regras (categórica)
+    - CLIENTE_NORM: CLIENTE sem espaços nas pontas e em maiúsculas
+
+    Só usa a própria linha, por isso pode rodar em cada arquivo/mês isolado.
+    TICKET_MEDIO depende do histórico inteiro e é calculado à parte
+    (ticket_medio_por_cliente). É idempotente: colunas derivadas já
+    existentes são recalculadas.
+    """
+    df = df.drop(columns=[c for c in COLUNAS_DERIVADAS if c in df.columns])
+
+    df["ANO_MES"] = df["EMISSAO"].dt.strftime("%Y-%m")
+    df["MES"] = (df["EMISSAO"].dt.year * 100 + df["EMISSAO"].dt.month).astype("int32")
+    df["NATUREZA"] = classificar_natureza_vetorizado(df["TP"], df["DESC"])
+
+    df["CLIENTE_NORM"] = normalizar_texto(df["CLIENTE"])
+    return df
+
+
+def ticket_medio_por_cliente(vendas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Média de VL.BRUTO por cliente sobre as linhas de VENDA do histórico.
+
+    Guarda também a soma e a quantidade de vendas, para que lotes novos sejam
+    somados sem reler o histórico (somar_ticket_medio).
+    """
+    por_cliente = (
+        vendas.groupby("CLIENTE", observed=True)["VL.BRUTO"]
+        .agg(SOMA="sum", VENDAS="count").reset_index()
+    )
+    por_cliente["TICKET_MEDIO"] = por_cliente["SOMA"] / por_cliente["VENDAS"]
+    return por_cliente
+
+
+def somar_ticket_medio(atual: pd.DataFrame, lote: pd.DataFrame) -> pd.DataFrame:
+    """Soma ao ticket médio por cliente o de um lote novo (ambos de ticket_medio_por_cliente)."""
+    somado = (
+        pd.concat([atual, lote], ignore_index=True)
+        .groupby("CLIENTE")[["SOMA", "VENDAS"]].sum().reset_index()
+    )
+    somado["TICKET_MEDIO"] = somado["SOMA"] / somado["VENDAS"]
+    return somado
+
+
+def agregado_mensal(df: pd.DataFrame) -> pd.DataFrame:
+    """Soma de VL.BRUTO e QTDE por mês, natureza e cliente (chaves nulas incluídas)."""
+    df = df[CHAVES_MENSAL + MEDIDAS_MENSAL].astype({"NATUREZA": str, "CLIENTE": object})
+    return df.groupby(CHAVES_MENSAL, dropna=False)[MEDIDAS_MENSAL].sum().reset_index()
+
+
+def somar_agregado_mensal(atual: pd.DataFrame, lote: pd.DataFrame) -> pd.DataFrame:
+    """Soma ao agregado mensal o de um lote novo."""
+    return agregado_mensal(pd.concat([atual, lote], ignore_index=True))
+
+
+def aplicar_ticket_medio(df: pd.DataFrame, ticket_medio: pd.DataFrame) -> pd.DataFrame:
+    """Preenche TICKET_MEDIO nas linhas de VENDA (nulo nas demais naturezas)."""
+    por_cliente = ticket_medio.set_index("CLIENTE")["TICKET_MEDIO"]
+    valores = df["CLIENTE"].map(por_cliente).to_numpy(dtype=float)
+    valores[(df["NATUREZA"] != "VENDA").to_numpy()] = np.nan
+    df["TICKET_MEDIO"] = valores
+    return df
+
+
+def assinatura_enriquecimento() -> str:
+    """Versão da lógica de enriquecimento somada ao conteúdo da tabela de regras."""
+    return f"v{VERSAO_ENRIQUECIMENTO}:{hash_arquivo(CAMINHO_REGRAS)}"
@@ -0,0 +1,203 @@
+# app/data/indice_filtros.py
+
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Colunas lidas pelos filtros da barra lateral (e aplicadas pelo Agrupador)
+COLUNAS_FILTRO = ["SUPERVISOR", "VENDEDOR", "CLIENTE", "DESC", "COD.PRD", "REDE", "NATUREZA"]
+# Colunas com listas longas, que a barra lateral oferece por busca (IndiceFiltros.buscar)
+COLUNAS_BUSCA = ["CLIENTE", "DESC", "COD.PRD"]
+
+
+def normalizar_busca(texto: Any) -> str:
+    """Texto em maiúsculas e sem acentos, para comparar o termo buscado com os valores."""
+    decomposto = unicodedata.normalize("NFKD", str(texto).upper())
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).strip()
+
+
+def _presentes(codigos: np.ndarray, total: int) -> np.ndarray:
+    """Máscara dos códigos (0..total-1) que aparecem ao menos uma vez; -1 (nulo) é ignorado."""
+    return np.bincount(codigos + 1, minlength=total + 1)[1:] > 0
+
+
+def _codificar(serie: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Código inteiro de cada linha (-1 para nulo) e os valores correspondentes aos códigos."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    return pd.factorize(serie)
+
+
+def _intersecao(menor: np.ndarray, maior: np.ndarray) -> np.ndarray:
+    """Interseção de dois arrays ordenados de ids, por busca binária dos ids do menor no maior."""
+    if not len(menor) or not len(maior):
+        return menor[:0]
+    posicoes = np.searchsorted(maior, menor).clip(max=len(maior) - 1)
+    return menor[maior[posicoes] == menor]
+
+
+def _indice_busca(opcoes: List[str]) -> Tuple[np.ndarray, np.ndarray, str, np.ndarray]:
+    """Ordem das opções pela chave normalizada, chaves ordenadas, texto unido e início de cada chave nele."""
+    normalizadas = [normalizar_busca(v) for v in opcoes]
+    ordem = np.argsort(np.array(normalizadas, dtype=object), kind="stable").astype(np.int32)
+    chaves = np.array([normalizadas[i] for i in ordem], dtype=str)
+    inicios = np.concatenate([[0], np.cumsum([len(n) + 1 for n in normalizadas])[:-1]]).astype(np.int64)
+    return ordem, chaves, "\n".join(normalizadas), inicios
+
+
+def _hierarquia(supervisor: pd.Series, vendedor: pd.Series) -> Dict[str, List[str]]:
+    """Supervisor → vendedores (ordenados) que aparecem com ele em alguma linha."""
+    if isinstance(supervisor.dtype, pd.CategoricalDtype) and isinstance(vendedor.dtype, pd.CategoricalDtype):
+        # Pares presentes pela contagem de (código do supervisor, código do vendedor)
+        # (linhas sem supervisor ficam de fora, como no dropna abaixo)
+        n_vend = len(vendedor.cat.categories)
+        sup = supervisor.cat.codes.to_numpy().astype(np.int64)
+        pares = (sup * (n_vend + 1) + vendedor.cat.codes.to_numpy() + 1)[sup >= 0]
+        presentes = _presentes(pares, len(supervisor.cat.categories) * (n_vend + 1)).reshape(-1, n_vend + 1)
+        return {
+            sup: sorted(vendedor.cat.categories[presentes[i, 1:]])
+            for i, sup in enumerate(supervisor.cat.categories) if presentes[i].any()
+        }
+    pares = pd.DataFrame({"SUPERVISOR": supervisor, "VENDEDOR": vendedor}).dropna(subset=["SUPERVISOR"])
+    return {
+        sup: sorted(grupo.dropna().unique().tolist())
+        for sup, grupo in pares.groupby("SUPERVISOR", observed=True)["VENDEDOR"]
+    }
+
+
+class IndiceFiltros:
+    """
+    Opções dos filtros da barra lateral para uma versão da base.
+
+    Guarda os valores ordenados de cada coluna de filtro, a hierarquia
+    supervisor → vendedores e um índice invertido: para cada valor, os ids
+    (ordenados) das linhas em que ele aparece. As opções em cascata de uma
+    coluna saem da interseção das listas de ids das seleções nas demais,
+    sem reler o DataFrame. É construído uma vez por versão do dataset
+    (loader.indice_filtros) e reaproveitado por todos os FiltroDinamico.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.opcoes: Dict[str, List[str]] = {}
+        # Busca das COLUNAS_BUSCA: posições das opções em ordem das chaves normalizadas
+        # (prefixo por busca binária) e as chaves unidas por "\n" (substring por str.find)
+        self._busca: Dict[str, Tuple[np.ndarray, np.ndarray, str, np.ndarray]] = {}
+        self._codigos: Dict[str, np.ndarray] = {}
+        self._valores: Dict[str, pd.Index] = {}
+        # Posição de cada código em self.opcoes[coluna] (-1: ausente da base, nulo ou vazio)
+        self._posicao: Dict[str, np.ndarray] = {}
+        # Ids das linhas ordenados por código e onde começa a lista de cada código
+        self._listas: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for coluna in COLUNAS_FILTRO:
+            if coluna not in df.columns:
+                continue
+            codigos, valores = _codificar(df[coluna])
+            contagem = np.bincount(codigos + 1, minlength=len(valores) + 1)
+            opcoes = sorted(v for v in valores[contagem[1:] > 0] if v)
+            posicao = np.full(len(valores), -1, dtype=np.int32)
+            posicao[valores.get_indexer(opcoes)] = np.arange(len(opcoes), dtype=np.int32)
+            ids = np.argsort(codigos, kind="stable").astype(np.int32)
+            self.opcoes[coluna] = opcoes
+            self._codigos[coluna] = codigos
+            self._valores[coluna] = valores
+            self._posicao[coluna] = posicao
+            self._listas[coluna] = (ids, np.concatenate([[0], np.cumsum(contagem)]))
+            if coluna in COLUNAS_BUSCA:
+                self._busca[coluna] = _indice_busca(opcoes)
+        self.supervisor_vendedores = _hierarquia(df["SUPERVISOR"], df["VENDEDOR"])
+
+    @property
+    def nbytes(self) -> int:
+        """Memória dos arrays do índice (usada pelo cache do processo)."""
+        arrays = list(self._codigos.values()) + list(self._posicao.values())
+        arrays += [a for lista in self._listas.values() for a in lista]
+        arrays += [a for ordem, chaves, _, inicios in self._busca.values() for a in (ordem, chaves, inicios)]
+        return sum(a.nbytes for a in arrays) + sum(len(texto) for _, _, texto, _ in self._busca.values())
+
+    def valores(self, coluna: str) -> List[str]:
+        return self.opcoes.get(coluna, [])
+
+    def linhas_com(self, coluna: str, valores: List[str]) -> np.ndarray:
+        """Ids ordenados das linhas em que a coluna tem algum dos valores."""
+        ids, inicio = self._listas[coluna]
+        codigos = self._valores[coluna].get_indexer(valores)
+        partes = [ids[inicio[c + 1]:inicio[c + 2]] for c in codigos[codigos >= 0]]
+        if len(partes) == 1:
+            return partes[0]
+        return np.sort(np.concatenate(partes)) if partes else ids[:0]
+
+    def linhas_selecionadas(self, selecao: Dict[str, Any], exceto: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Ids das linhas que atendem à seleção (formato do Agrupador), ignorando a coluna `exceto`.
+
+        None quando nenhuma coluna restringe as linhas (nada selecionado, ou
+        todos os valores de uma coluna selecionados).
+        """
+        listas = []
+        for coluna, valor in selecao.items():
+            if valor is None or coluna == exceto or coluna not in self._listas:
+                continue
+            valor = valor if isinstance(valor, list) else [valor]
+            if set(self.opcoes[coluna]) <= set(valor):
+                continue
+            listas.append(self.linhas_com(coluna, valor))
+        if not listas:
+            return None
+        listas.sort(key=len)
+        linhas = listas[0]
+        for outra in listas[1:]:
+            linhas = _intersecao(linhas, outra)
+        return linhas
+
+    def opcoes_para(self, coluna: str, selecao: Dict[str, Any]) -> List[str]:
+        """Valores da coluna que aparecem junto com a seleção das demais colunas (filtros em cascata)."""
+        permitidas = self._permitidas(coluna, selecao)
+        if permitidas is None:
+            return self.valores(coluna)
+        opcoes = self.opcoes[coluna]
+        return [opcoes[p] for p in np.flatnonzero(permitidas)]
+
+    def buscar(self, coluna: str, termo: str, selecao: Dict[str, Any], limite: int) -> List[str]:
+        """
+        Até `limite` opções da coluna que contêm `termo` (sem diferenciar acentos e maiúsculas).
+
+        Primeiro as que começam pelo termo, depois as que o contêm em outra
+        posição, em ordem alfabética e restritas às compatíveis com a seleção
+        das demais colunas (como em opcoes_para). Termo vazio: as primeiras
+        opções em ordem alfabética.
+        """
+        if coluna not in self._busca:
+            return self.opcoes_para(coluna, selecao)[:limite]
+        permitidas = self._permitidas(coluna, selecao)
+        termo = normalizar_busca(termo)
+        if not termo:
+            posicoes = np.arange(len(self.opcoes[coluna])) if permitidas is None else np.flatnonzero(permitidas)
+            return [self.opcoes[coluna][p] for p in posicoes[:limite]]
+        ordem, chaves, texto, inicios = self._busca[coluna]
+        # Prefixo: faixa contígua das chaves ordenadas
+        prefixo = ordem[np.searchsorted(chaves, termo):np.searchsorted(chaves, termo + "\uffff")]
+        if permitidas is not None:
+            prefixo = prefixo[permitidas[prefixo]]
+        encontradas = sorted(prefixo[:limite].tolist())
+        # Substring: ocorrências no texto unido, mapeadas para a opção pelo início de cada chave
+        vistas = set(encontradas)
+        inicio = texto.find(termo)
+        while inicio >= 0 and len(encontradas) < limite:
+            posicao = int(np.searchsorted(inicios, inicio, side="right")) - 1
+            if posicao not in vistas and (permitidas is None or permitidas[posicao]):
+                vistas.add(posicao)
+                encontradas.append(posicao)
+            inicio = texto.find(termo, inicios[posicao + 1] if posicao + 1 < len(inicios) else len(texto))
+        return [self.opcoes[coluna][p] for p in encontradas]
+
+    def _permitidas(self, coluna: str, selecao: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Máscara sobre self.opcoes[coluna] das opções compatíveis com a seleção (None: todas)."""
+        linhas = self.linhas_selecionadas(selecao, exceto=coluna)
+        if linhas is None:
+            return None
+        posicoes = self._posicao[coluna][_presentes(self._codigos[coluna][linhas], len(self._valores[coluna]))]
+        permitidas = np.zeros(len(self.opcoes[coluna]), dtype=bool)
+        permitidas[posicoes[posicoes >= 0]] = True
+        return permitidas
@@ -0,0 +1,462 @@
+# app/data/ingestao.py
+
+import os
+import json
+import glob
+import hashlib
+import logging
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from data.cubo import DIMENSOES_CUBO, MEDIDAS_CUBO, fatos_mensais, somar_fatos_mensais
+from data.dataset import (
+    COLUNAS_CATEGORICAS,
+    LOTES_POR_SNAPSHOT,
+    PARTICIONAMENTO,
+    TRAVA_DATASET,
+    categorias_dataset,
+    gravar_lote,
+    gravar_particionado,
+    gravar_snapshot,
+    remover_meses,
+)
+from data.enriquecimento import (
+    CHAVES_MENSAL,
+    MEDIDAS_MENSAL,
+    agregado_mensal,
+    assinatura_enriquecimento,
+    enriquecer,
+    somar_agregado_mensal,
+    somar_ticket_medio,
+    ticket_medio_por_cliente,
+)
+from data.schema import COLUNA_LINHA, TIPOS_ARROW, aplicar_schema
+from utils.arquivos import caminho_temporario, gravar_atomico, publicar_arquivo, trava_exclusiva
+from utils.conversor import converter_para_parquet, impressao_digital
+
+logger = logging.getLogger(__name__)
+
+# Arquivos com prefixo "_" são ignorados pelo pyarrow ao ler o dataset
+NOME_LEDGER = "_ingestao.json"
+NOME_TICKET_MEDIO = "_ticket_medio.parquet"
+NOME_CATEGORIAS = "_categorias.json"
+NOME_MENSAL = "_mensal.parquet"
+NOME_CUBO = "_cubo.parquet"
+# Versão publicada = versão das exportações + número do último lote do ERP
+SEPARADOR_LOTES = "|lotes:"
+# COLUNA_LINHA das linhas de lotes: lote * LINHAS_POR_LOTE + posição no lote, depois
+# das linhas das exportações (numeradas de 0 dentro de cada mês)
+LINHAS_POR_LOTE = 10 ** 9
+
+
+def listar_fontes(caminho: str) -> List[str]:
+    """Arquivos de origem: o próprio .xlsx ou todos os .xlsx de um diretório (ordem alfabética)."""
+    if os.path.isdir(caminho):
+        return sorted(
+            f for f in glob.glob(os.path.join(caminho, "*.xlsx"))
+            if not os.path.basename(f).startswith("~$")
+        )
+    return [caminho]
+
+
+def impressao_fontes(caminho: str) -> str:
+    """Versão do conjunto de arquivos de origem, só por metadados."""
+    return "|".join(impressao_digital(f) for f in listar_fontes(caminho))
+
+
+def versao_fontes(caminho: str) -> str:
+    """Versão que o dataset terá após ingerir a origem atual."""
+    return f"{impressao_fontes(caminho)}|{assinatura_enriquecimento()}"
+
+
+def caminho_dataset(caminho: str) -> str:
+    """Diretório do dataset particionado correspondente à origem."""
+    if os.path.isdir(caminho):
+        return os.path.join(caminho, "base.dataset")
+    return caminho.replace(".xlsx", ".dataset")
+
+
+def numerar_linhas_mes(df_mes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renumera COLUNA_LINHA de 0 dentro do mês, mantendo a ordem da planilha.
+
+    Assim o digest do mês não muda quando linhas de outros meses do mesmo
+    arquivo entram ou saem.
+    """
+    if COLUNA_LINHA not in df_mes.columns:
+        return df_mes
+    posicao = df_mes[COLUNA_LINHA].rank(method="first").astype("int64") - 1
+    return df_mes.assign(**{COLUNA_LINHA: posicao})
+
+
+def digest_mes(df_mes: pd.DataFrame) -> str:
+    """Resumo do conteúdo de um mês, para detectar se ele mudou entre exportações."""
+    hashes = pd.util.hash_pandas_object(df_mes, index=False).to_numpy()
+    return hashlib.md5(hashes.tobytes()).hexdigest()
+
+
+def _ledger_vazio() -> Dict:
+    return {"enriquecimento": assinatura_enriquecimento(), "fontes": {}, "meses": {}}
+
+
+def _ler_ledger(diretorio: str) -> Dict:
+    caminho = os.path.join(diretorio, NOME_LEDGER)
+    if not os.path.exists(caminho):
+        return _ledger_vazio()
+    with open(caminho, "r") as f:
+        return json.load(f)
+
+
+def _gravar_ledger(diretorio: str, ledger: Dict) -> None:
+    gravar_atomico(os.path.join(diretorio, NOME_LEDGER), json.dumps(ledger, indent=2))
+
+
+def versao_publicada(caminho: str) -> Optional[str]:
+    """
+    Versão gravada pela última ingestão concluída, ou None se ainda não há dataset.
+
+    Depois de lotes do ERP, leva também o número do último lote.
+    """
+    diretorio = caminho_dataset(caminho)
+    with TRAVA_DATASET:
+        if not os.path.exists(os.path.join(diretorio, NOME_LEDGER)):
+            return None
+        ledger = _ler_ledger(diretorio)
+    versao = ledger.get("versao")
+    if versao is not None and ledger.get("lotes"):
+        versao += f"{SEPARADOR_LOTES}{ledger['lotes']}"
+    return versao
+
+
+def origem_da_versao(versao: Optional[str]) -> Optional[str]:
+    """Parte da versão publicada que corresponde às exportações (comparável a versao_fontes)."""
+    return None if versao is None else versao.split(SEPARADOR_LOTES)[0]
+
+
+def lotes_da_versao(versao: Optional[str]) -> int:
+    """Número do último lote do ERP contido na versão publicada (0 se nenhum)."""
+    if versao is None or SEPARADOR_LOTES not in versao:
+        return 0
+    return int(versao.split(SEPARADOR_LOTES)[1])
+
+
+def assinatura_ledger(caminho: str) -> Optional[Tuple[int, int]]:
+    """Identifica a gravação atual do ledger sem lê-lo (muda a cada ingestão ou lote)."""
+    try:
+        info = os.stat(os.path.join(caminho_dataset(caminho), NOME_LEDGER))
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_ino
+
+
+def meses_publicados(diretorio: str) -> Dict[str, str]:
+    """Digest de cada mês gravado no dataset, segundo o ledger, incluindo os lotes (vazio se não há dataset)."""
+    if not os.path.exists(os.path.join(diretorio, NOME_LEDGER)):
+        return {}
+    return {
+        mes: dono["digest"] + (f"+{dono['lotes']}" if "lotes" in dono else "")
+        for mes, dono in _ler_ledger(diretorio)["meses"].items()
+    }
+
+
+def _atualizar_ticket_medio(diretorio: str) -> None:
+    """Recalcula o ticket médio por cliente lendo só CLIENTE e VL.BRUTO das partições de VENDA."""
+    dataset = ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO)
+    vendas = dataset.to_table(
+        columns=["CLIENTE", "VL.BRUTO"], filter=ds.field("NATUREZA") == "VENDA"
+    ).to_pandas()
+    caminho = os.path.join(diretorio, NOME_TICKET_MEDIO)
+    temp = caminho_temporario(caminho)
+    ticket_medio_por_cliente(vendas).to_parquet(temp, index=False)
+    publicar_arquivo(temp, caminho)
+
+
+def _atualizar_mensal(diretorio: str) -> None:
+    """Recalcula o agregado mensal (mês x natureza x cliente) lendo só as colunas dele."""
+    dataset = ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO)
+    df = dataset.to_table(columns=CHAVES_MENSAL + MEDIDAS_MENSAL).to_pandas()
+    _gravar_parquet(agregado_mensal(df), os.path.join(diretorio, NOME_MENSAL))
+
+
+def _atualizar_cubo(diretorio: str) -> None:
+    """Recalcula os fatos do cubo mensal (loader.cubo_mensal) lendo só as colunas dele."""
+    dataset = ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO)
+    colunas = [c for c in DIMENSOES_CUBO + MEDIDAS_CUBO if c in dataset.schema.names]
+    df = dataset.to_table(columns=colunas).to_pandas()
+    _gravar_parquet(fatos_mensais(df), os.path.join(diretorio, NOME_CUBO))
+
+
+def _gravar_parquet(df: pd.DataFrame, caminho: str) -> None:
+    temp = caminho_temporario(caminho)
+    df.to_parquet(temp, index=False)
+    publicar_arquivo(temp, caminho)
+
+
+def _atualizar_categorias(diretorio: str) -> None:
+    """Grava a lista ordenada de valores de cada dimensão, usada como categorias estáveis."""
+    gravar_atomico(
+        os.path.join(diretorio, NOME_CATEGORIAS),
+        json.dumps(categorias_dataset(diretorio), ensure_ascii=False),
+    )
+
+
+def _reavaliar_fontes(ledger: Dict, meses_liberados: List[str], exceto: Optional[str] = None) -> bool:
+    """Marca para reprocessar os arquivos que também contêm meses que ficaram sem dono."""
+    marcou = False
+    for fonte, registro in ledger["fontes"].items():
+        if fonte != exceto and any(m in registro["meses"] for m in meses_liberados):
+            registro["parquet"] = None
+            marcou = True
+    return marcou
+
+
+def converter_fontes(
+    caminho: str,
+    aba: str = "Planilha1",
+    progresso: Optional[Callable[[str, int, Optional[int]], None]] = None,
+) -> Dict[str, str]:
+    """
+    Converte para Parquet os arquivos de origem que mudaram (a etapa demorada).
+
+    Não toca no dataset. `progresso` recebe (arquivo, linhas convertidas, total).
+    Retorna o caminho do Parquet de cada arquivo.
+    """
+    parquets = {}
+    for fonte in listar_fontes(caminho):
+        acompanhar = None
+        if progresso:
+            acompanhar = lambda linhas, total, fonte=fonte: progresso(fonte, linhas, total)
+        parquets[fonte] = converter_para_parquet(fonte, aba=aba, progresso=acompanhar)
+    return parquets
+
+
+def ingerir(caminho: str, aba: str = "Planilha1") -> str:
+    """
+    Atualiza o dataset particionado com o que mudou nas exportações do ERP.
+
+    `caminho` é um .xlsx ou um diretório de exportações mensais. Cada arquivo é
+    convertido (só se mudou) e enriquecido; para cada mês é calculado um digest
+    do conteúdo. Apenas os meses novos ou alterados têm suas partições
+    regravadas, e meses que deixaram de existir na origem são removidos. Se o
+    mesmo mês aparece em mais de um arquivo, vale o último em ordem alfabética.
+
+    O ledger (<dataset>/_ingestao.json) registra, por arquivo, a versão do
+    Parquet convertido e os digests dos meses, e por mês o arquivo dono. Uma
+    mudança na assinatura do enriquecimento descarta o ledger e reconstrói tudo.
+
+    A conversão dos arquivos acontece antes de regravar qualquer partição; a
+    regravação segura TRAVA_DATASET, de modo que leitores do processo veem o
+    dataset anterior ou o novo, nunca uma mistura, e uma trava de arquivo
+    (<dataset>.lock), para que dois processos não regravem partições ao mesmo
+    tempo. Ao final, regrava o snapshot Arrow lido pelo loader
+    (<partição>/_snapshot.arrow) das partições regravadas ou com lotes
+    pendentes. Retorna o diretório do dataset.
+    """
+    versao = versao_fontes(caminho)
+    converter_fontes(caminho, aba=aba)
+    with TRAVA_DATASET, trava_exclusiva(caminho_dataset(caminho) + ".lock"):
+        return _aplicar_fontes(caminho, aba, versao)
+
+
+def _aplicar_fontes(caminho: str, aba: str, versao: str) -> str:
+    diretorio = caminho_dataset(caminho)
+    ledger = _ler_ledger(diretorio) if os.path.exists(diretorio) else _ledger_vazio()
+    if ledger.get("enriquecimento") != assinatura_enriquecimento():
+        logger.info("🧮 Lógica de enriquecimento mudou; reconstruindo o dataset completo.")
+        if os.path.exists(diretorio):
+            shutil.rmtree(diretorio)
+        ledger = _ledger_vazio()
+    os.makedirs(diretorio, exist_ok=True)
+
+    fontes = listar_fontes(caminho)
+    alterou = False
+
+    # Arquivos que saíram do diretório levam seus meses junto
+    for fonte in list(ledger["fontes"]):
+        if fonte not in fontes:
+            meses = [m for m, dono in ledger["meses"].items() if dono["fonte"] == fonte]
+            remover_meses(diretorio, meses)
+            for mes in meses:
+                del ledger["meses"][mes]
+            del ledger["fontes"][fonte]
+            _reavaliar_fontes(ledger, meses)
+            alterou = True
+            logger.info("Ingestão: %s removido (%d meses).", fonte, len(meses))
+
+    # Repete enquanto algum mês liberado precisar voltar a um arquivo anterior
+    pendente = True
+    while pendente:
+        pendente = False
+        for ordem, fonte in enumerate(fontes):
+            caminho_parquet = converter_para_parquet(fonte, aba=aba)
+            versao_parquet = impressao_digital(caminho_parquet)
+            registro = ledger["fontes"].get(fonte)
+            if registro and registro["parquet"] == versao_parquet:
+                continue
+
+            df = enriquecer(pd.read_parquet(caminho_parquet))
+            grupos = {mes: numerar_linhas_mes(df_mes) for mes, df_mes in df.groupby("ANO_MES", sort=True)}
+            digests = {mes: digest_mes(df_mes) for mes, df_mes in grupos.items()}
+            posteriores = set(fontes[ordem + 1:])
+
+            regravar, remover = [], []
+            for mes, digest in digests.items():
+                dono = ledger["meses"].get(mes)
+                if dono and dono["fonte"] in posteriores:
+                    continue
+                if dono and dono["fonte"] == fonte and dono["digest"] == digest:
+                    continue
+                regravar.append(mes)
+            for mes in (registro or {}).get("meses", {}):
+                dono = ledger["meses"].get(mes)
+                if mes not in digests and dono and dono["fonte"] == fonte:
+                    remover.append(mes)
+
+            remover_meses(diretorio, regravar + remover)
+            if regravar:
+                gravar_particionado(pd.concat([grupos[m] for m in regravar]), diretorio)
+            for mes in regravar:
+                ledger["meses"][mes] = {"fonte": fonte, "digest": digests[mes]}
+            for mes in remover:
+                del ledger["meses"][mes]
+            ledger["fontes"][fonte] = {"parquet": versao_parquet, "meses": digests}
+            pendente = _reavaliar_fontes(ledger, remover, exceto=fonte) or pendente
+            alterou = alterou or bool(regravar or remover)
+            logger.info(
+                "Ingestão de %s: %d meses regravados, %d removidos, %d inalterados.",
+                os.path.basename(fonte), len(regravar), len(remover), len(digests) - len(regravar),
+            )
+
+    if alterou or not os.path.exists(os.path.join(diretorio, NOME_TICKET_MEDIO)):
+        _atualizar_ticket_medio(diretorio)
+    if alterou or not os.path.exists(os.path.join(diretorio, NOME_CATEGORIAS)):
+        _atualizar_categorias(diretorio)
+    if alterou or not os.path.exists(os.path.join(diretorio, NOME_MENSAL)):
+        _atualizar_mensal(diretorio)
+    if alterou or not os.path.exists(os.path.join(diretorio, NOME_CUBO)):
+        _atualizar_cubo(diretorio)
+    gravar_snapshot(diretorio, ledger.get("lotes", 0))
+    ledger["versao"] = versao
+    _gravar_ledger(diretorio, ledger)
+    return diretorio
+
+
+def ingerir_lote(caminho: str, linhas: pd.DataFrame) -> Dict:
+    """
+    Acrescenta ao dataset um lote de linhas de nota fiscal enviadas pelo ERP.
+
+    As linhas têm as mesmas colunas da base Excel; passam pelo schema e pelo
+    enriquecimento e são gravadas como arquivos novos nas partições dos seus
+    meses, sem reconverter o histórico. Ticket médio, agregado mensal, cubo
+    mensal e categorias são somados com o lote, e o ledger passa a registrar o número
+    do lote, o que publica uma versão nova. O custo acompanha o tamanho do
+    lote; a cada LOTES_POR_SNAPSHOT lotes, as partições tocadas têm o
+    snapshot regravado. Se uma exportação posterior regravar o mês, as linhas do lote dão
+    lugar às da exportação.
+
+    Retorna um resumo: número do lote, linhas aceitas e rejeitadas, meses
+    afetados, colunas ignoradas e a versão publicada.
+    """
+    diretorio = caminho_dataset(caminho)
+    with TRAVA_DATASET, trava_exclusiva(diretorio + ".lock"):
+        if not os.path.exists(os.path.join(diretorio, NOME_LEDGER)):
+            raise FileNotFoundError("A base ainda não foi gerada; ingira uma exportação antes de enviar lotes.")
+        schema = ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO).schema
+        # Colunas fora do SCHEMA_VENDAS mantêm o tipo que já têm no dataset
+        tipos = {c.name: nome for c in schema for nome, t in TIPOS_ARROW.items() if c.type == t}
+        df, relatorio = aplicar_schema(linhas, tipos=tipos)
+        if relatorio["colunas_ausentes"]:
+            raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(relatorio['colunas_ausentes'])}")
+        resumo = {
+            "lote": None, "linhas": len(df), "rejeitadas": relatorio["linhas_rejeitadas"], "meses": [],
+            "colunas_ignoradas": [c for c in df.columns if c not in schema.names],
+        }
+        if df.empty:
+            resumo["versao"] = versao_publicada(caminho)
+            return resumo
+
+        df = enriquecer(df)
+        ledger = _ler_ledger(diretorio)
+        lote = ledger.get("lotes", 0) + 1
+        df[COLUNA_LINHA] = lote * LINHAS_POR_LOTE + np.arange(len(df), dtype=np.int64)
+        gravar_lote(df, diretorio, lote)
+        for mes, df_mes in df.groupby("ANO_MES", sort=True):
+            dono = ledger["meses"].setdefault(mes, {"fonte": None, "digest": ""})
+            dono["lotes"] = hashlib.md5((dono.get("lotes", "") + digest_mes(df_mes)).encode()).hexdigest()
+            resumo["meses"].append(mes)
+        _somar_lote_agregados(diretorio, df)
+        gravar_snapshot(diretorio, lote, meses=resumo["meses"], lotes_pendentes=LOTES_POR_SNAPSHOT)
+        ledger["lotes"] = lote
+        _gravar_ledger(diretorio, ledger)
+    resumo["lote"] = lote
+    resumo["versao"] = versao_publicada(caminho)
+    logger.info("Lote %d: %d linhas em %s.", lote, len(df), ", ".join(resumo["meses"]))
+    return resumo
+
+
+def _somar_lote_agregados(diretorio: str, df: pd.DataFrame) -> None:
+    """Atualiza ticket médio, agregado mensal, cubo mensal e categorias só com as linhas do lote."""
+    caminho = os.path.join(diretorio, NOME_TICKET_MEDIO)
+    atual = pd.read_parquet(caminho) if os.path.exists(caminho) else None
+    if atual is None or "SOMA" not in atual.columns:
+        _atualizar_ticket_medio(diretorio)
+    else:
+        vendas = df[df["NATUREZA"] == "VENDA"]
+        _gravar_parquet(somar_ticket_medio(atual, ticket_medio_por_cliente(vendas)), caminho)
+
+    caminho = os.path.join(diretorio, NOME_MENSAL)
+    if os.path.exists(caminho):
+        _gravar_parquet(somar_agregado_mensal(pd.read_parquet(caminho), agregado_mensal(df)), caminho)
+    else:
+        _atualizar_mensal(diretorio)
+
+    caminho = os.path.join(diretorio, NOME_CUBO)
+    if os.path.exists(caminho):
+        _gravar_parquet(somar_fatos_mensais(pd.read_parquet(caminho), fatos_mensais(df)), caminho)
+    else:
+        _atualizar_cubo(diretorio)
+
+    categorias = ler_categorias(diretorio)
+    alterou = False
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            novos = set(df[coluna].dropna()) - set(categorias.get(coluna, []))
+            if novos:
+                # Valores novos vão para o fim, como em aplicar_categorias: os códigos existentes não mudam
+                categorias[coluna] = categorias.get(coluna, []) + sorted(novos)
+                alterou = True
+    if alterou:
+        gravar_atomico(os.path.join(diretorio, NOME_CATEGORIAS), json.dumps(categorias, ensure_ascii=False))
+
+
+def ler_mensal(diretorio: str) -> pd.DataFrame:
+    """Agregado mensal (ANO_MES, NATUREZA, CLIENTE → VL.BRUTO, QTDE) mantido junto ao dataset."""
+    caminho = os.path.join(diretorio, NOME_MENSAL)
+    if not os.path.exists(caminho):
+        _atualizar_mensal(diretorio)
+    return pd.read_parquet(caminho)
+
+
+def ler_cubo(diretorio: str) -> pd.DataFrame:
+    """Fatos do cubo mensal (DIMENSOES_CUBO → somas, contagens e linhas) mantidos junto ao dataset."""
+    caminho = os.path.join(diretorio, NOME_CUBO)
+    if not os.path.exists(caminho):
+        _atualizar_cubo(diretorio)
+    return pd.read_parquet(caminho)
+
+
+def ler_ticket_medio(diretorio: str) -> pd.DataFrame:
+    """Tabela CLIENTE → TICKET_MEDIO mantida junto ao dataset."""
+    return pd.read_parquet(os.path.join(diretorio, NOME_TICKET_MEDIO))
+
+
+def ler_categorias(diretorio: str) -> Dict[str, List[str]]:
+    """Categorias estáveis das colunas de dimensão (gera o arquivo em datasets anteriores a ele)."""
+    if not os.path.exists(os.path.join(diretorio, NOME_CATEGORIAS)):
+        _atualizar_categorias(diretorio)
+    with open(os.path.join(diretorio, NOME_CATEGORIAS), "r", encoding="utf-8") as f:
+        return json.load(f)
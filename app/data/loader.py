@@ -1,16 +1,159 @@
 # app/data/loader.py
 
 import os
+import numpy as np
 import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
-from utils.conversor import converter_para_parquet
+from data.atualizacao import AtualizadorBase
+from data.banco import Filtros, agregar_banco, consultar_banco, sincronizar_banco
+from data.cache import CacheLRU
+from data.cubo import CuboMensal
+from data.enriquecimento import CHAVES_MENSAL, MEDIDAS_MENSAL, aplicar_ticket_medio
+from data.dataset import TRAVA_DATASET, Data, aplicar_categorias, ler_lotes, ler_particionado
+from data.indice_filtros import COLUNAS_FILTRO, IndiceFiltros
+from data.ingestao import (
+    LINHAS_POR_LOTE,
+    caminho_dataset,
+    ler_categorias,
+    ler_cubo,
+    ler_mensal,
+    ler_ticket_medio,
+    lotes_da_versao,
+    origem_da_versao,
+)
+from data.natureza import carregar_regras, categorias_natureza
+from data.processor import Agrupador, fatiar_periodo
+from data.rollup import Rollup
+from data.schema import COLUNA_LINHA
+from data.top_n import Ranking, top_n
 
 load_dotenv()
+# Um arquivo .xlsx ou um diretório com as exportações mensais do ERP
 CAMINHO_EXCEL = os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
 ABA_EXCEL = os.getenv("ABA_EXCEL", "Planilha1")
+# "sqlite" consulta um banco local (filtros e agregações em SQL) em vez do Parquet
+BACKEND_DADOS = os.getenv("BACKEND_DADOS", "parquet")
+# "pyarrow" mantém as colunas em memória Arrow (strings sem cópia para objetos Python)
+DTYPE_BACKEND = os.getenv("DTYPE_BACKEND", "numpy")
+CACHE_DADOS_MAX_MB = int(os.getenv("CACHE_DADOS_MAX_MB", "2048"))
+CACHE_FILTRADOS_MAX_MB = int(os.getenv("CACHE_FILTRADOS_MAX_MB", "256"))
+
+# Cache único por processo: todas as sessões do Streamlit compartilham a mesma
+# base carregada, indexada pela impressão digital do arquivo de origem.
+cache_dados = CacheLRU("dados", CACHE_DADOS_MAX_MB * 1024 * 1024)
+# Linhas selecionadas por período + filtros (posições), compartilhadas entre páginas e sessões
+cache_filtrados = CacheLRU("filtrados", CACHE_FILTRADOS_MAX_MB * 1024 * 1024)
+
+
+def _ao_publicar(anterior: Optional[str], publicada: str) -> None:
+    """
+    Nova versão do dataset: atualiza o banco (se usado) e o cache.
+
+    Se a versão nova só acrescenta lotes do ERP à anterior, as bases lidas do
+    Parquet que estão em cache recebem as linhas desses lotes (_migrar_lotes);
+    nos demais casos as versões antigas são descartadas.
+    """
+    if BACKEND_DADOS == "sqlite":
+        sincronizar_banco(caminho_dataset(CAMINHO_EXCEL))
+    elif (
+        anterior is not None and origem_da_versao(anterior) == origem_da_versao(publicada)
+        and lotes_da_versao(publicada) > lotes_da_versao(anterior)
+    ):
+        _migrar_lotes(anterior, publicada)
+        return
+    cache_dados.invalidar()
+    cache_filtrados.invalidar()
+
+
+def _migrar_lotes(anterior: str, publicada: str) -> None:
+    """
+    Leva para `publicada` as bases de `anterior` em cache, somando só as linhas dos lotes novos.
+
+    Vale para as leituras ordenadas por EMISSAO: as linhas do lote entram
+    depois das notas do mesmo dia (COLUNA_LINHA dos lotes vem depois da das
+    exportações), na mesma ordem de uma leitura nova. As posições de
+    filtrar_base são remapeadas e somadas às das linhas novas. Agregados,
+    índice de filtros e consultas ao cubo são descartados (remontá-los parte
+    das bases migradas ou dos fatos mensais, sem reler as notas).
+    """
+    diretorio = caminho_dataset(CAMINHO_EXCEL)
+    with TRAVA_DATASET:
+        categorias = ler_categorias(diretorio)
+        ticket_medio = ler_ticket_medio(diretorio)
+    # origem_linhas anterior -> bases migradas e posições das linhas acrescentadas
+    migradas: Dict[tuple, List[Tuple[pd.DataFrame, np.ndarray]]] = {}
+
+    def migrar_base(chave, df):
+        versao, consulta = chave
+        if (
+            versao != anterior or not isinstance(df, pd.DataFrame)
+            or df.attrs.get("ordenado_por") != "EMISSAO" or "origem_linhas" not in df.attrs
+        ):
+            return None
+        nova, inseridas = _somar_lotes(df, diretorio, anterior, publicada, categorias, ticket_medio)
+        migradas.setdefault(df.attrs["origem_linhas"], []).append((nova, inseridas))
+        return (publicada, consulta), nova
+
+    def migrar_posicoes(chave, posicoes):
+        origem, variante, periodo, recorte, filtros = chave
+        if variante or origem not in migradas:
+            # Páginas com variante filtram outra coluna que não a da base em cache
+            return None
+        usadas = {c for c, _ in (recorte or ()) + (filtros or ())} | ({"EMISSAO"} if periodo else set())
+        for nova, inseridas in migradas[origem]:
+            if usadas <= set(nova.columns):
+                break
+        else:
+            return None
+        mapa = np.delete(np.arange(len(nova)), inseridas)
+        novas = _filtrar(nova.take(inseridas), _filtros_da_chave(filtros), periodo, _filtros_da_chave(recorte))
+        posicoes = np.sort(np.concatenate([mapa[posicoes], novas.index.to_numpy()])).astype(np.int32)
+        return (nova.attrs["origem_linhas"], variante, periodo, recorte, filtros), posicoes
+
+    cache_dados.migrar(migrar_base)
+    cache_filtrados.migrar(migrar_posicoes)
+
+
+def _somar_lotes(
+    df: pd.DataFrame,
+    diretorio: str,
+    anterior: str,
+    publicada: str,
+    categorias: Dict[str, List[str]],
+    ticket_medio: pd.DataFrame,
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Base `df` de `anterior` com as linhas dos lotes até `publicada`, e as posições dessas linhas."""
+    _, _, ordenado_por, data_ini, data_fim, naturezas, filtros = df.attrs["origem_linhas"]
+    colunas = [c for c in df.columns if c != "TICKET_MEDIO"]
+    with TRAVA_DATASET:
+        lidas = ler_lotes(
+            diretorio, lotes_da_versao(anterior), data_ini=data_ini, data_fim=data_fim, naturezas=naturezas,
+            colunas=colunas + [COLUNA_LINHA], categorias=categorias, dtype_backend=DTYPE_BACKEND,
+        )
+    # Lotes gravados depois de `publicada` ficam para a próxima versão
+    lidas = lidas[lidas[COLUNA_LINHA] < (lotes_da_versao(publicada) + 1) * LINHAS_POR_LOTE]
+    if filtros:
+        lidas = Agrupador(lidas).filtrar(_filtros_da_chave(filtros))
+    lidas = lidas.sort_values(["EMISSAO", COLUNA_LINHA], kind="stable", ignore_index=True)[colunas]
+    antigas = aplicar_categorias(df[colunas].copy(deep=False), categorias)
+    # Cada linha nova entra depois das notas do mesmo dia já na base
+    antes = np.searchsorted(antigas["EMISSAO"].to_numpy(), lidas["EMISSAO"].to_numpy(), side="right")
+    ordem = np.insert(np.arange(len(antigas)), antes, np.arange(len(antigas), len(antigas) + len(lidas)))
+    nova = pd.concat([antigas, lidas], ignore_index=True).take(ordem).reset_index(drop=True)
+    if "TICKET_MEDIO" in df.columns:
+        nova = aplicar_ticket_medio(nova, ticket_medio)[list(df.columns)]
+    nova.attrs = dict(df.attrs, versao_dados=publicada)
+    nova.attrs["origem_linhas"] = (publicada, len(nova), ordenado_por, data_ini, data_fim, naturezas, filtros)
+    return nova, antes + np.arange(len(lidas))
+
+
+# Converte exportações novas em segundo plano e chama _ao_publicar ainda na thread de fundo
+atualizador = AtualizadorBase(CAMINHO_EXCEL, ABA_EXCEL, ao_publicar=_ao_publicar)
 
 
 def classificar_natureza(tp: str, desc: str) -> str:
+    """Classificação linha a linha (referência do benchmark do classificador vetorizado)."""
     if isinstance(desc, str) and desc.upper().startswith("VERBA"):
         return "INVESTIMENTO"
     elif tp in ["VS", "VJ", "V3", "VC"]:
@@ -22,34 +165,368 @@ def classificar_natureza(tp: str, desc: str) -> str:
     else:
         return "OUTROS"
 
-def carregar_dados() -> pd.DataFrame:
-    """Carrega os dados do Parquet convertido da planilha Excel."""
-    caminho_parquet = converter_para_parquet(CAMINHO_EXCEL, aba=ABA_EXCEL)
-    df = pd.read_parquet(caminho_parquet)
+def carregar_dados(
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    colunas: Optional[Iterable[str]] = None,
+    filtros: Optional[Filtros] = None,
+) -> pd.DataFrame:
+    """
+    Retorna a base de vendas a partir do cache do processo.
 
-    df['EMISSAO'] = pd.to_datetime(df['EMISSAO'], errors='coerce')
-    df['VL.BRUTO'] = pd.to_numeric(df['VL.BRUTO'], errors='coerce')
-    df['QTDE'] = pd.to_numeric(df['QTDE'], errors='coerce')
+    Sem argumentos, devolve a base completa. Com período e/ou naturezas, lê
+    apenas as partições correspondentes do dataset (predicate pushdown); com
+    `colunas`, lê apenas essas colunas do Parquet (cada página declara as suas).
+    `filtros` (formato do Agrupador) vira WHERE no backend SQLite; no Parquet,
+    é aplicado pelo Agrupador após a leitura.
+    Quando a origem muda, a conversão roda em segundo plano e continua sendo
+    servida a versão anterior até a nova ser publicada. O DataFrame devolvido é
+    uma cópia rasa: atribuir colunas não altera a versão compartilhada.
+    """
+    versao = atualizador.versao_disponivel()
+    consulta = _chave_linhas(data_ini, data_fim, naturezas, filtros) + (
+        None if colunas is None else tuple(sorted(set(colunas))),
+    )
+    df = cache_dados.obter(
+        (versao, consulta), lambda: _ler_base(versao, data_ini, data_fim, naturezas, colunas, filtros)
+    )
+    return df.copy(deep=False)
 
-    if 'PRECO_UNIT' in df.columns:
-        df['PRECO_UNIT'] = pd.to_numeric(df['PRECO_UNIT'], errors='coerce')
 
-    df['ANO_MES'] = df['EMISSAO'].dt.to_period("M").astype(str)
+def agregar_dados(
+    por: List[str],
+    medidas: Optional[Dict[str, str]] = None,
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    filtros: Optional[Filtros] = None,
+) -> pd.DataFrame:
+    """
+    Base agregada por `por` (medidas no formato de DataFrame.agg), via cache do processo.
 
-    df.dropna(subset=['CLIENTE', 'COD.PRD', 'QTDE', 'VL.BRUTO', 'EMISSAO'], inplace=True)
+    Somas de VL.BRUTO e QTDE por mês, natureza e/ou cliente, sem período nem
+    filtros, saem do agregado mensal mantido pela ingestão (atualizado a cada
+    lote do ERP). Fora disso, no backend SQLite o GROUP BY roda no banco e só
+    as linhas agregadas são lidas; no Parquet, sem período e só com colunas
+    do cubo, reagrupa o cubo mensal da versão; senão, lê as colunas
+    necessárias e agrupa com o pandas. Sem medidas, devolve as combinações
+    distintas de `por`.
+    """
+    versao = atualizador.versao_disponivel()
+    consulta = (
+        "agregado", tuple(por), tuple(sorted((medidas or {}).items())),
+        None if data_ini is None else str(pd.Timestamp(data_ini)),
+        None if data_fim is None else str(pd.Timestamp(data_fim)),
+        None if naturezas is None else tuple(sorted(naturezas)),
+        _chave_filtros(filtros),
+    )
+    df = cache_dados.obter(
+        (versao, consulta),
+        lambda: _agregar_base(versao, por, medidas or {}, data_ini, data_fim, naturezas, filtros),
+    )
+    return df.copy(deep=False)
 
-    # ✅ Aplica a classificação de natureza (sem filtrar TP)
-    df["NATUREZA"] = df.apply(lambda row: classificar_natureza(row["TP"], row["DESC"]), axis=1)
 
-    # ✅ Calcula ticket médio apenas para vendas
-    df["TICKET_MEDIO"] = None
-    if not df[df["NATUREZA"] == "VENDA"].empty:
-        df.loc[df["NATUREZA"] == "VENDA", "TICKET_MEDIO"] = (
-            df[df["NATUREZA"] == "VENDA"]
-            .groupby("CLIENTE")["VL.BRUTO"]
-            .transform("sum") / df[df["NATUREZA"] == "VENDA"]
-            .groupby("CLIENTE")["VL.BRUTO"]
-            .transform("count")
-        )
+def indice_filtros() -> IndiceFiltros:
+    """Opções dos filtros da barra lateral da versão disponível, calculadas uma vez por versão."""
+    versao = atualizador.versao_disponivel()
+    return cache_dados.obter(
+        (versao, ("indice_filtros",)), lambda: IndiceFiltros(carregar_dados(colunas=COLUNAS_FILTRO))
+    )
+
+
+def cubo_mensal(versao: Optional[str] = None) -> CuboMensal:
+    """
+    Cubo mensal da versão (por padrão, a disponível), montado uma vez por versão.
+
+    Vem dos fatos que a ingestão mantém junto ao dataset (somados a cada lote
+    do ERP), não das notas: uma versão nova não relê o histórico.
+    """
+    versao = versao or atualizador.versao_disponivel()
+    return cache_dados.obter((versao, ("cubo_mensal",)), _ler_cubo)
+
+
+def _ler_cubo() -> CuboMensal:
+    diretorio = caminho_dataset(CAMINHO_EXCEL)
+    with TRAVA_DATASET:
+        fatos = ler_cubo(diretorio)
+        categorias = ler_categorias(diretorio)
+    fatos = aplicar_categorias(fatos, categorias)
+    fatos["NATUREZA"] = pd.Categorical(fatos["NATUREZA"], categories=categorias_natureza(carregar_regras()))
+    return CuboMensal.dos_fatos(fatos)
+
+
+def consultar_cubo(
+    versao: str,
+    por: List[str],
+    medidas: Dict[str, str],
+    selecoes: Optional[List[Filtros]] = None,
+    meses: Optional[Tuple[str, str]] = None,
+) -> pd.DataFrame:
+    """Agregação pelo cubo mensal da versão (CuboMensal.consultar), guardada no cache de filtrados."""
+    chave = (
+        ("cubo", versao), tuple(por), tuple(medidas.items()), meses,
+        tuple(_chave_filtros(s) for s in selecoes or []),
+    )
+    resultado = cache_filtrados.obter(
+        chave, lambda: cubo_mensal(versao).consultar(por, medidas, selecoes, meses)
+    )
+    return resultado.copy(deep=False)
+
+
+def ranking_cubo(
+    versao: str,
+    rankings: List[Ranking],
+    k: int,
+    selecoes: Optional[List[Filtros]] = None,
+    meses: Optional[Tuple[str, str]] = None,
+) -> Dict[Ranking, pd.DataFrame]:
+    """Os k maiores totais de cada (dimensão, medida) pelo cubo mensal da versão (top_n), no cache de filtrados."""
+    chave = (
+        ("top_n", versao), tuple(rankings), k, meses,
+        tuple(_chave_filtros(s) for s in selecoes or []),
+    )
+    resultado = cache_filtrados.obter(
+        chave, lambda: top_n(cubo_mensal(versao).selecionar(selecoes, meses), rankings, k)
+    )
+    return {par: top.copy(deep=False) for par, top in resultado.items()}
 
-    return df
\ No newline at end of file
+
+def rollup_cubo(
+    versao: str,
+    medidas: List[str],
+    niveis: List[str],
+    selecoes: Optional[List[Filtros]] = None,
+    meses: Optional[Tuple[str, str]] = None,
+) -> Rollup:
+    """Níveis da hierarquia (Rollup) a partir do cubo mensal da versão, no cache de filtrados."""
+    chave = (
+        ("rollup", versao), tuple(medidas), tuple(niveis), meses,
+        tuple(_chave_filtros(s) for s in selecoes or []),
+    )
+    return cache_filtrados.obter(
+        chave, lambda: Rollup(cubo_mensal(versao).selecionar(selecoes, meses), medidas, niveis)
+    )
+
+
+def origem_linhas(df: pd.DataFrame) -> Optional[tuple]:
+    """
+    Identificação das linhas lidas por carregar_dados (versão, quantidade, ordem e consulta).
+
+    None se `df` não é uma leitura do loader ou já foi recortado/reordenado.
+    """
+    origem = df.attrs.get("origem_linhas")
+    if origem is None or not df.index.equals(pd.RangeIndex(origem[1])):
+        return None
+    return origem
+
+
+def filtrar_base(
+    df: pd.DataFrame,
+    filtros: Optional[Filtros] = None,
+    periodo: Optional[Tuple[Data, Data]] = None,
+    recorte: Optional[Filtros] = None,
+    variante: str = "",
+) -> pd.DataFrame:
+    """
+    Linhas de `df` no período (inclusive), no `recorte` da página e nos `filtros`, via cache do processo.
+
+    `df` é uma base devolvida por carregar_dados. O cache guarda só as
+    posições das linhas selecionadas, indexadas pelas linhas lidas (versão,
+    período, naturezas e filtros da leitura), pelo período, pelo recorte e
+    pelos filtros normalizados: páginas que leem as mesmas linhas e sessões
+    com o mesmo estado dos filtros não refazem a filtragem. Páginas que trocam
+    uma coluna de filtro antes de filtrar (ex.: CLIENTE por CLIENTE_NORM)
+    informam isso em `variante`. Outros DataFrames são filtrados sem cache.
+    """
+    origem = origem_linhas(df)
+    if origem is None:
+        return _filtrar(df, filtros, periodo, recorte)
+    chave = (
+        origem, variante,
+        None if periodo is None else tuple(str(pd.Timestamp(d)) for d in periodo),
+        _chave_filtros(recorte), _chave_filtros(filtros),
+    )
+    posicoes = cache_filtrados.obter(
+        chave, lambda: _filtrar(df, filtros, periodo, recorte).index.to_numpy().astype(np.int32)
+    )
+    if len(posicoes) == len(df):
+        return df.copy(deep=False)
+    if len(posicoes) and posicoes[-1] - posicoes[0] + 1 == len(posicoes):
+        # Faixa contínua (só o período restringe): recorte sem cópia
+        return df.iloc[posicoes[0]:posicoes[-1] + 1].copy(deep=False)
+    return df.take(posicoes)
+
+
+def _filtrar(
+    df: pd.DataFrame,
+    filtros: Optional[Filtros],
+    periodo: Optional[Tuple[Data, Data]],
+    recorte: Optional[Filtros],
+) -> pd.DataFrame:
+    if periodo is not None:
+        df = fatiar_periodo(df, *periodo)
+    for selecao in (recorte, filtros):
+        if selecao:
+            df = Agrupador(df).filtrar(selecao)
+    return df
+
+
+def _cubo_responde(
+    versao: str,
+    por: List[str],
+    medidas: Dict[str, str],
+    naturezas: Optional[Iterable[str]],
+    filtros: Optional[Filtros],
+) -> bool:
+    """Se o cubo mensal da versão responde à agregação (colunas e medidas do cubo)."""
+    usadas = list(por) + [c for c, v in (filtros or {}).items() if v is not None]
+    if naturezas is not None:
+        usadas.append("NATUREZA")
+    return cubo_mensal(versao).responde(usadas, medidas)
+
+
+def _chave_linhas(
+    data_ini: Optional[Data],
+    data_fim: Optional[Data],
+    naturezas: Optional[Iterable[str]],
+    filtros: Optional[Filtros],
+) -> tuple:
+    """Parte da consulta que define quais linhas são lidas (as colunas não mudam as linhas)."""
+    return (
+        None if data_ini is None else str(pd.Timestamp(data_ini)),
+        None if data_fim is None else str(pd.Timestamp(data_fim)),
+        None if naturezas is None else tuple(sorted(naturezas)),
+        _chave_filtros(filtros),
+    )
+
+
+def _filtros_da_chave(chave) -> Optional[Filtros]:
+    """Volta os filtros normalizados por _chave_filtros ao formato do Agrupador."""
+    return {coluna: list(valor) if isinstance(valor, tuple) else valor for coluna, valor in chave or ()}
+
+
+def _chave_filtros(filtros: Optional[Filtros]):
+    """Filtros selecionados em forma ordenada e imutável, para a chave do cache."""
+    if not filtros:
+        return None
+    return tuple(sorted(
+        (coluna, tuple(sorted(valor, key=str)) if isinstance(valor, list) else valor)
+        for coluna, valor in filtros.items() if valor is not None
+    )) or None
+
+
+def invalidar_cache_dados() -> None:
+    """Descarta todas as versões da base mantidas em memória."""
+    cache_dados.invalidar()
+    cache_filtrados.invalidar()
+    atualizador.tentar_novamente()
+
+
+def _ler_base(
+    versao: str,
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    colunas: Optional[Iterable[str]] = None,
+    filtros: Optional[Filtros] = None,
+) -> pd.DataFrame:
+    """
+    Lê a versão publicada do dataset particionado (ou do banco SQLite).
+
+    As colunas derivadas já vêm gravadas; TICKET_MEDIO vem da tabela por
+    cliente mantida junto ao dataset e só é aplicado quando pedido (exige
+    CLIENTE e NATUREZA, que são lidas junto). Com EMISSAO, as linhas saem
+    ordenadas por ela (ordenação estável), para que o período das páginas
+    seja um recorte por busca binária (processor.fatiar_periodo); notas do
+    mesmo dia ficam na ordem da planilha (COLUNA_LINHA, lida só para isso
+    quando não é pedida).
+    """
+    diretorio = caminho_dataset(CAMINHO_EXCEL)
+    com_ticket = colunas is None or "TICKET_MEDIO" in colunas
+    sem_linha = False
+    if colunas is not None:
+        colunas = [c for c in colunas if c != "TICKET_MEDIO"]
+        if com_ticket:
+            colunas += ["CLIENTE", "NATUREZA"]
+        if "EMISSAO" in colunas and COLUNA_LINHA not in colunas:
+            colunas.append(COLUNA_LINHA)
+            sem_linha = True
+    with TRAVA_DATASET:
+        if BACKEND_DADOS == "sqlite":
+            sincronizar_banco(diretorio)
+            df = consultar_banco(
+                diretorio, data_ini=data_ini, data_fim=data_fim, naturezas=naturezas,
+                colunas=colunas, filtros=filtros, categorias=ler_categorias(diretorio),
+            )
+        else:
+            df = ler_particionado(
+                diretorio, data_ini=data_ini, data_fim=data_fim, naturezas=naturezas,
+                colunas=colunas, categorias=ler_categorias(diretorio), dtype_backend=DTYPE_BACKEND,
+            )
+            if filtros:
+                df = Agrupador(df).filtrar(filtros)
+        if COLUNA_LINHA in df.columns:
+            # Lote gravado depois de publicada `versao`: fica para a próxima (ver _migrar_lotes)
+            alem = df[COLUNA_LINHA].to_numpy() >= (lotes_da_versao(versao) + 1) * LINHAS_POR_LOTE
+            if alem.any():
+                df = df[~alem].reset_index(drop=True)
+        if com_ticket:
+            df = aplicar_ticket_medio(df, ler_ticket_medio(diretorio))
+    if "EMISSAO" in df.columns:
+        # Datasets gravados antes de COLUNA_LINHA: só a data, na ordem de leitura
+        ordem = ["EMISSAO", COLUNA_LINHA] if COLUNA_LINHA in df.columns else ["EMISSAO"]
+        df = df.sort_values(ordem, kind="stable", ignore_index=True)
+        if sem_linha and COLUNA_LINHA in df.columns:
+            df = df.drop(columns=COLUNA_LINHA)
+        df.attrs["ordenado_por"] = "EMISSAO"
+    df.attrs["versao_dados"] = versao
+    # Identifica as linhas lidas (quantidade e ordem) para o cache de filtrar_base
+    df.attrs["origem_linhas"] = (
+        (versao, len(df), df.attrs.get("ordenado_por")) + _chave_linhas(data_ini, data_fim, naturezas, filtros)
+    )
+    return df
+
+
+def _agregar_base(
+    versao: str,
+    por: List[str],
+    medidas: Dict[str, str],
+    data_ini: Optional[Data] = None,
+    data_fim: Optional[Data] = None,
+    naturezas: Optional[Iterable[str]] = None,
+    filtros: Optional[Filtros] = None,
+) -> pd.DataFrame:
+    diretorio = caminho_dataset(CAMINHO_EXCEL)
+    do_mensal = (
+        medidas and set(por) <= set(CHAVES_MENSAL)
+        and all(c in MEDIDAS_MENSAL and f == "sum" for c, f in medidas.items())
+        and data_ini is None and data_fim is None and not _chave_filtros(filtros)
+    )
+    if do_mensal:
+        with TRAVA_DATASET:
+            mensal = ler_mensal(diretorio)
+            categorias = ler_categorias(diretorio)
+        if naturezas is not None:
+            mensal = mensal[mensal["NATUREZA"].isin(list(naturezas))]
+        mensal = aplicar_categorias(mensal, categorias)
+        mensal["NATUREZA"] = pd.Categorical(mensal["NATUREZA"], categories=categorias_natureza(carregar_regras()))
+        df = mensal.groupby(por, observed=True, dropna=False)[list(medidas)].sum().reset_index()
+    elif BACKEND_DADOS == "sqlite":
+        with TRAVA_DATASET:
+            sincronizar_banco(diretorio)
+            df = agregar_banco(
+                diretorio, por, medidas, data_ini=data_ini, data_fim=data_fim, naturezas=naturezas,
+                filtros=filtros, categorias=ler_categorias(diretorio),
+            )
+    elif medidas and data_ini is None and data_fim is None and _cubo_responde(versao, por, medidas, naturezas, filtros):
+        selecoes = [{"NATUREZA": list(naturezas)} if naturezas is not None else None, filtros]
+        df = cubo_mensal(versao).consultar(por, medidas, selecoes, dropna=False)
+    else:
+        colunas = list(dict.fromkeys(list(por) + list(medidas) + [c for c, v in (filtros or {}).items() if v is not None]))
+        linhas = _ler_base(versao, data_ini, data_fim, naturezas, colunas, filtros)
+        agrupado = linhas.groupby(por, observed=True, dropna=False)
+        df = (agrupado.agg(medidas) if medidas else agrupado.size().to_frame()[[]]).reset_index()
+    df.attrs["versao_dados"] = versao
+    return df
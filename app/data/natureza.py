@@ -0,0 +1,65 @@
+# app/data/natureza.py
+
+import os
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tabela declarativa TP -> NATUREZA. Novos códigos de TP entram no JSON, sem
+# alterar o código; REGRAS_NATUREZA permite apontar para outro arquivo.
+CAMINHO_REGRAS = os.getenv(
+    "REGRAS_NATUREZA", os.path.join(os.path.dirname(__file__), "regras_natureza.json")
+)
+
+
+def carregar_regras(caminho: Optional[str] = None) -> Dict:
+    """Lê a tabela de regras de classificação de natureza."""
+    with open(caminho or CAMINHO_REGRAS, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def categorias_natureza(regras: Dict) -> List[str]:
+    """Ordem estável das categorias: prefixos, naturezas por TP e o valor padrão."""
+    categorias = []
+    for natureza in [*regras.get("prefixos_desc", {}).values(), *regras["tp"].keys(), regras["padrao"]]:
+        if natureza not in categorias:
+            categorias.append(natureza)
+    return categorias
+
+
+def classificar_natureza_vetorizado(
+    tp: pd.Series, desc: pd.Series, regras: Optional[Dict] = None
+) -> pd.Series:
+    """
+    Classifica a natureza de cada linha de uma só vez, sem apply linha a linha.
+
+    O TP é mapeado pela tabela de regras; descrições que começam com um dos
+    prefixos configurados (ex.: "VERBA") sobrepõem o resultado do TP. Retorna
+    uma coluna categórica alinhada ao índice de `tp`.
+    """
+    regras = regras or carregar_regras()
+    categorias = categorias_natureza(regras)
+    codigo = {natureza: i for i, natureza in enumerate(categorias)}
+
+    mapa_tp = {
+        tp_codigo: codigo[natureza]
+        for natureza, codigos in regras["tp"].items()
+        for tp_codigo in codigos
+    }
+    codigos = tp.map(mapa_tp).fillna(codigo[regras["padrao"]]).to_numpy(dtype=np.int8)
+
+    # O teste de prefixo roda só sobre as descrições distintas (poucos milhares)
+    # e é expandido para as linhas pelos códigos da fatoração; o código -1
+    # (descrição nula) cai na última posição, sempre False.
+    codigos_desc, descricoes = pd.factorize(desc)
+    for prefixo, natureza in regras.get("prefixos_desc", {}).items():
+        sobrepoe = np.array(
+            [isinstance(d, str) and d.upper().startswith(prefixo) for d in descricoes] + [False]
+        )
+        codigos[sobrepoe[codigos_desc]] = codigo[natureza]
+
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=categorias), index=tp.index, name="NATUREZA"
+    )
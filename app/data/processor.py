@@ -1,24 +1,112 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-from typing import Dict
+from typing import Dict, Optional, Tuple
+
+
+def mascara_filtro(serie: pd.Series, valor) -> np.ndarray:
+    """Máscara das linhas iguais a `valor` ou, se for lista, contidas nela (nulos ficam de fora)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Tabela indexada pelo código da categoria (+1 para o nulo): sem comparar strings por linha
+        valores = valor if isinstance(valor, list) else [valor]
+        codigos = serie.cat.categories.get_indexer(valores)
+        tabela = np.zeros(len(serie.cat.categories) + 1, dtype=bool)
+        tabela[codigos[codigos >= 0] + 1] = True
+        return tabela[serie.cat.codes.to_numpy() + 1]
+    if isinstance(valor, list):
+        # Suportar filtros múltiplos com isin
+        return serie.isin(valor).to_numpy(dtype=bool, na_value=False)
+    # Suportar filtros únicos com ==
+    return (serie == valor).to_numpy(dtype=bool, na_value=False)
+
+
+def ordenado_por(df: pd.DataFrame, coluna: str) -> bool:
+    """
+    Se as linhas estão em ordem crescente de `coluna`.
+
+    A marca gravada pelo loader (attrs["ordenado_por"]) só vale enquanto o
+    índice é o 0..n-1 da leitura: um recorte por máscara, ou uma reordenação,
+    muda os rótulos. Sem a marca, verifica a coluna.
+    """
+    indice = df.index
+    if (
+        df.attrs.get("ordenado_por") == coluna
+        and isinstance(indice, pd.RangeIndex) and indice.start == 0 and indice.step == 1
+    ):
+        return True
+    return df[coluna].is_monotonic_increasing
+
+
+def meses_do_periodo(df: pd.DataFrame, data_ini, data_fim, coluna: str = "EMISSAO") -> Optional[Tuple[str, str]]:
+    """
+    Primeiro e último ANO_MES do período, se ele cobre só meses inteiros da base.
+
+    Com a base ordenada pela data, o recorte de fatiar_periodo é contíguo;
+    ele equivale a um intervalo de meses quando não corta nenhum mês ao
+    meio (a linha antes e a depois do recorte são de outros meses). None se
+    o recorte é vazio, corta um mês ou a base não está ordenada (ou não tem ANO_MES).
+    """
+    if "ANO_MES" not in df.columns or not ordenado_por(df, coluna):
+        return None
+    serie = df[coluna]
+    inicio = serie.searchsorted(pd.to_datetime(data_ini), side="left")
+    final = serie.searchsorted(pd.to_datetime(data_fim), side="right")
+    if inicio >= final:
+        return None
+    meses = df["ANO_MES"]
+    primeiro, ultimo = meses.iloc[inicio], meses.iloc[final - 1]
+    if pd.isna(primeiro) or pd.isna(ultimo):
+        return None
+    if inicio > 0 and meses.iloc[inicio - 1] == primeiro:
+        return None
+    if final < len(df) and meses.iloc[final] == ultimo:
+        return None
+    return primeiro, ultimo
+
+
+def fatiar_periodo(df: pd.DataFrame, data_ini, data_fim, coluna: str = "EMISSAO") -> pd.DataFrame:
+    """
+    Linhas com `coluna` entre data_ini e data_fim (inclusive).
+
+    Com a base ordenada pela data (como o loader a entrega), o período é
+    resolvido por busca binária e vira um recorte contíguo de linhas, sem
+    comparar a coluna inteira nem copiar os dados. Fora de ordem, usa a
+    comparação linha a linha.
+    """
+    ini, fim = pd.to_datetime(data_ini), pd.to_datetime(data_fim)
+    serie = df[coluna]
+    if not ordenado_por(df, coluna):
+        return df.take(np.flatnonzero(((serie >= ini) & (serie <= fim)).to_numpy(dtype=bool, na_value=False)))
+    inicio = serie.searchsorted(ini, side="left")
+    final = serie.searchsorted(fim, side="right")
+    if inicio == 0 and final == len(df):
+        return df.copy(deep=False)
+    # Cópia rasa do recorte: colunas atribuídas depois não afetam a base
+    return df.iloc[inicio:final].copy(deep=False)
+
 
 class Agrupador:
     def __init__(self, df: pd.DataFrame):
         self.df = df
     
     def filtrar(self, filtros: Dict) -> pd.DataFrame:
-        df_filtrado = self.df.copy()
-        
+        """
+        Linhas que atendem a todos os filtros (coluna → valor, lista de valores ou None para ignorar).
+
+        As condições viram uma única máscara booleana e o DataFrame é recortado
+        uma só vez, sem cópia prévia da base. Se nenhum filtro restringe as
+        linhas, devolve uma cópia rasa (atribuir colunas não altera a base).
+        """
+        mascara = None
         for coluna, valor in filtros.items():
-            if valor is not None:  # Ignorar filtros não selecionados
-                if isinstance(valor, list):
-                    # Suportar filtros múltiplos com isin
-                    df_filtrado = df_filtrado[df_filtrado[coluna].isin(valor)]
-                else:
-                    # Suportar filtros únicos com ==
-                    df_filtrado = df_filtrado[df_filtrado[coluna] == valor]
-        
-        return df_filtrado
+            if valor is None:  # Ignorar filtros não selecionados
+                continue
+            atual = mascara_filtro(self.df[coluna], valor)
+            mascara = atual if mascara is None else np.logical_and(mascara, atual, out=mascara)
+
+        if mascara is None or mascara.all():
+            return self.df.copy(deep=False)
+        return self.df.take(np.flatnonzero(mascara))
 
 
     def exibir_tabela(self, df: pd.DataFrame):
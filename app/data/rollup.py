@@ -0,0 +1,133 @@
+# app/data/rollup.py
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.cubo import LINHAS, calcular_medidas, coluna_contagem, colunas_fatos
+from data.top_n import codigos_dimensao
+
+# Hierarquia comercial, do nível mais alto ao grão mais fino
+HIERARQUIA_COMERCIAL = ["SUPERVISOR", "VENDEDOR", "CLIENTE"]
+
+
+class Rollup:
+    """
+    Totais de todos os níveis de uma hierarquia e o total geral (GROUPING SETS / ROLLUP).
+
+    Uma passada pelas linhas: cada nível vira códigos inteiros (nulos num
+    código à parte), o grão mais fino (todas as colunas de `niveis`) sai de
+    um único factorize, e soma, quantidade não nula e linhas de cada medida,
+    de np.bincount. Cada nível acima e o total geral somam o grão, então os
+    totais batem entre os níveis. `df` são notas ou fatos já somados
+    (CuboMensal.selecionar, com a coluna LINHAS). As páginas leem o nível que
+    precisam (nivel) ou reagrupam o grão por outras colunas da hierarquia
+    (agregar), sem voltar às notas.
+    """
+
+    def __init__(self, df: pd.DataFrame, medidas: List[str], niveis: List[str] = HIERARQUIA_COMERCIAL):
+        self.niveis = list(niveis)
+        self.medidas = list(medidas)
+        self._dtypes = [df[c].dtype for c in self.niveis]
+        self._rotulos = []
+        codigos = []
+        for coluna in self.niveis:
+            codigo, rotulos = codigos_dimensao(df[coluna])
+            codigos.append(np.where(codigo < 0, len(rotulos), codigo))
+            self._rotulos.append(rotulos)
+        # Um código a mais por nível para os nulos (grupo próprio, como dropna=False)
+        self._tamanhos = [len(r) + 1 for r in self._rotulos]
+        grupos, chaves = pd.factorize(np.ravel_multi_index(codigos, self._tamanhos), sort=True)
+        self._grao = np.unravel_index(chaves, self._tamanhos)
+
+        if LINHAS in df.columns:
+            pesos = {c: df[c].to_numpy(dtype=np.float64) for c in colunas_fatos({m: "mean" for m in self.medidas})}
+            pesos[LINHAS] = df[LINHAS].to_numpy(dtype=np.float64)
+        else:
+            pesos = {}
+            for medida in self.medidas:
+                pesos[medida] = df[medida].to_numpy(dtype=np.float64, na_value=0.0)
+                pesos[coluna_contagem(medida)] = df[medida].notna().to_numpy(dtype=np.float64)
+            pesos[LINHAS] = None
+        self._inteiras = {m for m in self.medidas if pd.api.types.is_integer_dtype(df[m].dtype)}
+        fatos = {c: np.bincount(grupos, weights=p, minlength=len(chaves)) for c, p in pesos.items()}
+
+        # Grouping sets da hierarquia: _totais[i] agrupa pelos i primeiros níveis (0 é o total geral)
+        self._totais = {len(self.niveis): (self._grao, np.arange(len(chaves)), fatos)}
+        for i in range(len(self.niveis)):
+            self._totais[i] = self._somar(self.niveis[:i], fatos)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória dos níveis (usada pelo cache do processo)."""
+        return int(sum(
+            sum(c.nbytes for c in codigos) + inverso.nbytes + sum(t.nbytes for t in totais.values())
+            for codigos, inverso, totais in self._totais.values()
+        ))
+
+    def nivel(self, coluna: Optional[str], medidas: Dict[str, str]) -> pd.DataFrame:
+        """
+        Totais do nível que termina em `coluna` (None: total geral, uma linha).
+
+        Colunas: os níveis até `coluna` e as medidas, no formato de
+        DataFrame.agg ("sum", "mean", "count", "size" ou "nunique" de um
+        nível). Grupos com nível nulo ficam de fora, como no groupby.
+        """
+        i = 0 if coluna is None else self.niveis.index(coluna) + 1
+        return self._resultado(self.niveis[:i], *self._totais[i], medidas)
+
+    def agregar(self, por: List[str], medidas: Dict[str, str]) -> pd.DataFrame:
+        """O mesmo que notas.groupby(por, observed=True).agg(medidas).reset_index(), com `por` dentro da hierarquia."""
+        if por == self.niveis[:len(por)]:
+            return self.nivel(por[-1] if por else None, medidas)
+        return self._resultado(por, *self._somar(por, self._totais[len(self.niveis)][2]), medidas)
+
+    def _somar(self, por: List[str], fatos: Dict[str, np.ndarray]) -> Tuple[tuple, np.ndarray, Dict[str, np.ndarray]]:
+        """Códigos dos grupos de `por`, grupo de cada linha do grão e fatos somados por grupo."""
+        if not por:
+            inverso = np.zeros(len(self._grao[0]), dtype=np.intp)
+            return (), inverso, {c: np.array([t.sum()]) for c, t in fatos.items()}
+        posicoes = [self.niveis.index(c) for c in por]
+        tamanhos = [self._tamanhos[p] for p in posicoes]
+        inverso, chaves = pd.factorize(
+            np.ravel_multi_index([self._grao[p] for p in posicoes], tamanhos), sort=True
+        )
+        totais = {c: np.bincount(inverso, weights=t, minlength=len(chaves)) for c, t in fatos.items()}
+        return np.unravel_index(chaves, tamanhos), inverso, totais
+
+    def _resultado(
+        self,
+        por: List[str],
+        codigos: tuple,
+        inverso: np.ndarray,
+        totais: Dict[str, np.ndarray],
+        medidas: Dict[str, str],
+    ) -> pd.DataFrame:
+        quantidade = len(next(iter(totais.values())))
+        aditivas = {c: f for c, f in medidas.items() if f != "nunique"}
+        somados = pd.DataFrame({c: totais[c] for c in colunas_fatos(aditivas)}, index=pd.RangeIndex(quantidade))
+        for medida in self._inteiras & set(somados.columns):
+            somados[medida] = somados[medida].round().astype(np.int64)
+        medidas_calculadas = calcular_medidas(somados, aditivas)
+        for coluna in (c for c, f in medidas.items() if f == "nunique"):
+            # Pares distintos (grupo, valor não nulo da coluna) no grão
+            posicao = self.niveis.index(coluna)
+            valores, validos = self._grao[posicao], self._grao[posicao] < len(self._rotulos[posicao])
+            pares = np.unique(inverso[validos] * self._tamanhos[posicao] + valores[validos])
+            medidas_calculadas[coluna] = np.bincount(pares // self._tamanhos[posicao], minlength=quantidade)
+
+        # Grupos com algum nível nulo ficam de fora; os níveis voltam ao tipo original (categorias)
+        manter = np.ones(quantidade, dtype=bool)
+        for coluna, codigo in zip(por, codigos):
+            manter &= codigo < len(self._rotulos[self.niveis.index(coluna)])
+        resultado = {}
+        for coluna, codigo in zip(por, codigos):
+            posicao = self.niveis.index(coluna)
+            if isinstance(self._dtypes[posicao], pd.CategoricalDtype):
+                resultado[coluna] = pd.Categorical.from_codes(codigo[manter], dtype=self._dtypes[posicao])
+            else:
+                resultado[coluna] = self._rotulos[posicao].take(codigo[manter])
+        for medida in medidas:
+            resultado[medida] = medidas_calculadas[medida].to_numpy()[manter]
+        return pd.DataFrame(resultado)
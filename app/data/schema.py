@@ -0,0 +1,148 @@
+# app/data/schema.py
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Incrementar quando o schema mudar, para forçar a reconversão das bases
+VERSAO_SCHEMA = 2
+
+# Número da linha de cada nota na planilha de origem (numerar_linhas): desempata,
+# na ordem do arquivo, as notas do mesmo dia
+COLUNA_LINHA = "LINHA_ORIGEM"
+
+# Tipos declarados da base de vendas: "timestamp", "float64", "float32", "int64" ou "string".
+# Colunas opcionais (PRECO_UNIT, CONTRATO, ...) só são tipadas quando existem.
+SCHEMA_VENDAS: Dict[str, str] = {
+    "EMISSAO": "timestamp",
+    COLUNA_LINHA: "int64",
+    "VL.BRUTO": "float64",
+    "QTDE": "float64",
+    "PRECO_UNIT": "float64",
+    "CUSTO_UNIT": "float64",
+    "CONTRATO": "float64",
+    "CLIENTE": "string",
+    "COD.PRD": "string",
+    "DESC": "string",
+    "SUPERVISOR": "string",
+    "VENDEDOR": "string",
+    "REDE": "string",
+    "TP": "string",
+    "MOTDEST": "string",
+    "AREDESC": "string",
+}
+
+# Linhas sem algum destes campos são rejeitadas na conversão
+COLUNAS_OBRIGATORIAS: List[str] = ["CLIENTE", "COD.PRD", "QTDE", "VL.BRUTO", "EMISSAO"]
+
+TIPOS_ARROW = {
+    "timestamp": pa.timestamp("ns"),
+    "float64": pa.float64(),
+    "float32": pa.float32(),
+    "int64": pa.int64(),
+    "string": pa.string(),
+}
+
+MAX_EXEMPLOS_RELATORIO = 5
+
+
+def _para_texto(serie: pd.Series) -> pd.Series:
+    """Converte para texto preservando nulos; códigos numéricos inteiros perdem o '.0'."""
+    if serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) in ("string", "empty"):
+        return serie
+    if pd.api.types.is_float_dtype(serie):
+        validos = serie.dropna()
+        if (validos == validos.round()).all():
+            serie = serie.astype("Int64")
+    texto = serie.astype(object).where(serie.notna())
+    return texto.map(lambda v: v if v is None or isinstance(v, str) else str(v), na_action="ignore")
+
+
+def _coagir(serie: pd.Series, tipo: str) -> pd.Series:
+    if tipo == "timestamp":
+        return pd.to_datetime(serie, errors="coerce").astype("datetime64[ns]")
+    if tipo in ("float64", "float32"):
+        return pd.to_numeric(serie, errors="coerce").astype(tipo)
+    if tipo == "int64":
+        numeros = pd.to_numeric(serie, errors="coerce")
+        # Inteiro do NumPy quando não há nulos; senão, o inteiro anulável do pandas
+        return numeros.astype("int64" if numeros.notna().all() else "Int64")
+    return _para_texto(serie)
+
+
+def numerar_linhas(df: pd.DataFrame, primeira: int = 2) -> pd.DataFrame:
+    """Grava em COLUNA_LINHA o número da linha na planilha (a primeira linha de dados é a 2)."""
+    return df.assign(**{COLUNA_LINHA: np.arange(primeira, primeira + len(df), dtype=np.int64)})
+
+
+def tipo_declarado(coluna: str, serie: pd.Series) -> str:
+    """Tipo da coluna no schema; colunas não declaradas são inferidas de forma estável."""
+    if coluna in SCHEMA_VENDAS:
+        return SCHEMA_VENDAS[coluna]
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "timestamp"
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return "float64"
+    return "string"
+
+
+def aplicar_schema(df: pd.DataFrame, tipos: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Converte as colunas para os tipos declarados e descarta linhas inválidas.
+
+    `tipos` fixa o tipo de colunas não declaradas (usado na conversão em lotes
+    para manter o tipo inferido no primeiro lote). Retorna o DataFrame tipado
+    e um relatório com, por coluna, quantas células não puderam ser
+    convertidas (viraram nulo) e quantas linhas foram rejeitadas por falta de
+    campos obrigatórios.
+    """
+    tipos = tipos or {}
+    relatorio = {
+        "linhas_entrada": len(df),
+        "linhas_rejeitadas": 0,
+        "colunas_ausentes": [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns],
+        "colunas": {},
+    }
+    df = df.copy()
+    for coluna in df.columns:
+        tipo = tipos.get(coluna) or tipo_declarado(coluna, df[coluna])
+        original = df[coluna]
+        convertida = _coagir(original, tipo)
+        coagidos = original.notna() & convertida.isna()
+        relatorio["colunas"][coluna] = {
+            "tipo": tipo,
+            "coagidos": int(coagidos.sum()),
+            "exemplos": [str(v) for v in original[coagidos].unique()[:MAX_EXEMPLOS_RELATORIO]],
+        }
+        df[coluna] = convertida
+
+    obrigatorias = [c for c in COLUNAS_OBRIGATORIAS if c in df.columns]
+    validas = df[obrigatorias].notna().all(axis=1)
+    relatorio["linhas_rejeitadas"] = int((~validas).sum())
+    return df[validas].reset_index(drop=True), relatorio
+
+
+def schema_arrow(relatorio: Dict) -> pa.Schema:
+    """Schema Arrow com os tipos registrados no relatório de aplicar_schema."""
+    return pa.schema([(c, TIPOS_ARROW[info["tipo"]]) for c, info in relatorio["colunas"].items()])
+
+
+def colunas_texto(schema: pa.Schema) -> List[str]:
+    """Colunas de texto, gravadas com dicionário no Parquet."""
+    return [campo.name for campo in schema if pa.types.is_string(campo.type)]
+
+
+def combinar_relatorios(acumulado: Dict, parcial: Dict) -> Dict:
+    """Soma o relatório de um lote ao relatório acumulado da conversão."""
+    if not acumulado:
+        return parcial
+    acumulado["linhas_entrada"] += parcial["linhas_entrada"]
+    acumulado["linhas_rejeitadas"] += parcial["linhas_rejeitadas"]
+    for coluna, info in parcial["colunas"].items():
+        atual = acumulado["colunas"].setdefault(coluna, {"tipo": info["tipo"], "coagidos": 0, "exemplos": []})
+        atual["coagidos"] += info["coagidos"]
+        faltam = MAX_EXEMPLOS_RELATORIO - len(atual["exemplos"])
+        atual["exemplos"].extend(e for e in info["exemplos"][:faltam] if e not in atual["exemplos"])
+    return acumulado
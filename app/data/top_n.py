@@ -0,0 +1,65 @@
+# app/data/top_n.py
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (dimensão, medida): os k maiores totais da medida por valor da dimensão
+Ranking = Tuple[str, str]
+
+
+def codigos_dimensao(serie: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Códigos inteiros da dimensão (-1 nos nulos) e os rótulos, na ordem do groupby."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    codigos, rotulos = pd.factorize(serie, sort=True)
+    return codigos, pd.Index(rotulos)
+
+
+def _maiores(totais: np.ndarray, presentes: np.ndarray, k: int) -> np.ndarray:
+    """
+    Códigos dos k maiores totais entre os grupos presentes, do menor para o maior.
+
+    Seleção parcial (np.partition) em vez de ordenar todos os grupos; nos
+    empates do k-ésimo total ficam os menores códigos, como em nlargest.
+    """
+    candidatos = np.flatnonzero(presentes)
+    if len(candidatos) > k:
+        valores = totais[candidatos]
+        limite = np.partition(valores, len(valores) - k)[len(valores) - k]
+        acima = candidatos[valores > limite]
+        candidatos = np.concatenate([acima, candidatos[valores == limite][:k - len(acima)]])
+    return candidatos[np.lexsort((candidatos, -totais[candidatos]))][::-1]
+
+
+def top_n(df: pd.DataFrame, rankings: Iterable[Ranking], k: int = 10) -> Dict[Ranking, pd.DataFrame]:
+    """
+    Os k maiores totais de cada (dimensão, medida), numa passada por coluna.
+
+    Cada dimensão vira códigos inteiros uma vez (os da categoria, quando
+    categórica) e cada medida vira float uma vez; os totais de todos os
+    grupos saem de np.bincount e só os k maiores são ordenados. Devolve, por
+    par, um DataFrame [dimensão, medida] do menor para o maior total (a ordem
+    das barras horizontais), igual a
+    df.groupby(dimensão, observed=True)[medida].sum().nlargest(k)[::-1].reset_index().
+    """
+    rankings = list(dict.fromkeys(rankings))
+    pesos = {
+        medida: df[medida].to_numpy(dtype=np.float64, na_value=0.0)
+        for medida in dict.fromkeys(m for _, m in rankings)
+    }
+    resultado = {}
+    for dimensao in dict.fromkeys(d for d, _ in rankings):
+        codigos, rotulos = codigos_dimensao(df[dimensao])
+        validos = codigos >= 0
+        codigos = codigos[validos].astype(np.intp)
+        presentes = np.bincount(codigos, minlength=len(rotulos)) > 0
+        for medida in (m for d, m in rankings if d == dimensao):
+            totais = np.bincount(codigos, weights=pesos[medida][validos], minlength=len(rotulos))
+            maiores = _maiores(totais, presentes, k)
+            valores = totais[maiores]
+            if pd.api.types.is_integer_dtype(df[medida].dtype):
+                valores = valores.round().astype(np.int64)
+            resultado[(dimensao, medida)] = pd.DataFrame({dimensao: rotulos.take(maiores), medida: valores})
+    return resultado
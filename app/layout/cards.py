@@ -1,12 +1,15 @@
 import streamlit as st
+from data.consulta import Consulta
 
 class IndicadoresResumo:
-    def __init__(self, df):
-        self.df = df
+    def __init__(self, dados):
+        # Totais saem da Consulta (cubo mensal quando possível)
+        self.consulta = dados if isinstance(dados, Consulta) else Consulta(dados)
 
     def exibir(self):
-        faturamento = self.df["VL.BRUTO"].sum()
-        volume = self.df["QTDE"].sum()
+        totais = self.consulta.agregar([], {"VL.BRUTO": "sum", "QTDE": "sum"}).iloc[0]
+        faturamento = totais["VL.BRUTO"]
+        volume = totais["QTDE"]
         preco_medio = faturamento / volume if volume else 0
 
         col1, col2, col3 = st.columns(3)
@@ -3,19 +3,18 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+from typing import Union
+from data.consulta import Consulta
 
 class ChartBuilder:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df
+    def __init__(self, dados: Union[Consulta, pd.DataFrame]):
+        # Totais mensais saem da Consulta (cubo mensal quando possível)
+        self.consulta = dados if isinstance(dados, Consulta) else Consulta(dados)
 
     def plot_preco_unitario(self):
         st.subheader("💸 Evolução do Preço Unitário por Produto")
 
-        df_group = (
-            self.df.groupby(['ANO_MES', 'COD.PRD'])['PRECO_UNIT']
-            .mean()
-            .reset_index()
-        )
+        df_group = self.consulta.agregar(['ANO_MES', 'COD.PRD'], {'PRECO_UNIT': 'mean'})
 
         fig = go.Figure()
 
@@ -30,7 +29,7 @@ class ChartBuilder:
             ))
 
         # Linha média global
-        media_global = df_group.groupby('ANO_MES')['PRECO_UNIT'].mean().reset_index()
+        media_global = df_group.groupby('ANO_MES', observed=True)['PRECO_UNIT'].mean().reset_index()
         fig.add_trace(go.Scatter(
             x=media_global['ANO_MES'],
             y=media_global['PRECO_UNIT'],
@@ -54,11 +53,7 @@ class ChartBuilder:
     def plot_volume(self):
         st.subheader("📦 Evolução do Volume Vendido (Caixas)")
 
-        df_group = (
-            self.df.groupby(['ANO_MES'])['QTDE']
-            .sum()
-            .reset_index()
-        )
+        df_group = self.consulta.agregar(['ANO_MES'], {'QTDE': 'sum'})
 
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -1,25 +1,30 @@
 # app/layout/filters.py
 import streamlit as st
 import pandas as pd
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+from data.indice_filtros import COLUNAS_BUSCA, IndiceFiltros
+
+# Filtros de seleção múltipla em cascata: coluna -> sufixo da chave do widget
+CHAVES_CASCATA = {"VENDEDOR": "vendedor", "CLIENTE": "cliente", "DESC": "produto", "COD.PRD": "sku", "REDE": "rede"}
+# Acima disso, as COLUNAS_BUSCA viram busca: só os melhores resultados vão para o navegador
+LIMITE_OPCOES = 50
 
 class FiltroDinamico:
-    def __init__(self, df: pd.DataFrame, filter_id: str = "default"):
+    def __init__(self, df: pd.DataFrame, filter_id: str = "default", indice: Optional[IndiceFiltros] = None):
         """
         Inicializa o gerenciador de filtros dinâmicos com um ID único.
 
         Args:
             df (pd.DataFrame): DataFrame com os dados a serem filtrados.
             filter_id (str): Identificador único para esta instância de filtros.
+            indice (IndiceFiltros): Opções dos filtros já calculadas para a versão
+                da base (loader.indice_filtros); sem ele, são calculadas a partir de `df`.
         """
         self.df = df
         self.filter_id = filter_id
-        # Criar mapeamento Supervisor -> Vendedores
-        self.supervisor_vendedores = self.df.groupby('SUPERVISOR')['VENDEDOR'].unique().apply(list).to_dict()
-        # Tratar nulos
-        self.supervisor_vendedores = {k: v for k, v in self.supervisor_vendedores.items() if pd.notnull(k)}
-        for k in self.supervisor_vendedores:
-            self.supervisor_vendedores[k] = [v for v in self.supervisor_vendedores[k] if pd.notnull(v)]
+        self.indice = indice if indice is not None else IndiceFiltros(df)
+        # Mapeamento Supervisor -> Vendedores
+        self.supervisor_vendedores = self.indice.supervisor_vendedores
         # Inicializar filtros no session_state
         if f"filtros_{filter_id}" not in st.session_state:
             st.session_state[f"filtros_{filter_id}"] = {}
@@ -28,9 +33,16 @@ class FiltroDinamico:
         """
         Exibe os widgets de filtro no Streamlit e retorna os valores selecionados.
 
+        As opções de vendedor, cliente, produto, SKU e rede são só as que
+        aparecem junto com o que está selecionado nos demais filtros (índice
+        invertido do IndiceFiltros); valores já selecionados continuam na lista.
+        Cliente, produto e SKU com mais de LIMITE_OPCOES opções ganham uma
+        caixa de busca e listam só os resultados dela.
+
         Returns:
             Dict[str, any]: Dicionário com os filtros selecionados.
         """
+        selecao = self._selecao_atual()
         with st.sidebar.expander("🔍 Filtros", expanded=True):
             # Estilo para melhorar legibilidade
             st.markdown(
@@ -46,7 +58,7 @@ class FiltroDinamico:
 
             # Supervisor
             st.markdown('<p class="filter-label">👨‍💼 Supervisor</p>', unsafe_allow_html=True)
-            supervisores = ["Todos"] + sorted([x for x in self.df["SUPERVISOR"].dropna().unique() if x])
+            supervisores = ["Todos"] + self.indice.valores("SUPERVISOR")
             supervisor_key = f"filtro_supervisor_{self.filter_id}"
             supervisor = st.selectbox(
                 "",
@@ -57,17 +69,12 @@ class FiltroDinamico:
 
             # Vendedor
             st.markdown('<p class="filter-label">🧍‍♂️ Vendedor</p>', unsafe_allow_html=True)
-            if supervisor == "Todos" or supervisor not in self.supervisor_vendedores:
-                vendedores = sorted([x for x in self.df["VENDEDOR"].dropna().unique() if x])
-            else:
-                vendedores = sorted(self.supervisor_vendedores.get(supervisor, []))
+            vendedores, vendedor_default = self._opcoes_cascata("VENDEDOR", selecao)
 
             if not vendedores:
-                st.warning("⚠️ Nenhum vendedor associado ao supervisor selecionado.")
+                st.warning("⚠️ Nenhum vendedor associado aos filtros selecionados.")
                 vendedores = ["Nenhum"]
                 vendedor_default = ["Nenhum"]
-            else:
-                vendedor_default = ["Todos"]
 
             vendedor_key = f"filtro_vendedor_{self.filter_id}"
             vendedor = st.multiselect(
@@ -79,51 +86,51 @@ class FiltroDinamico:
 
             # Cliente
             st.markdown('<p class="filter-label">👥 Cliente</p>', unsafe_allow_html=True)
-            clientes = ["Todos"] + sorted([x for x in self.df["CLIENTE"].dropna().unique() if x])
+            clientes, cliente_default = self._opcoes_cascata("CLIENTE", selecao, self._termo_busca("CLIENTE"))
             cliente_key = f"filtro_cliente_{self.filter_id}"
             cliente = st.multiselect(
                 "",
-                clientes,
-                default=["Todos"],
+                ["Todos"] + clientes,
+                default=cliente_default,
                 key=cliente_key
             )
 
             # Produto
             st.markdown('<p class="filter-label">🧼 Produto</p>', unsafe_allow_html=True)
-            produtos = ["Todos"] + sorted([x for x in self.df["DESC"].dropna().unique() if x])
+            produtos, produto_default = self._opcoes_cascata("DESC", selecao, self._termo_busca("DESC"))
             produto_key = f"filtro_produto_{self.filter_id}"
             produto = st.multiselect(
                 "",
-                produtos,
-                default=["Todos"],
+                ["Todos"] + produtos,
+                default=produto_default,
                 key=produto_key
             )
 
             # SKU
             st.markdown('<p class="filter-label">🔢 SKU</p>', unsafe_allow_html=True)
-            skus = ["Todos"] + sorted([x for x in self.df["COD.PRD"].dropna().unique() if x])
+            skus, sku_default = self._opcoes_cascata("COD.PRD", selecao, self._termo_busca("COD.PRD"))
             sku_key = f"filtro_sku_{self.filter_id}"
             sku = st.multiselect(
                 "",
-                skus,
-                default=["Todos"],
+                ["Todos"] + skus,
+                default=sku_default,
                 key=sku_key
             )
 
             # Rede
             st.markdown('<p class="filter-label">🏪 Rede</p>', unsafe_allow_html=True)
-            redes = ["Todos"] + sorted([x for x in self.df["REDE"].dropna().unique() if x])
+            redes, rede_default = self._opcoes_cascata("REDE", selecao)
             rede_key = f"filtro_rede_{self.filter_id}"
             rede = st.multiselect(
                 "",
-                redes,
-                default=["Todos"],
+                ["Todos"] + redes,
+                default=rede_default,
                 key=rede_key
             )
 
             # Natureza
             st.markdown('<p class="filter-label">🧾 Tipo de Registro (Natureza)</p>', unsafe_allow_html=True)
-            naturezas_unicas = sorted([x for x in self.df["NATUREZA"].dropna().unique() if x])
+            naturezas_unicas = self.indice.valores("NATUREZA")
             st.markdown(f"**Valores disponíveis para Natureza:** {', '.join(naturezas_unicas)}")
             natureza_key = f"filtro_natureza_{self.filter_id}"
             natureza = st.multiselect(
@@ -134,7 +141,7 @@ class FiltroDinamico:
             )
             if not natureza:
                 st.warning("⚠️ Pelo menos um valor de 'Natureza' deve ser selecionado.")
-                natureza = naturezas_unicas
+                natureza = list(naturezas_unicas)
 
         # Armazenar filtros no session_state
         filtros = {
@@ -149,8 +156,57 @@ class FiltroDinamico:
         st.session_state[f"filtros_{self.filter_id}"] = filtros
         return filtros
 
+    def _selecao_atual(self) -> Dict[str, Any]:
+        """Seleção atual dos filtros (formato do Agrupador), lida do session_state antes de desenhar os widgets."""
+        estado = st.session_state
+        supervisor = estado.get(f"filtro_supervisor_{self.filter_id}", "Todos")
+        selecao = {"SUPERVISOR": None if supervisor == "Todos" else supervisor}
+        for coluna, chave in CHAVES_CASCATA.items():
+            valor = estado.get(f"filtro_{chave}_{self.filter_id}", ["Todos"])
+            selecao[coluna] = None if "Todos" in valor or "Nenhum" in valor else list(valor)
+        selecao["NATUREZA"] = estado.get(f"filtro_natureza_{self.filter_id}") or None
+        return selecao
+
+    def _termo_busca(self, coluna: str) -> Optional[str]:
+        """
+        Caixa de busca da coluna, quando ela tem opções demais para listar inteiras.
+
+        Retorna o termo digitado ("" sem termo) ou None quando a coluna é listada inteira.
+        """
+        if coluna not in COLUNAS_BUSCA or len(self.indice.valores(coluna)) <= LIMITE_OPCOES:
+            return None
+        return st.text_input(
+            "",
+            key=f"busca_{CHAVES_CASCATA[coluna]}_{self.filter_id}",
+            placeholder=f"🔎 Buscar (até {LIMITE_OPCOES} resultados)",
+        )
+
+    def _opcoes_cascata(
+        self, coluna: str, selecao: Dict[str, Any], termo: Optional[str] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Opções da coluna compatíveis com a seleção dos demais filtros e o valor padrão do widget.
+
+        Com `termo` (coluna em modo de busca), só os LIMITE_OPCOES melhores
+        resultados da busca. Os valores já selecionados na coluna ficam nas
+        opções e viram o padrão: o Streamlit recria o widget quando as opções
+        mudam, e sem isso a seleção voltaria a "Todos".
+        """
+        if termo is None:
+            opcoes = self.indice.opcoes_para(coluna, selecao)
+        else:
+            opcoes = self.indice.buscar(coluna, termo, selecao, LIMITE_OPCOES)
+        selecionados = selecao.get(coluna) or []
+        presentes = set(opcoes)
+        faltando = [v for v in selecionados if v not in presentes]
+        if faltando:
+            opcoes = sorted(opcoes + faltando)
+        return opcoes, selecionados or ["Todos"]
+
     def _reset_vendedor(self):
         """Reseta o filtro de vendedor ao mudar o supervisor."""
         vendedor_key = f"filtro_vendedor_{self.filter_id}"
+        # Remove o estado em vez de gravar ["Todos"]: o widget volta pelo valor padrão,
+        # sem o aviso de valor definido ao mesmo tempo pelo padrão e pela Session State API
         if vendedor_key in st.session_state:
-            st.session_state[vendedor_key] = ["Todos"]
\ No newline at end of file
+            del st.session_state[vendedor_key]
\ No newline at end of file
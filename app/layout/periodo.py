@@ -0,0 +1,19 @@
+# app/layout/periodo.py
+import streamlit as st
+import pandas as pd
+from typing import Tuple
+
+
+def selecionar_periodo(df: pd.DataFrame, icone: str = "🗓️", coluna: str = "EMISSAO") -> Tuple:
+    """
+    Exibe na barra lateral o par de datas inicial/final e retorna (data_ini, data_fim).
+
+    O recorte fica com loader.filtrar_base, por busca binária sobre a base
+    ordenada por data (fatiar_periodo) e pelo cache de linhas filtradas.
+    """
+    data_min = df[coluna].min()
+    data_max = df[coluna].max()
+    col1, col2 = st.sidebar.columns(2)
+    data_ini = col1.date_input(f"{icone} Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
+    data_fim = col2.date_input(f"{icone} Data Final", value=data_max, min_value=data_min, max_value=data_max)
+    return data_ini, data_fim
@@ -2,19 +2,28 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from typing import Union
+from data.consulta import Consulta
 
 class Rankings:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df
+    def __init__(self, dados: Union[Consulta, pd.DataFrame]):
+        # Totais por produto/cliente saem da Consulta (cubo mensal quando possível)
+        self.consulta = dados if isinstance(dados, Consulta) else Consulta(dados)
 
     def exibir(self):
         st.subheader("🏆 Top 10 Rankings de Faturamento e Volume")
 
+        # Os quatro rankings numa passada (Top N por bincount, pelo cubo mensal quando possível)
+        pares = [("COD.PRD", "VL.BRUTO"), ("CLIENTE", "VL.BRUTO"), ("COD.PRD", "QTDE")]
+        if "SUP" in self.consulta.df.columns:
+            pares.append(("SUP", "VL.BRUTO"))
+        tops = self.consulta.ranking(pares)
+
         col1, col2 = st.columns(2)
 
         with col1:
             st.markdown("### 🧼 Produtos com Maior Faturamento")
-            top_produtos = self.df.groupby("COD.PRD")["VL.BRUTO"].sum().nlargest(10).reset_index()
+            top_produtos = tops[("COD.PRD", "VL.BRUTO")]
             fig_prod = px.bar(top_produtos, x="VL.BRUTO", y="COD.PRD", orientation="h",
                               labels={"VL.BRUTO": "Faturamento", "COD.PRD": "Produto"},
                               text_auto=".2s")
@@ -23,7 +32,7 @@ class Rankings:
 
         with col2:
             st.markdown("### 👥 Clientes com Maior Faturamento")
-            top_clientes = self.df.groupby("CLIENTE")["VL.BRUTO"].sum().nlargest(10).reset_index()
+            top_clientes = tops[("CLIENTE", "VL.BRUTO")]
             fig_cli = px.bar(top_clientes, x="VL.BRUTO", y="CLIENTE", orientation="h",
                              labels={"VL.BRUTO": "Faturamento", "CLIENTE": "Cliente"},
                              text_auto=".2s")
@@ -34,17 +43,17 @@ class Rankings:
 
         with col3:
             st.markdown("### 📦 Produtos com Maior Volume Vendido")
-            top_volume = self.df.groupby("COD.PRD")["QTDE"].sum().nlargest(10).reset_index()
+            top_volume = tops[("COD.PRD", "QTDE")]
             fig_vol = px.bar(top_volume, x="QTDE", y="COD.PRD", orientation="h",
                              labels={"QTDE": "Caixas", "COD.PRD": "Produto"},
                              text_auto=".2s")
             fig_vol.update_layout(height=300, yaxis={'categoryorder': 'total ascending'})
             st.plotly_chart(fig_vol, use_container_width=True)
 
-        if "SUP" in self.df.columns:
+        if "SUP" in self.consulta.df.columns:
             with col4:
                 st.markdown("### 🧑‍💼 Supervisores com Maior Faturamento")
-                top_sup = self.df.groupby("SUP")["VL.BRUTO"].sum().nlargest(10).reset_index()
+                top_sup = tops[("SUP", "VL.BRUTO")]
                 fig_sup = px.bar(top_sup, x="VL.BRUTO", y="SUP", orientation="h",
                                  labels={"VL.BRUTO": "Faturamento", "SUP": "Supervisor"},
                                  text_auto=".2s")
@@ -54,11 +63,11 @@ class Rankings:
     def exibir_ranking_por_produto(self):
         st.subheader("📌 Evolução Mensal por Produto")
 
-        ranking = self.df.groupby(["COD.PRD", "ANO_MES"]).agg({
+        ranking = self.consulta.agregar(["COD.PRD", "ANO_MES"], {
             "VL.BRUTO": "sum",
             "QTDE": "sum",
             "PRECO_UNIT": "mean"
-        }).reset_index()
+        })
 
         fig = px.line(
             ranking,
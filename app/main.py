@@ -1,5 +1,17 @@
+import os
+import logging
 import streamlit as st
-from data.loader import carregar_dados
+from data.loader import (
+    BACKEND_DADOS,
+    agregar_dados,
+    atualizador,
+    carregar_dados,
+    cache_dados,
+    cache_filtrados,
+    indice_filtros,
+    invalidar_cache_dados,
+)
+from data.indice_filtros import COLUNAS_FILTRO
 from layout.filters import FiltroDinamico
 from views import (
     resumo_executivo,
@@ -15,6 +27,12 @@ from views import (
     analise_disparidade_precos
 )
 
+# Logs da aplicação (conversão, carga) no stdout do container
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
 # Configuração de página
 st.set_page_config(page_title="Dashboard - Gestão Comercial", layout="wide")
 
@@ -42,17 +60,126 @@ pagina = st.sidebar.selectbox("Selecione a Página", [
     "Positivação de Clientes"
 ])
 
-# Carregar dados
+# Atualização da base em segundo plano (exportação nova do ERP)
+@st.experimental_fragment(run_every=2)
+def painel_atualizacao(versao_exibida):
+    """Progresso da conversão; ao publicar a nova versão, recarrega a página."""
+    if atualizador.publicada != versao_exibida or not atualizador.em_andamento():
+        st.rerun()
+    estado = atualizador.progresso()
+    if not estado:
+        return
+    linhas, total = estado["linhas"], estado["linhas_total"]
+    arquivo = os.path.basename(estado["arquivo"]) if estado["arquivo"] else "..."
+    if estado["fase"] == "gravando":
+        st.progress(1.0, text="💾 Gravando partições da nova versão...")
+    elif total:
+        st.progress(min(linhas / total, 1.0), text=f"🔄 {arquivo}: {linhas:,} de {total:,} linhas")
+    else:
+        st.progress(0.0, text=f"🔄 {arquivo}: {linhas:,} linhas")
+    eta = f" · ETA {estado['eta_s']:.0f}s" if estado["eta_s"] is not None else ""
+    st.caption(f"Decorrido {estado['decorrido_s']:.0f}s{eta}")
+
+# Lotes do ERP publicam versões novas a qualquer momento: a página confere de tempos em tempos
+INTERVALO_VERIFICACAO_S = float(os.getenv("INTERVALO_VERIFICACAO_S", "5"))
+
+@st.experimental_fragment(run_every=INTERVALO_VERIFICACAO_S or None)
+def monitor_versao(versao_exibida):
+    """Recarrega a página quando outra versão da base é publicada (lote novo ou exportação)."""
+    if atualizador.verificar() != versao_exibida or atualizador.em_andamento():
+        st.rerun()
+
+try:
+    versao_publicada = atualizador.verificar()
+except Exception as e:
+    st.error(f"⚠️ Erro ao verificar a base de dados: {str(e)}")
+    st.stop()
+if atualizador.em_andamento():
+    with st.sidebar:
+        if versao_publicada is not None:
+            st.caption("Exibindo a versão anterior da base enquanto a nova é convertida.")
+        painel_atualizacao(versao_publicada)
+elif INTERVALO_VERIFICACAO_S > 0:
+    monitor_versao(versao_publicada)
+if atualizador.erro:
+    st.sidebar.error(f"⚠️ Falha ao atualizar a base: {atualizador.erro}")
+if versao_publicada is None:
+    if atualizador.em_andamento():
+        st.info("⏳ Preparando a base de dados pela primeira vez; acompanhe o progresso na barra lateral.")
+        st.stop()
+
+# Carregar dados (a barra lateral só precisa das colunas dos filtros e das opções já indexadas)
 try:
-    df = carregar_dados()
+    df = carregar_dados(colunas=COLUNAS_FILTRO)
+    indice = indice_filtros()
 except Exception as e:
     st.error(f"⚠️ Erro ao carregar dados: {str(e)}")
     st.stop()
 
+# Estado do cache compartilhado da base
+with st.sidebar.expander("🗄️ Cache de Dados", expanded=False):
+    stats = cache_dados.estatisticas()
+    st.caption(
+        f"Versões em memória: {stats['entradas']} · "
+        f"{stats['bytes_em_uso'] / 1024 ** 2:,.0f} MB de {stats['limite_bytes'] / 1024 ** 2:,.0f} MB"
+    )
+    st.caption(f"Hits: {stats['hits']} · Misses: {stats['misses']} · Taxa de acerto: {stats['hit_rate']:.0%}")
+    filtrados = cache_filtrados.estatisticas()
+    st.caption(
+        f"Recortes filtrados: {filtrados['entradas']} · {filtrados['bytes_em_uso'] / 1024 ** 2:,.1f} MB · "
+        f"Taxa de acerto: {filtrados['hit_rate']:.0%} ({filtrados['hits']} hits, {filtrados['misses']} misses)"
+    )
+    if st.button("🔄 Recarregar base", key="recarregar_base"):
+        invalidar_cache_dados()
+        st.rerun()
+
 # Filtros
-filtros = FiltroDinamico(df).exibir_filtros()
+st.session_state["indice_filtros"] = indice
+filtros = FiltroDinamico(df, indice=indice).exibir_filtros()
 st.session_state["filtros"] = filtros
 
+# Páginas que usam só algumas naturezas leem apenas essas partições da base
+NATUREZAS_POR_PAGINA = {
+    "Análise de Devoluções": analise_devolucoes.NATUREZAS,
+    "Análise de Bonificações": analise_bonificacoes.NATUREZAS,
+    "Análise de Verbas": analise_verba.NATUREZAS,
+}
+# Cada página lê do Parquet apenas as colunas que declara
+COLUNAS_POR_PAGINA = {
+    "Resumo Executivo": resumo_executivo.COLUNAS,
+    "Análise por Produto": analise_produto.COLUNAS,
+    "Análise por Cliente": analise_cliente.COLUNAS,
+    "Análise por Rede": analise_rede.COLUNAS,
+    "Análise por Vendedor": analise_vendedor.COLUNAS,
+    "Análise de Devoluções": analise_devolucoes.COLUNAS,
+    "Análise de Contratos": analise_contratos.COLUNAS,
+    "Análise de Verbas": analise_verba.COLUNAS,
+    "Análise de Bonificações": analise_bonificacoes.COLUNAS,
+    "Análise de Disparidade de Preços": analise_disparidade_precos.COLUNAS,
+    "Positivação de Clientes": positivacao_clientes.COLUNAS,
+}
+# Páginas que recebem linhas agregadas (GROUP BY) em vez das linhas da base
+AGREGACAO_POR_PAGINA = {
+    "Positivação de Clientes": positivacao_clientes.AGREGACAO,
+}
+# Páginas que aplicam os filtros da barra lateral: no SQLite, eles vão para o WHERE da consulta
+PAGINAS_COM_FILTROS = [
+    "Resumo Executivo", "Análise por Produto", "Análise por Cliente", "Análise por Rede",
+    "Análise por Vendedor", "Análise de Devoluções", "Análise de Verbas", "Análise de Bonificações",
+]
+filtros_consulta = filtros if BACKEND_DADOS == "sqlite" and pagina in PAGINAS_COM_FILTROS else None
+try:
+    if pagina in AGREGACAO_POR_PAGINA:
+        df = agregar_dados(**AGREGACAO_POR_PAGINA[pagina], naturezas=NATUREZAS_POR_PAGINA.get(pagina))
+    else:
+        df = carregar_dados(
+            naturezas=NATUREZAS_POR_PAGINA.get(pagina), colunas=COLUNAS_POR_PAGINA[pagina],
+            filtros=filtros_consulta,
+        )
+except Exception as e:
+    st.error(f"⚠️ Erro ao carregar dados: {str(e)}")
+    st.stop()
+
 # Roteamento
 if pagina == "Resumo Executivo":
     dashboard = resumo_executivo.Dashboard(df)
@@ -0,0 +1,77 @@
+# app/servico_lotes.py
+
+"""
+Serviço HTTP que recebe do ERP lotes de notas fiscais e os acrescenta à base.
+
+    POST /lotes   {"linhas": [{"EMISSAO": "2024-05-02", "CLIENTE": "...", ...}, ...]}
+
+Cada lote vira arquivos novos nas partições do dataset e uma nova versão
+publicada; o dashboard percebe a versão nova sozinho. Respostas: 200 com o
+resumo do lote, 400 para corpo ou colunas inválidas e 409 se a base ainda
+não foi gerada a partir de uma exportação.
+
+Uso:
+    python app/servico_lotes.py
+"""
+
+import os
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from data.ingestao import ingerir_lote
+
+load_dotenv()
+CAMINHO_EXCEL = os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+PORTA_LOTES = int(os.getenv("PORTA_LOTES", "8502"))
+
+logger = logging.getLogger(__name__)
+
+
+class ReceptorLotes(BaseHTTPRequestHandler):
+    """Trata POST /lotes; os lotes são aplicados um de cada vez (trava do dataset)."""
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/lotes":
+            self._responder(404, {"erro": "Caminho desconhecido; use POST /lotes."})
+            return
+        try:
+            tamanho = int(self.headers.get("Content-Length", 0))
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+            linhas = corpo["linhas"]
+            if not isinstance(linhas, list):
+                raise TypeError("'linhas' deve ser uma lista de objetos.")
+            resumo = ingerir_lote(CAMINHO_EXCEL, pd.DataFrame.from_records(linhas))
+        except (ValueError, KeyError, TypeError) as e:
+            self._responder(400, {"erro": f"Lote inválido: {e}"})
+        except FileNotFoundError as e:
+            self._responder(409, {"erro": str(e)})
+        except Exception as e:
+            logger.exception("Falha ao aplicar o lote")
+            self._responder(500, {"erro": str(e)})
+        else:
+            self._responder(200, resumo)
+
+    def _responder(self, status: int, conteudo) -> None:
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        logger.info("%s %s", self.address_string(), formato % args)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    servidor = ThreadingHTTPServer(("0.0.0.0", PORTA_LOTES), ReceptorLotes)
+    logger.info("Recebendo lotes em http://0.0.0.0:%d/lotes (base: %s)", PORTA_LOTES, CAMINHO_EXCEL)
+    servidor.serve_forever()
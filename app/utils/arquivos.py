@@ -0,0 +1,69 @@
+# app/utils/arquivos.py
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def trava_exclusiva(caminho_trava: str) -> Iterator[None]:
+    """
+    Trava exclusiva entre processos (e entre threads) baseada em arquivo.
+
+    Usa flock no Linux/macOS e msvcrt.locking no Windows; o arquivo de trava
+    fica no disco, mas a trava é liberada pelo sistema se o processo morrer.
+    """
+    with open(caminho_trava, "a+b") as f:
+        if os.name == "nt":
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK desiste após ~10s; continua esperando
+                    time.sleep(1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def caminho_temporario(caminho: str) -> str:
+    """Arquivo temporário no mesmo diretório do destino (o rename precisa ser no mesmo volume)."""
+    return f"{caminho}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def publicar_arquivo(caminho_temp: str, caminho: str) -> None:
+    """Grava em disco (fsync) o arquivo temporário e o renomeia atomicamente para o destino."""
+    with open(caminho_temp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(caminho_temp, caminho)
+    if os.name != "nt":
+        # Persiste também a entrada do diretório
+        fd = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def gravar_atomico(caminho: str, conteudo: str) -> None:
+    """Grava um arquivo de texto de forma que leitores vejam o conteúdo antigo ou o novo inteiro."""
+    temp = caminho_temporario(caminho)
+    with open(temp, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    publicar_arquivo(temp, caminho)
@@ -1,32 +1,310 @@
 import os
+import json
+import time
+import zlib
+import logging
 import pandas as pd
 import hashlib
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from data.schema import (
+    VERSAO_SCHEMA,
+    aplicar_schema,
+    colunas_texto,
+    combinar_relatorios,
+    numerar_linhas,
+    schema_arrow,
+)
+from utils.arquivos import caminho_temporario, gravar_atomico, publicar_arquivo, trava_exclusiva
 
+logger = logging.getLogger(__name__)
 
-def hash_arquivo(caminho: str) -> str:
-    """Gera hash do arquivo para controle de cache."""
+# Tamanho do bloco lido por vez ao calcular o hash (memória constante)
+TAMANHO_BLOCO_HASH = 1024 * 1024
+# "md5" (padrão), "blake2b" ou "crc32" (não criptográfico, mais rápido)
+HASH_ALGORITMO = os.getenv("HASH_ALGORITMO", "md5")
+# "pandas" lê a planilha inteira de uma vez; "streaming" converte em lotes
+MODO_CONVERSAO = os.getenv("MODO_CONVERSAO", "pandas")
+# Linhas por lote (e por row group) no modo streaming
+TAMANHO_LOTE_CONVERSAO = int(os.getenv("TAMANHO_LOTE_CONVERSAO", "50000"))
+
+# Recebe (linhas convertidas, total de linhas da aba ou None se desconhecido)
+Progresso = Callable[[int, Optional[int]], None]
+
+
+class _Crc32:
+    """Adapta zlib.crc32 à interface incremental do hashlib."""
+
+    def __init__(self):
+        self._valor = 0
+
+    def update(self, dados: bytes) -> None:
+        self._valor = zlib.crc32(dados, self._valor)
+
+    def hexdigest(self) -> str:
+        return f"{self._valor:08x}"
+
+
+ALGORITMOS_HASH = {
+    "md5": hashlib.md5,
+    "blake2b": hashlib.blake2b,
+    "crc32": _Crc32,
+}
+
+
+def hash_arquivo(caminho: str, algoritmo: str = "md5", tamanho_bloco: int = TAMANHO_BLOCO_HASH) -> str:
+    """Gera hash do arquivo para controle de cache, lendo-o em blocos de tamanho fixo."""
+    if algoritmo not in ALGORITMOS_HASH:
+        raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo}")
+    h = ALGORITMOS_HASH[algoritmo]()
     with open(caminho, "rb") as f:
-        return hashlib.md5(f.read()).hexdigest()
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def impressao_digital(caminho: str) -> str:
+    """Identifica a versão do arquivo pelos metadados (tamanho e mtime), sem lê-lo."""
+    info = os.stat(caminho)
+    return f"{os.path.abspath(caminho)}:{info.st_size}:{info.st_mtime_ns}"
+
+
+def _ler_manifesto(caminho_manifesto: str) -> Optional[dict]:
+    if not os.path.exists(caminho_manifesto):
+        return None
+    try:
+        with open(caminho_manifesto, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def hash_com_manifesto(caminho: str, caminho_manifesto: str, algoritmo: str = HASH_ALGORITMO) -> str:
+    """
+    Retorna o hash do arquivo reaproveitando o manifesto quando possível.
+
+    O manifesto guarda tamanho, mtime_ns e inode do arquivo no momento do último
+    hash. Se esses metadados não mudaram, o hash registrado é devolvido sem ler
+    o arquivo; caso contrário o hash é recalculado em blocos e o manifesto é
+    regravado.
+    """
+    info = os.stat(caminho)
+    assinatura = {
+        "tamanho": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+        "inode": info.st_ino,
+        "algoritmo": algoritmo,
+    }
+
+    manifesto = _ler_manifesto(caminho_manifesto)
+    if manifesto and all(manifesto.get(k) == v for k, v in assinatura.items()) and manifesto.get("hash"):
+        return manifesto["hash"]
+
+    assinatura["hash"] = hash_arquivo(caminho, algoritmo=algoritmo)
+    gravar_atomico(caminho_manifesto, json.dumps(assinatura))
+    return assinatura["hash"]
+
+
+def _nomes_colunas(cabecalho: Sequence) -> List[str]:
+    """Nomeia as colunas como o pandas faria (células vazias viram 'Unnamed: i')."""
+    return [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(cabecalho)]
 
 
-def converter_para_parquet(caminho_excel: str, aba: str = "Planilha1") -> str:
-    """Converte o Excel para Parquet se necessário e retorna o caminho do .parquet."""
+def _lotes(linhas: Iterable, tamanho: int) -> Iterable[list]:
+    iterador = iter(linhas)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def contar_linhas_planilha(caminho_excel: str, aba: str) -> Optional[int]:
+    """Linhas de dados da aba segundo a dimensão gravada no arquivo (sem percorrê-lo)."""
+    wb = openpyxl.load_workbook(caminho_excel, read_only=True, data_only=True)
+    try:
+        max_row = wb[aba].max_row
+    finally:
+        wb.close()
+    return max_row - 1 if max_row else None
+
+
+def gravar_relatorio_validacao(relatorio: Dict, caminho_relatorio: str) -> None:
+    """Grava o relatório de células coagidas/linhas rejeitadas ao lado da base."""
+    gravar_atomico(caminho_relatorio, json.dumps(relatorio, ensure_ascii=False, indent=2))
+    if relatorio["linhas_rejeitadas"] or any(c["coagidos"] for c in relatorio["colunas"].values()):
+        logger.warning(
+            "Validação da base: %d linhas rejeitadas; detalhes em %s",
+            relatorio["linhas_rejeitadas"], caminho_relatorio,
+        )
+
+
+def converter_excel_pandas(
+    caminho_excel: str,
+    caminho_parquet: str,
+    aba: str = "Planilha1",
+    progresso: Optional[Progresso] = None,
+) -> Dict:
+    """
+    Lê a aba inteira com pandas, aplica o schema e grava o Parquet tipado.
+
+    A leitura é uma única chamada: o progresso só é informado no início e no fim.
+    """
+    if progresso:
+        progresso(0, contar_linhas_planilha(caminho_excel, aba))
+    df, relatorio = aplicar_schema(numerar_linhas(pd.read_excel(caminho_excel, sheet_name=aba)))
+    if progresso:
+        progresso(relatorio["linhas_entrada"], relatorio["linhas_entrada"])
+    schema = schema_arrow(relatorio)
+    tabela = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    pq.write_table(tabela, caminho_parquet, use_dictionary=colunas_texto(schema))
+    return relatorio
+
+
+def converter_excel_streaming(
+    caminho_excel: str,
+    caminho_parquet: str,
+    aba: str = "Planilha1",
+    tamanho_lote: int = TAMANHO_LOTE_CONVERSAO,
+    progresso: Optional[Progresso] = None,
+) -> Dict:
+    """
+    Converte a aba do Excel para Parquet percorrendo as linhas em modo read-only.
+
+    Cada lote de `tamanho_lote` linhas é tipado pelo schema declarado e gravado
+    como um row group, de modo que o pico de memória é o de um lote,
+    independentemente do tamanho da planilha. Colunas fora do schema mantêm o
+    tipo inferido no primeiro lote. `progresso` é chamado a cada lote.
+    Retorna o relatório de validação.
+    """
+    inicio = time.perf_counter()
+    total_linhas = 0
+    pico_lote = 0
+    writer = None
+    schema = None
+    tipos = None
+    relatorio: Dict = {}
+    wb = openpyxl.load_workbook(caminho_excel, read_only=True, data_only=True)
+    try:
+        planilha = wb[aba]
+        linhas_total = planilha.max_row - 1 if planilha.max_row else None
+        linhas = planilha.iter_rows(values_only=True)
+        if progresso:
+            progresso(0, linhas_total)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            raise ValueError(f"A aba '{aba}' está vazia.")
+        colunas = _nomes_colunas(cabecalho)
+        n_colunas = len(colunas)
+
+        for lote in _lotes(linhas, tamanho_lote):
+            # Normaliza o comprimento das linhas antes de montar o lote
+            lote = [tuple(linha[:n_colunas]) + (None,) * (n_colunas - len(linha)) for linha in lote]
+            df_lote = numerar_linhas(pd.DataFrame.from_records(lote, columns=colunas), primeira=total_linhas + 2)
+            df_lote, relatorio_lote = aplicar_schema(df_lote, tipos)
+            relatorio = combinar_relatorios(relatorio, relatorio_lote)
+
+            if writer is None:
+                schema = schema_arrow(relatorio_lote)
+                tipos = {c: info["tipo"] for c, info in relatorio_lote["colunas"].items()}
+                writer = pq.ParquetWriter(caminho_parquet, schema, use_dictionary=colunas_texto(schema))
+            try:
+                batch = pa.RecordBatch.from_pandas(df_lote, schema=schema, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(
+                    f"Lote a partir da linha {total_linhas + 1} não segue o schema do primeiro lote: {e}. "
+                    "Use MODO_CONVERSAO=pandas para esta planilha."
+                ) from e
+            writer.write_batch(batch)
+
+            total_linhas += relatorio_lote["linhas_entrada"]
+            pico_lote = max(pico_lote, batch.nbytes)
+            if progresso:
+                progresso(total_linhas, linhas_total)
+            decorrido = time.perf_counter() - inicio
+            logger.info(
+                "Conversão streaming: %d linhas (%.0f linhas/s)",
+                total_linhas, total_linhas / decorrido if decorrido else 0.0,
+            )
+
+        if writer is None:
+            # Planilha só com cabeçalho: grava um Parquet vazio com as colunas
+            df_vazio, relatorio = aplicar_schema(numerar_linhas(pd.DataFrame(columns=colunas)))
+            pq.write_table(
+                pa.Table.from_pandas(df_vazio, schema=schema_arrow(relatorio), preserve_index=False),
+                caminho_parquet,
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+        wb.close()
+
+    decorrido = time.perf_counter() - inicio
+    logger.info(
+        "Conversão streaming concluída: %d linhas em %.1fs (%.0f linhas/s), pico de lote %.1f MB",
+        total_linhas, decorrido, total_linhas / decorrido if decorrido else 0.0, pico_lote / 1024 ** 2,
+    )
+    return relatorio
+
+
+def converter_para_parquet(
+    caminho_excel: str,
+    aba: str = "Planilha1",
+    progresso: Optional[Progresso] = None,
+) -> str:
+    """
+    Converte o Excel para Parquet tipado se necessário e retorna o caminho do .parquet.
+
+    O schema declarado é aplicado aqui, uma única vez; o relatório de validação
+    fica em <base>.validacao.json. Mudar VERSAO_SCHEMA força a reconversão.
+    `progresso` só é chamado quando há conversão.
+
+    A conversão é protegida por uma trava de arquivo (<base>.lock), válida
+    entre threads, processos e contêineres que compartilham o volume: quem
+    chega enquanto outro converte espera e reaproveita o resultado. O Parquet
+    é gravado num temporário, sincronizado com fsync e renomeado
+    atomicamente; o .hash só é gravado depois do rename, então leitores nunca
+    veem um Parquet pela metade marcado como atual.
+    """
     caminho_parquet = caminho_excel.replace(".xlsx", ".parquet")
     caminho_hash = caminho_excel.replace(".xlsx", ".hash")
+    caminho_manifesto = caminho_excel.replace(".xlsx", ".manifest.json")
+    caminho_relatorio = caminho_excel.replace(".xlsx", ".validacao.json")
+    caminho_trava = caminho_excel.replace(".xlsx", ".lock")
 
-    hash_atual = hash_arquivo(caminho_excel)
-    hash_anterior = None
+    hash_atual = f"{hash_com_manifesto(caminho_excel, caminho_manifesto)}:schema-v{VERSAO_SCHEMA}"
+    if _parquet_atual(caminho_parquet, caminho_hash, hash_atual):
+        return caminho_parquet
 
-    if os.path.exists(caminho_hash):
-        with open(caminho_hash, "r") as f:
-            hash_anterior = f.read().strip()
+    with trava_exclusiva(caminho_trava):
+        # Outro processo pode ter convertido enquanto esperávamos a trava
+        if _parquet_atual(caminho_parquet, caminho_hash, hash_atual):
+            logger.info("Parquet convertido por outro processo; reaproveitando %s", caminho_parquet)
+            return caminho_parquet
 
-    # Regerar o parquet se o Excel mudou ou ainda não existe
-    if not os.path.exists(caminho_parquet) or hash_atual != hash_anterior:
-        print("🔄 Convertendo Excel para Parquet...")
-        df = pd.read_excel(caminho_excel, sheet_name=aba)
-        df.to_parquet(caminho_parquet, index=False)
-        with open(caminho_hash, "w") as f:
-            f.write(hash_atual)
+        logger.info("🔄 Convertendo Excel para Parquet (modo %s)...", MODO_CONVERSAO)
+        temp = caminho_temporario(caminho_parquet)
+        try:
+            if MODO_CONVERSAO == "streaming":
+                relatorio = converter_excel_streaming(caminho_excel, temp, aba=aba, progresso=progresso)
+            else:
+                relatorio = converter_excel_pandas(caminho_excel, temp, aba=aba, progresso=progresso)
+            publicar_arquivo(temp, caminho_parquet)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+        gravar_relatorio_validacao(relatorio, caminho_relatorio)
+        gravar_atomico(caminho_hash, hash_atual)
 
     return caminho_parquet
+
+
+def _parquet_atual(caminho_parquet: str, caminho_hash: str, hash_atual: str) -> bool:
+    """O Parquet existe e foi gerado a partir da versão atual do Excel."""
+    if not os.path.exists(caminho_parquet) or not os.path.exists(caminho_hash):
+        return False
+    with open(caminho_hash, "r") as f:
+        return f.read().strip() == hash_atual
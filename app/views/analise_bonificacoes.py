@@ -4,23 +4,25 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from layout.cards import indicador_simples
-from data.processor import Agrupador
+from data.consulta import Consulta
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
+
+# Partições lidas por esta página: bonificações e as vendas do comparativo
+NATUREZAS = ["BONIFICACAO", "VENDA"]
+COLUNAS = ["EMISSAO", "ANO_MES", "VL.BRUTO", "QTDE"] + COLUNAS_FILTRO
 
 def run(df: pd.DataFrame):
     st.subheader("🎁 Visão de Bonificações")
 
     # Filtro de datas
-    data_min = df["EMISSAO"].min()
-    data_max = df["EMISSAO"].max()
-    col1, col2 = st.sidebar.columns(2)
-    data_ini = col1.date_input("🗓️ Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
-    data_fim = col2.date_input("🗓️ Data Final", value=data_max, min_value=data_min, max_value=data_max)
-
-    df = df[(df["EMISSAO"] >= pd.to_datetime(data_ini)) & (df["EMISSAO"] <= pd.to_datetime(data_fim))]
+    periodo = selecionar_periodo(df)
+    filtros = st.session_state.get("filtros", {})
 
-    # Filtra apenas bonificações
-    df_boni = df[df["NATUREZA"] == "BONIFICACAO"]
-    df_boni = Agrupador(df_boni).filtrar(st.session_state.get("filtros", {}))
+    # Filtra apenas bonificações (totais pelo cubo mensal; linhas só para a exportação)
+    boni = Consulta(df, filtros, periodo, recorte={"NATUREZA": "BONIFICACAO"})
+    venda = Consulta(df, filtros, periodo, recorte={"NATUREZA": "VENDA"})
+    df_boni = boni.linhas()
 
     if df_boni.empty:
         st.warning("⚠️ Nenhuma bonificação encontrada com os filtros selecionados.")
@@ -28,8 +30,9 @@ def run(df: pd.DataFrame):
 
     st.markdown("#### 🔢 Indicadores Gerais")
 
-    total_bonificado = df_boni["QTDE"].sum()
-    valor_aprox = df_boni["VL.BRUTO"].sum()
+    totais = boni.agregar([], {"QTDE": "sum", "VL.BRUTO": "sum"}).iloc[0]
+    total_bonificado = totais["QTDE"]
+    valor_aprox = totais["VL.BRUTO"]
 
     col1, col2 = st.columns(2)
     indicador_simples("📦 Qtde Bonificada", f"{total_bonificado:,.0f}".replace(",", "."),
@@ -42,14 +45,13 @@ def run(df: pd.DataFrame):
     # ==============================
     st.markdown("#### 📈 Evolução Mensal de Bonificações")
 
-    df_boni_mensal = df_boni.groupby("ANO_MES").agg({"QTDE": "sum"}).rename(columns={"QTDE": "QTDE_BONI"})
+    df_boni_mensal = boni.agregar(["ANO_MES"], {"QTDE": "sum"}).set_index("ANO_MES").rename(columns={"QTDE": "QTDE_BONI"})
 
     # Se houver vendas no filtro, incluímos comparativo
-    df_venda = df[df["NATUREZA"] == "VENDA"]
-    df_venda = Agrupador(df_venda).filtrar(st.session_state.get("filtros", {}))
+    df_venda = venda.linhas()
 
     if not df_venda.empty:
-        df_venda_mensal = df_venda.groupby("ANO_MES").agg({"QTDE": "sum"}).rename(columns={"QTDE": "QTDE_VENDA"})
+        df_venda_mensal = venda.agregar(["ANO_MES"], {"QTDE": "sum"}).set_index("ANO_MES").rename(columns={"QTDE": "QTDE_VENDA"})
         comparativo = pd.concat([df_boni_mensal, df_venda_mensal], axis=1).fillna(0)
         comparativo["% BONI"] = (comparativo["QTDE_BONI"] / (comparativo["QTDE_VENDA"] + comparativo["QTDE_BONI"])) * 100
         fig = px.bar(comparativo.reset_index(), x="ANO_MES", y=["QTDE_BONI", "QTDE_VENDA"],
@@ -71,8 +73,10 @@ def run(df: pd.DataFrame):
     # ==============================
     st.markdown("#### 🔄 Comparativo: Venda x Bonificação por Produto")
 
-    base = pd.concat([df_venda, df_boni])
-    resumo = base.groupby(["DESC", "NATUREZA"]).agg({"QTDE": "sum"}).reset_index()
+    resumo = pd.concat([
+        venda.agregar(["DESC", "NATUREZA"], {"QTDE": "sum"}),
+        boni.agregar(["DESC", "NATUREZA"], {"QTDE": "sum"}),
+    ])
     pivot = resumo.pivot(index="DESC", columns="NATUREZA", values="QTDE").fillna(0)
     pivot["% Bonificado"] = (pivot["BONIFICACAO"] / (pivot["VENDA"] + pivot["BONIFICACAO"])) * 100
     pivot = pivot.reset_index()
@@ -86,16 +90,16 @@ def run(df: pd.DataFrame):
     # ==============================
     # 🏆 Rankings
     # ==============================
+    tops = boni.ranking([("DESC", "QTDE"), ("CLIENTE", "QTDE")])
+
     st.markdown("#### 🏆 Produtos Mais Bonificados")
-    prod_boni = df_boni.groupby("DESC").agg({"QTDE": "sum", "VL.BRUTO": "sum"}).reset_index()
-    fig_prod = px.bar(prod_boni.sort_values("QTDE", ascending=True).tail(10),
+    fig_prod = px.bar(tops[("DESC", "QTDE")],
                       x="QTDE", y="DESC", orientation="h", title="Top 10 Produtos Bonificados",
                       labels={"QTDE": "Qtde Bonificada", "DESC": "Produto"})
     st.plotly_chart(fig_prod, use_container_width=True)
 
     st.markdown("#### 👥 Clientes com Mais Bonificações")
-    cli_boni = df_boni.groupby("CLIENTE").agg({"QTDE": "sum", "VL.BRUTO": "sum"}).reset_index()
-    fig_cli = px.bar(cli_boni.sort_values("QTDE", ascending=True).tail(10),
+    fig_cli = px.bar(tops[("CLIENTE", "QTDE")],
                      x="QTDE", y="CLIENTE", orientation="h", title="Top 10 Clientes Bonificados",
                      labels={"QTDE": "Qtde Bonificada", "CLIENTE": "Cliente"})
     st.plotly_chart(fig_cli, use_container_width=True)
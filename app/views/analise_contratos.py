@@ -2,7 +2,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from layout.cards import indicador_simples
-from data.processor import Agrupador
+from data.loader import filtrar_base
+from data.rollup import HIERARQUIA_COMERCIAL, Rollup
+from data.top_n import top_n
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
+
+# Colunas lidas do Parquet para esta página (CONTRATO é opcional na exportação)
+COLUNAS = ["EMISSAO", "ANO_MES", "VL.BRUTO", "QTDE", "CONTRATO", "CLIENTE_NORM"] + COLUNAS_FILTRO
 
 def run(df: pd.DataFrame):
     st.subheader("📃 Análise de Contratos Comerciais")
@@ -12,23 +19,15 @@ def run(df: pd.DataFrame):
         st.error("A coluna CONTRATO não foi encontrada na base de dados.")
         st.stop()
 
-    # Conversões e normalizações
-    df["CONTRATO"] = pd.to_numeric(df["CONTRATO"], errors="coerce").fillna(0)
-    df["VL.BRUTO"] = pd.to_numeric(df["VL.BRUTO"], errors="coerce").fillna(0)
-    df["QTDE"] = pd.to_numeric(df["QTDE"], errors="coerce").fillna(0)
-    df["CLIENTE"] = df["CLIENTE"].astype(str).str.strip().str.upper()
-    df["ANO_MES"] = df["EMISSAO"].dt.to_period("M").astype(str)
+    # Tipos já garantidos pelo schema da conversão; aqui só normalizações
+    df["CONTRATO"] = df["CONTRATO"].fillna(0)
+    df["CLIENTE"] = df["CLIENTE_NORM"]
 
     # Filtro por data
-    data_min = df["EMISSAO"].min()
-    data_max = df["EMISSAO"].max()
-    col1, col2 = st.sidebar.columns(2)
-    data_ini = col1.date_input("📅 Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
-    data_fim = col2.date_input("📅 Data Final", value=data_max, min_value=data_min, max_value=data_max)
-    df = df[(df["EMISSAO"] >= pd.to_datetime(data_ini)) & (df["EMISSAO"] <= pd.to_datetime(data_fim))]
+    periodo = selecionar_periodo(df, icone="📅")
 
-    # Aplica filtros interativos
-    df = Agrupador(df).filtrar(st.session_state.get("filtros", {}))
+    # Aplica filtros interativos (CLIENTE já normalizado)
+    df = filtrar_base(df, st.session_state.get("filtros", {}), periodo, variante="CLIENTE_NORM")
 
     df_contrato = df[df["CONTRATO"] > 0].copy()
     if df_contrato.empty:
@@ -39,9 +38,14 @@ def run(df: pd.DataFrame):
     df_contrato["% CONTRATO SOBRE FAT"] = (df_contrato["CONTRATO"] / df_contrato["VL.BRUTO"]) * 100
     df_contrato["CONTRATO POR CAIXA"] = (df_contrato["CONTRATO"] / df_contrato["QTDE"]).replace([float("inf"), -float("inf")], 0)
 
-    total_contrato = df_contrato["CONTRATO"].sum()
-    total_faturado = df_contrato["VL.BRUTO"].sum()
-    total_caixas = df_contrato["QTDE"].sum()
+    # Supervisor → vendedor → cliente e total geral numa passada pelas notas com contrato
+    medidas = {"CONTRATO": "sum", "VL.BRUTO": "sum", "QTDE": "sum"}
+    hierarquia = Rollup(df_contrato, list(medidas), [c for c in HIERARQUIA_COMERCIAL if c in df_contrato.columns])
+    totais = hierarquia.nivel(None, medidas).iloc[0]
+
+    total_contrato = totais["CONTRATO"]
+    total_faturado = totais["VL.BRUTO"]
+    total_caixas = totais["QTDE"]
 
     pct_medio = (total_contrato / total_faturado) * 100 if total_faturado else 0
     contrato_caixa = total_contrato / total_caixas if total_caixas else 0
@@ -55,50 +59,51 @@ def run(df: pd.DataFrame):
 
     # Evolução mensal
     st.markdown("#### 📈 Evolução Mensal de Contratos")
-    mensal = df_contrato.groupby("ANO_MES").agg({"CONTRATO": "sum"}).reset_index()
+    mensal = df_contrato.groupby("ANO_MES", observed=True).agg({"CONTRATO": "sum"}).reset_index()
     fig_mensal = px.bar(mensal, x="ANO_MES", y="CONTRATO", text="CONTRATO", title="Total de Contratos por Mês")
     st.plotly_chart(fig_mensal, use_container_width=True)
 
+    # Top 10: produto e rede numa passada pelas notas; a hierarquia comercial, pelos níveis do rollup
+    tops = top_n(df_contrato, [(c, "CONTRATO") for c in ["DESC", "REDE"] if c in df_contrato.columns])
+    for coluna in hierarquia.niveis:
+        tops.update(top_n(hierarquia.agregar([coluna], {"CONTRATO": "sum"}), [(coluna, "CONTRATO")]))
+
     # Top clientes
     st.markdown("#### 🧾 Clientes com Maior Volume de Contrato")
-    top_cli = df_contrato.groupby("CLIENTE")["CONTRATO"].sum().sort_values(ascending=True).tail(10).reset_index()
+    top_cli = tops[("CLIENTE", "CONTRATO")]
     fig_cli = px.bar(top_cli, x="CONTRATO", y="CLIENTE", orientation="h", title="Top 10 Clientes")
     st.plotly_chart(fig_cli, use_container_width=True)
 
     # Top produtos
     st.markdown("#### 🧼 Produtos com Maior Valor em Contrato")
-    top_prod = df_contrato.groupby("DESC")["CONTRATO"].sum().sort_values(ascending=True).tail(10).reset_index()
+    top_prod = tops[("DESC", "CONTRATO")]
     fig_prod = px.bar(top_prod, x="CONTRATO", y="DESC", orientation="h", title="Top 10 Produtos com Contrato")
     st.plotly_chart(fig_prod, use_container_width=True)
 
     # Por rede
     if "REDE" in df_contrato.columns:
         st.markdown("#### 🏪 Contratos por Rede")
-        rede = df_contrato.groupby("REDE")["CONTRATO"].sum().sort_values(ascending=True).tail(10).reset_index()
+        rede = tops[("REDE", "CONTRATO")]
         fig_rede = px.bar(rede, x="CONTRATO", y="REDE", orientation="h", title="Top Redes por Valor de Contrato")
         st.plotly_chart(fig_rede, use_container_width=True)
 
     # Por supervisor
     if "SUPERVISOR" in df_contrato.columns:
         st.markdown("#### 👤 Contratos por Supervisor")
-        sup = df_contrato.groupby("SUPERVISOR")["CONTRATO"].sum().sort_values(ascending=True).tail(10).reset_index()
+        sup = tops[("SUPERVISOR", "CONTRATO")]
         fig_sup = px.bar(sup, x="CONTRATO", y="SUPERVISOR", orientation="h", title="Top Supervisores")
         st.plotly_chart(fig_sup, use_container_width=True)
 
     # Por vendedor
     if "VENDEDOR" in df_contrato.columns:
         st.markdown("#### 🧑‍💼 Contratos por Vendedor")
-        vend = df_contrato.groupby("VENDEDOR")["CONTRATO"].sum().sort_values(ascending=True).tail(10).reset_index()
+        vend = tops[("VENDEDOR", "CONTRATO")]
         fig_vend = px.bar(vend, x="CONTRATO", y="VENDEDOR", orientation="h", title="Top Vendedores")
         st.plotly_chart(fig_vend, use_container_width=True)
 
     # Tabela geral por cliente
     st.markdown("#### 📋 Detalhamento por Cliente")
-    resumo = df_contrato.groupby("CLIENTE").agg({
-        "CONTRATO": "sum",
-        "VL.BRUTO": "sum",
-        "QTDE": "sum"
-    }).rename(columns={"VL.BRUTO": "FATURAMENTO"}).reset_index()
+    resumo = hierarquia.agregar(["CLIENTE"], medidas).rename(columns={"VL.BRUTO": "FATURAMENTO"})
     resumo["% CONTRATO"] = (resumo["CONTRATO"] / resumo["FATURAMENTO"]) * 100
     resumo["R$ POR CAIXA"] = (resumo["CONTRATO"] / resumo["QTDE"]).replace([float("inf"), -float("inf")], 0)
 
@@ -2,23 +2,26 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from layout.cards import indicador_simples
-from data.processor import Agrupador
+from data.consulta import Consulta
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
+
+# Partições lidas por esta página: devoluções e as vendas usadas na taxa de devolução
+NATUREZAS = ["DEVOLUCAO", "VENDA"]
+# MOTDEST e AREDESC são opcionais na exportação
+COLUNAS = ["EMISSAO", "ANO_MES", "VL.BRUTO", "QTDE", "MOTDEST", "AREDESC"] + COLUNAS_FILTRO
 
 def run(df: pd.DataFrame):
     st.subheader("↩️ Análise de Devoluções")
 
     # Filtro de datas
-    data_min = df["EMISSAO"].min()
-    data_max = df["EMISSAO"].max()
-    col1, col2 = st.sidebar.columns(2)
-    data_ini = col1.date_input("🗓️ Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
-    data_fim = col2.date_input("🗓️ Data Final", value=data_max, min_value=data_min, max_value=data_max)
-
-    df = df[(df["EMISSAO"] >= pd.to_datetime(data_ini)) & (df["EMISSAO"] <= pd.to_datetime(data_fim))]
+    periodo = selecionar_periodo(df)
+    filtros = st.session_state.get("filtros", {})
 
-    # Filtra apenas devoluções
-    df_dev = df[df["NATUREZA"] == "DEVOLUCAO"]
-    df_dev = Agrupador(df_dev).filtrar(st.session_state.get("filtros", {}))
+    # Filtra apenas devoluções (totais pelo cubo mensal; linhas para motivos/áreas e exportação)
+    dev = Consulta(df, filtros, periodo, recorte={"NATUREZA": "DEVOLUCAO"})
+    venda = Consulta(df, filtros, periodo, recorte={"NATUREZA": "VENDA"})
+    df_dev = dev.linhas()
 
     if df_dev.empty:
         st.warning("⚠️ Nenhuma devolução encontrada com os filtros selecionados.")
@@ -27,13 +30,13 @@ def run(df: pd.DataFrame):
     # Indicadores
     st.markdown("#### 📊 Indicadores de Devolução")
 
-    volume_dev = df_dev["QTDE"].sum()
-    valor_dev = df_dev["VL.BRUTO"].sum()
+    totais = dev.agregar([], {"QTDE": "sum", "VL.BRUTO": "sum"}).iloc[0]
+    volume_dev = totais["QTDE"]
+    valor_dev = totais["VL.BRUTO"]
 
     # Se houver vendas no mesmo filtro, calcular taxa de devolução
-    df_venda = df[df["NATUREZA"] == "VENDA"]
-    df_venda = Agrupador(df_venda).filtrar(st.session_state.get("filtros", {}))
-    volume_venda = df_venda["QTDE"].sum()
+    df_venda = venda.linhas()
+    volume_venda = venda.agregar([], {"QTDE": "sum"}).iloc[0]["QTDE"]
     taxa_dev = (volume_dev / volume_venda) * 100 if volume_venda else 0
 
     col1, col2, col3 = st.columns(3)
@@ -43,7 +46,7 @@ def run(df: pd.DataFrame):
 
     # Gráfico de evolução mensal
     st.markdown("#### 📈 Evolução Mensal de Devoluções")
-    devolucao_mensal = df_dev.groupby("ANO_MES").agg({"QTDE": "sum", "VL.BRUTO": "sum"}).reset_index()
+    devolucao_mensal = dev.agregar(["ANO_MES"], {"QTDE": "sum", "VL.BRUTO": "sum"})
     fig = px.bar(devolucao_mensal, x="ANO_MES", y="QTDE", text="QTDE", title="Volume Devolvido por Mês")
     st.plotly_chart(fig, use_container_width=True)
 
@@ -52,30 +55,34 @@ def run(df: pd.DataFrame):
         st.markdown("#### 📋 Motivos e Áreas de Devolução")
         col1, col2 = st.columns(2)
 
-        motivos = df_dev.groupby("MOTDEST")["QTDE"].sum().sort_values(ascending=True).reset_index()
-        fig_motivo = px.bar(motivos.tail(10), x="QTDE", y="MOTDEST", orientation="h", title="Top 10 Motivos de Devolução")
+        # Motivo e área não estão no cubo: Top N sobre as notas de devolução
+        tops_motivos = dev.ranking([("MOTDEST", "QTDE"), ("AREDESC", "QTDE")])
+        fig_motivo = px.bar(tops_motivos[("MOTDEST", "QTDE")], x="QTDE", y="MOTDEST", orientation="h", title="Top 10 Motivos de Devolução")
         col1.plotly_chart(fig_motivo, use_container_width=True)
 
-        areas = df_dev.groupby("AREDESC")["QTDE"].sum().sort_values(ascending=True).reset_index()
-        fig_area = px.bar(areas.tail(10), x="QTDE", y="AREDESC", orientation="h", title="Top 10 Áreas com Devolução")
+        fig_area = px.bar(tops_motivos[("AREDESC", "QTDE")], x="QTDE", y="AREDESC", orientation="h", title="Top 10 Áreas com Devolução")
         col2.plotly_chart(fig_area, use_container_width=True)
 
     # Ranking de produtos e clientes
+    tops = dev.ranking([("DESC", "QTDE"), ("CLIENTE", "QTDE")])
+
     st.markdown("#### 🏷️ Produtos com Mais Devoluções")
-    top_prod = df_dev.groupby("DESC").agg({"QTDE": "sum"}).sort_values("QTDE", ascending=True).tail(10).reset_index()
+    top_prod = tops[("DESC", "QTDE")]
     fig_prod = px.bar(top_prod, x="QTDE", y="DESC", orientation="h", title="Top 10 Produtos Devolvidos")
     st.plotly_chart(fig_prod, use_container_width=True)
 
     st.markdown("#### 👥 Clientes com Mais Devoluções")
-    top_cli = df_dev.groupby("CLIENTE").agg({"QTDE": "sum"}).sort_values("QTDE", ascending=True).tail(10).reset_index()
+    top_cli = tops[("CLIENTE", "QTDE")]
     fig_cli = px.bar(top_cli, x="QTDE", y="CLIENTE", orientation="h", title="Top 10 Clientes que Mais Devolvem")
     st.plotly_chart(fig_cli, use_container_width=True)
 
     # Taxa de devolução por produto
     if not df_venda.empty:
         st.markdown("#### 📌 Taxa de Devolução por Produto")
-        base = pd.concat([df_venda, df_dev])
-        resumo = base.groupby(["DESC", "NATUREZA"]).agg({"QTDE": "sum"}).reset_index()
+        resumo = pd.concat([
+            venda.agregar(["DESC", "NATUREZA"], {"QTDE": "sum"}),
+            dev.agregar(["DESC", "NATUREZA"], {"QTDE": "sum"}),
+        ])
         pivot = resumo.pivot(index="DESC", columns="NATUREZA", values="QTDE").fillna(0)
         pivot["% Devolvido"] = (pivot["DEVOLUCAO"] / (pivot["VENDA"] + pivot["DEVOLUCAO"])) * 100
         pivot = pivot.reset_index()
@@ -4,10 +4,14 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from data.processor import Agrupador
+from data.loader import filtrar_base
 from layout.cards import indicador_simples
+from data.indice_filtros import COLUNAS_FILTRO
 from layout.filters import FiltroDinamico
 
+# Colunas lidas do Parquet para esta página
+COLUNAS = ["VL.BRUTO", "QTDE", "PRECO_UNIT"] + COLUNAS_FILTRO
+
 # Funções utilitárias para formatação
 def format_currency(value):
     return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
@@ -40,8 +44,10 @@ def run(df: pd.DataFrame):
         Uma validação alerta se alguma faixa tiver menos de 5% dos registros, sugerindo ajustes.
         """)
 
-    # Instanciar FiltroDinamico com um ID único
-    filtro_dinamico = FiltroDinamico(df, filter_id="disparidade_precos")
+    # Instanciar FiltroDinamico com um ID único (opções do índice já calculado para a versão da base)
+    filtro_dinamico = FiltroDinamico(
+        df, filter_id="disparidade_precos", indice=st.session_state.get("indice_filtros")
+    )
     # Exibir filtros (atualiza st.session_state[f"filtros_disparidade_precos"])
     filtro_dinamico.exibir_filtros()
 
@@ -53,9 +59,8 @@ def run(df: pd.DataFrame):
     for campo, valor in filtros.items():
         st.sidebar.markdown(f"- {campo}: {valor}")
 
-    # Aplicar filtros usando Agrupador
-    processor = Agrupador(df)
-    df_filtrado = processor.filtrar(filtros)
+    # Aplicar filtros (cache compartilhado de linhas filtradas: mexer nos demais controles não refiltra)
+    df_filtrado = filtrar_base(df, filtros)
 
     # Depuração: Verificar o estado do DataFrame
     st.sidebar.markdown(f"**Registros iniciais:** {len(df)}")
@@ -245,7 +250,7 @@ def run(df: pd.DataFrame):
         df_limites = pd.DataFrame(limites)
         st.dataframe(df_limites, use_container_width=True)
 
-    media_cluster = df_filtrado.groupby(["COD.PRD", "PERFIL_CLIENTE"])["PRECO_UNIT"].mean().reset_index()
+    media_cluster = df_filtrado.groupby(["COD.PRD", "PERFIL_CLIENTE"], observed=True)["PRECO_UNIT"].mean().reset_index()
     media_cluster.rename(columns={"PRECO_UNIT": "PRECO_CLUSTER_MEDIA"}, inplace=True)
     df_join = df_filtrado.merge(media_cluster, on=["COD.PRD", "PERFIL_CLIENTE"], how="left")
 
@@ -289,7 +294,7 @@ def run(df: pd.DataFrame):
 
     st.markdown("### 📊 Tabela Consolidada por Perfil e Status")
     selected_status = st.session_state.get("selected_status", None)
-    consolidado = df_join.groupby(["PERFIL_CLIENTE", "STATUS"]).agg({
+    consolidado = df_join.groupby(["PERFIL_CLIENTE", "STATUS"], observed=False).agg({
         "QTDE": "sum",
         "VL.BRUTO": "sum",
         "PRECO_UNIT": lambda x: np.average(x, weights=df_join.loc[x.index, "QTDE"]),
@@ -346,7 +351,7 @@ def run(df: pd.DataFrame):
     st.plotly_chart(fig1, use_container_width=True)
 
     df_clientes_unicos = df_join.drop_duplicates(subset=["CLIENTE"])
-    bar_data = df_clientes_unicos.groupby("STATUS")["CLIENTE"].nunique().reset_index()
+    bar_data = df_clientes_unicos.groupby("STATUS", observed=False)["CLIENTE"].nunique().reset_index()
     fig2 = px.bar(
         bar_data,
         x="STATUS",
@@ -365,7 +370,7 @@ def run(df: pd.DataFrame):
         st.rerun()  # Forçar re-renderização
     st.markdown("*Clique nas barras acima para filtrar a tabela consolidada por status.*")
 
-    pie_data = df_join.groupby("STATUS")["VL.BRUTO"].sum().reset_index()
+    pie_data = df_join.groupby("STATUS", observed=False)["VL.BRUTO"].sum().reset_index()
     fig_pie = px.pie(
         pie_data,
         names="STATUS",
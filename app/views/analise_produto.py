@@ -4,9 +4,11 @@ import plotly.express as px
 from typing import Optional
 from layout.cards import IndicadoresResumo
 from layout.charts import ChartBuilder
-from data.processor import Agrupador
+from data.consulta import Consulta
 from layout.rankings import Rankings
 from io import StringIO
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
 
 class ProductAnalyzer:
     """Analisador de dados detalhados por produto."""
@@ -23,7 +25,7 @@ class ProductAnalyzer:
         if missing_cols:
             st.error(f"⚠️ Colunas ausentes no DataFrame: {', '.join(missing_cols)}")
             st.stop()
-        if not pd.api.types.is_datetime64_any_dtype(self.df["EMISSAO"]):
+        if self.df["EMISSAO"].dtype.kind != "M":  # datetime64 ou timestamp Arrow
             st.error("⚠️ Coluna 'EMISSAO' deve ser do tipo datetime.")
             st.stop()
 
@@ -32,7 +34,7 @@ class ProductAnalyzer:
         df_venda = self.df[self.df["NATUREZA"] == "VENDA"]
         if df_venda.empty:
             return pd.DataFrame()
-        evolucao = df_venda.groupby(["ANO_MES", "COD.PRD", "DESC"]).agg({
+        evolucao = df_venda.groupby(["ANO_MES", "COD.PRD", "DESC"], observed=True).agg({
             "PRECO_UNIT": "mean",
             "VL.BRUTO": "sum",
             "QTDE": "sum"
@@ -48,14 +50,14 @@ class ProductAnalyzer:
             return pd.DataFrame(columns=["COD.PRD", "DESC", "Crescimento Médio (%)"])
         
         # Calcular preço médio mensal por produto
-        preco_mensal = df_venda.groupby(["COD.PRD", "DESC", "ANO_MES"])["PRECO_UNIT"].mean().reset_index()
+        preco_mensal = df_venda.groupby(["COD.PRD", "DESC", "ANO_MES"], observed=True)["PRECO_UNIT"].mean().reset_index()
         
         # Calcular crescimento percentual entre meses consecutivos
         preco_mensal = preco_mensal.sort_values(["COD.PRD", "ANO_MES"])
-        preco_mensal["Crescimento"] = preco_mensal.groupby("COD.PRD")["PRECO_UNIT"].pct_change() * 100
+        preco_mensal["Crescimento"] = preco_mensal.groupby("COD.PRD", observed=True)["PRECO_UNIT"].pct_change() * 100
         
         # Média de crescimento por produto
-        ranking = preco_mensal.groupby(["COD.PRD", "DESC"])["Crescimento"].mean().reset_index()
+        ranking = preco_mensal.groupby(["COD.PRD", "DESC"], observed=True)["Crescimento"].mean().reset_index()
         ranking = ranking.dropna().sort_values("Crescimento", ascending=False).head(top_n)
         ranking.columns = ["COD.PRD", "DESC", "Crescimento Médio (%)"]
         return ranking
@@ -101,6 +103,10 @@ class ProductAnalyzer:
             key="download_tabela_detalhada"
         )
 
+# Colunas lidas do Parquet para esta página
+COLUNAS = ProductAnalyzer.REQUIRED_COLUMNS + ["CLIENTE"] + COLUNAS_FILTRO
+
+
 def run(df: pd.DataFrame) -> None:
     """Executa a análise detalhada por produto."""
     st.subheader("📦 Análise Detalhada por Produto")
@@ -109,25 +115,12 @@ def run(df: pd.DataFrame) -> None:
     analyzer = ProductAnalyzer(df)
 
     # Filtro de datas
-    data_min = df["EMISSAO"].min()
-    data_max = df["EMISSAO"].max()
-    col1, col2 = st.sidebar.columns(2)
-    data_ini = col1.date_input(
-        "🗓️ Data Inicial", value=data_min, min_value=data_min, max_value=data_max
-    )
-    data_fim = col2.date_input(
-        "🗓️ Data Final", value=data_max, min_value=data_min, max_value=data_max
-    )
-
-    df_filtered = df[
-        (df["EMISSAO"] >= pd.to_datetime(data_ini)) & 
-        (df["EMISSAO"] <= pd.to_datetime(data_fim))
-    ]
+    periodo = selecionar_periodo(df)
 
     # Aplica filtros do session_state
     filtros = st.session_state.get("filtros", {})
-    processor = Agrupador(df_filtered)
-    df_filtrado = processor.filtrar(filtros)
+    consulta = Consulta(df, filtros, periodo)
+    df_filtrado = consulta.linhas()
 
     if df_filtrado.empty:
         st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
@@ -137,11 +130,11 @@ def run(df: pd.DataFrame) -> None:
     analyzer.df = df_filtrado
 
     # Indicadores
-    resumo = IndicadoresResumo(df_filtrado)
+    resumo = IndicadoresResumo(consulta)
     resumo.exibir()
 
     # Gráficos principais
-    charts = ChartBuilder(df_filtrado)
+    charts = ChartBuilder(consulta)
     charts.plot_preco_unitario()
     charts.plot_volume()
 
@@ -162,7 +155,7 @@ def run(df: pd.DataFrame) -> None:
     if evolucao.empty:
         st.warning("⚠️ Nenhum dado disponível para a evolução dos produtos selecionados.")
     else:
-        for _, grupo in evolucao.groupby(["COD.PRD", "DESC"]):
+        for _, grupo in evolucao.groupby(["COD.PRD", "DESC"], observed=True):
             sku = grupo["COD.PRD"].iloc[0]
             desc = grupo["DESC"].iloc[0]
             st.markdown(f"#### 🔹 Produto: `{sku} - {desc}`")
@@ -5,58 +5,56 @@ import pandas as pd
 from layout.cards import IndicadoresResumo
 from layout.charts import ChartBuilder
 from layout.rankings import Rankings
-from data.processor import Agrupador
+from data.consulta import Consulta
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
+
+# Colunas lidas do Parquet para esta página
+COLUNAS = ["EMISSAO", "ANO_MES", "VL.BRUTO", "QTDE", "PRECO_UNIT"] + COLUNAS_FILTRO
 
 def run(df: pd.DataFrame):
     st.subheader("🏪 Análise por Rede de Clientes")
 
     # Filtro de data
-    data_min = df["EMISSAO"].min()
-    data_max = df["EMISSAO"].max()
-
-    col1, col2 = st.sidebar.columns(2)
-    data_ini = col1.date_input("🗓️ Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
-    data_fim = col2.date_input("🗓️ Data Final", value=data_max, min_value=data_min, max_value=data_max)
-
-    df = df[(df["EMISSAO"] >= pd.to_datetime(data_ini)) & (df["EMISSAO"] <= pd.to_datetime(data_fim))]
+    periodo = selecionar_periodo(df)
 
     # Aplica filtros dinâmicos
-    processor = Agrupador(df)
     filtros = st.session_state.get("filtros", {})
-    df_filtrado = processor.filtrar(filtros)
+    consulta = Consulta(df, filtros, periodo)
 
-    if df_filtrado.empty:
+    if consulta.linhas().empty:
         st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
         return
 
     # Indicadores
-    resumo = IndicadoresResumo(df_filtrado)
+    resumo = IndicadoresResumo(consulta)
     resumo.exibir()
 
     # Gráficos
-    charts = ChartBuilder(df_filtrado)
+    charts = ChartBuilder(consulta)
     charts.plot_preco_unitario()
     charts.plot_volume()
 
     # Tabela por Rede e Mês
     st.subheader("📈 Evolução do Faturamento por Rede e Mês")
 
-    tabela = df_filtrado.pivot_table(
+    tabela = consulta.agregar(['REDE', 'ANO_MES'], {'VL.BRUTO': 'sum'}).pivot_table(
         index='REDE',
         columns='ANO_MES',
         values='VL.BRUTO',
-        aggfunc='sum'
+        aggfunc='sum',
+        observed=True
     ).fillna(0)
 
     st.dataframe(tabela.style.format("R$ {:,.2f}").set_caption("Faturamento por Rede (Mês)"))
 
     # Ranking por Rede
     st.subheader("🏆 Ranking de Redes")
-    ranking_rede = df_filtrado.groupby("REDE").agg({
+    ranking_rede = consulta.agregar(["REDE"], {
         "VL.BRUTO": "sum",
         "QTDE": "sum",
         "PRECO_UNIT": "mean"
-    }).sort_values(by="VL.BRUTO", ascending=False).reset_index()
+    }).sort_values(by="VL.BRUTO", ascending=False).reset_index(drop=True)
 
     st.dataframe(ranking_rede.style.format({
         "VL.BRUTO": "R$ {:,.2f}",
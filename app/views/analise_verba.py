@@ -2,50 +2,48 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from layout.cards import indicador_simples
-from data.processor import Agrupador
+from data.loader import filtrar_base
+from data.top_n import top_n
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
+
+# Partições lidas por esta página: lançamentos de VERBA (INVESTIMENTO) e as vendas do comparativo
+NATUREZAS = ["INVESTIMENTO", "VENDA"]
+COLUNAS = ["EMISSAO", "VL.BRUTO", "QTDE", "CLIENTE_NORM"] + COLUNAS_FILTRO
 
 def run(df: pd.DataFrame):
     st.subheader("💰 Análise de Investimentos (VERBA)")
 
     # Filtro de datas
-    data_min = df["EMISSAO"].min()
-    data_max = df["EMISSAO"].max()
-    col1, col2 = st.sidebar.columns(2)
-    data_ini = col1.date_input("🗓️ Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
-    data_fim = col2.date_input("🗓️ Data Final", value=data_max, min_value=data_min, max_value=data_max)
-    df = df[(df["EMISSAO"] >= pd.to_datetime(data_ini)) & (df["EMISSAO"] <= pd.to_datetime(data_fim))]
+    periodo = selecionar_periodo(df)
+    filtros = st.session_state.get("filtros", {})
 
     # Parâmetros
     #st.markdown("#### ⚙️ Parâmetros de Análise")
     #margem_bruta_pct = st.slider("Margem Bruta Estimada (%)", 0.0, 100.0, 35.0, step=0.5)
 
     # Filtra VERBA
-    df_verba = df[df["DESC"].str.upper().str.startswith("VERBA")]
-    df_verba = Agrupador(df_verba).filtrar(st.session_state.get("filtros", {}))
+    df_verba = filtrar_base(df, filtros, periodo)
+    df_verba = df_verba[df_verba["DESC"].str.upper().str.startswith("VERBA")].copy()
     
     if df_verba.empty:
         st.warning("⚠️ Nenhum lançamento de VERBA encontrado com os filtros selecionados.")
         return
     
     # 🧼 Normaliza CLIENTE
-    df_verba["CLIENTE"] = df_verba["CLIENTE"].astype(str).str.strip().str.upper()
-    df["CLIENTE"] = df["CLIENTE"].astype(str).str.strip().str.upper()
-    
-    # 🧮 Converte valores para numérico
-    df["QTDE"] = pd.to_numeric(df["QTDE"], errors="coerce")
-    df["VL.BRUTO"] = pd.to_numeric(df["VL.BRUTO"], errors="coerce")
+    df_verba["CLIENTE"] = df_verba["CLIENTE_NORM"]
+    df["CLIENTE"] = df["CLIENTE_NORM"]
     
-    # 🧾 Filtra vendas e aplica filtros
-    df_venda = df[df["NATUREZA"] == "VENDA"]
-    df_venda = Agrupador(df_venda).filtrar(st.session_state.get("filtros", {}))
+    # 🧾 Filtra vendas e aplica filtros (CLIENTE já normalizado)
+    df_venda = filtrar_base(df, filtros, periodo, recorte={"NATUREZA": "VENDA"}, variante="CLIENTE_NORM")
     
     # 📊 Agrega por cliente
-    vendas_agrupadas = df_venda.groupby("CLIENTE").agg({
+    vendas_agrupadas = df_venda.groupby("CLIENTE", observed=True).agg({
         "VL.BRUTO": "sum",
         "QTDE": "sum"
     }).rename(columns={"VL.BRUTO": "FATURAMENTO", "QTDE": "CAIXAS"})
     
-    verba_por_cliente = df_verba.groupby("CLIENTE")["VL.BRUTO"].sum().rename("INVESTIMENTO")
+    verba_por_cliente = df_verba.groupby("CLIENTE", observed=True)["VL.BRUTO"].sum().rename("INVESTIMENTO")
     
     # 🧩 Merge consolidado
     comparativo = pd.concat([verba_por_cliente, vendas_agrupadas], axis=1).fillna(0)
@@ -60,14 +58,13 @@ def run(df: pd.DataFrame):
     st.markdown("#### 📊 Indicadores de Investimento")
     total_verba = df_verba["VL.BRUTO"].sum()
 
-    df_venda = df[df["NATUREZA"] == "VENDA"]
-    df_venda = Agrupador(df_venda).filtrar(st.session_state.get("filtros", {}))
-    vendas_agrupadas = df_venda.groupby("CLIENTE").agg({
+    df_venda = filtrar_base(df, filtros, periodo, recorte={"NATUREZA": "VENDA"}, variante="CLIENTE_NORM")
+    vendas_agrupadas = df_venda.groupby("CLIENTE", observed=True).agg({
         "VL.BRUTO": "sum",
         "QTDE": "sum"
     }).rename(columns={"VL.BRUTO": "FATURAMENTO", "QTDE": "CAIXAS"})
 
-    verba_por_cliente = df_verba.groupby("CLIENTE")["VL.BRUTO"].sum().rename("INVESTIMENTO")
+    verba_por_cliente = df_verba.groupby("CLIENTE", observed=True)["VL.BRUTO"].sum().rename("INVESTIMENTO")
     comparativo = pd.concat([verba_por_cliente, vendas_agrupadas], axis=1).fillna(0)
     comparativo["% SOBRE FATURAMENTO"] = (comparativo["INVESTIMENTO"] / comparativo["FATURAMENTO"]) * 100
     comparativo["INVESTIMENTO POR CAIXA"] = (comparativo["INVESTIMENTO"] / comparativo["CAIXAS"]).replace([float("inf"), -float("inf")], 0)
@@ -91,7 +88,7 @@ def run(df: pd.DataFrame):
 
     # Top produtos
     #st.markdown("#### 📦 Produtos com Mais Verba Aplicada")
-    #top_prod = df_verba.groupby("COD.PRD").agg({"VL.BRUTO": "sum"}).reset_index()
+    #top_prod = df_verba.groupby("COD.PRD", observed=True).agg({"VL.BRUTO": "sum"}).reset_index()
     #produtos = df[["COD.PRD", "DESC"]].drop_duplicates().set_index("COD.PRD")
     #top_prod = top_prod.join(produtos, on="COD.PRD").fillna("Produto não encontrado")
     #top_prod = top_prod.sort_values("VL.BRUTO", ascending=True).tail(10)
@@ -102,8 +99,8 @@ def run(df: pd.DataFrame):
     # Por Rede
     if "REDE" in df_verba.columns:
         st.markdown("#### 🏪 Verba por Rede de Clientes")
-        verba_rede = df_verba.groupby("REDE")["VL.BRUTO"].sum().sort_values(ascending=True).reset_index()
-        fig_rede = px.bar(verba_rede.tail(10), x="VL.BRUTO", y="REDE", orientation="h",
+        verba_rede = top_n(df_verba, [("REDE", "VL.BRUTO")])[("REDE", "VL.BRUTO")]
+        fig_rede = px.bar(verba_rede, x="VL.BRUTO", y="REDE", orientation="h",
                           title="Top 10 Redes com Investimento (VERBA)")
         st.plotly_chart(fig_rede, use_container_width=True)
 
@@ -180,7 +177,9 @@ def run(df: pd.DataFrame):
     
     df_treemap = comparativo.reset_index()
     df_treemap = df_treemap[df_treemap["INVESTIMENTO"] > 0]
-    
+    # O treemap agrupa o path por conta própria: com CLIENTE categórico viriam todas as categorias da base
+    df_treemap["CLIENTE"] = df_treemap["CLIENTE"].astype(str)
+
     if df_treemap.empty:
         st.warning("⚠️ Não há dados suficientes com investimento > 0 para gerar o treemap.")
     else:
@@ -2,6 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+# Página não usa os filtros da barra lateral: só precisa destas colunas
+COLUNAS = ["ANO_MES", "CLIENTE", "VL.BRUTO", "QTDE"]
+# Tudo aqui parte dos totais por cliente e mês: a página recebe a base já agregada
+AGREGACAO = {"por": ["CLIENTE", "ANO_MES"], "medidas": {"VL.BRUTO": "sum", "QTDE": "sum"}}
+
 def run(df: pd.DataFrame):
     st.title("📌 Positivação de Clientes")
     st.markdown("Acompanhe a presença de clientes mês a mês com análise de recompra, retorno e inatividade.")
@@ -9,7 +14,7 @@ def run(df: pd.DataFrame):
     # ===============================
     # Clientes Ativos por Mês
     # ===============================
-    clientes_por_mes = df.groupby("ANO_MES")["CLIENTE"].nunique().reset_index()
+    clientes_por_mes = df.groupby("ANO_MES", observed=True)["CLIENTE"].nunique().reset_index()
     clientes_por_mes.columns = ["ANO_MES", "Clientes Ativos"]
     fig1 = px.bar(clientes_por_mes, x="ANO_MES", y="Clientes Ativos", title="📊 Total de Clientes Ativos por Mês")
     st.plotly_chart(fig1, use_container_width=True)
@@ -17,12 +22,12 @@ def run(df: pd.DataFrame):
     # ===============================
     # Preparação base cliente x mês
     # ===============================
-    base = df.groupby(["CLIENTE", "ANO_MES"]).agg({
+    base = df.groupby(["CLIENTE", "ANO_MES"], observed=True).agg({
         "VL.BRUTO": "sum",
         "QTDE": "sum"
     }).reset_index()
 
-    tabela_presenca = base.pivot_table(index="CLIENTE", columns="ANO_MES", values="VL.BRUTO", aggfunc="sum")
+    tabela_presenca = base.pivot_table(index="CLIENTE", columns="ANO_MES", values="VL.BRUTO", aggfunc="sum", observed=True)
     tabela_presenca = tabela_presenca.fillna(0).applymap(lambda x: 1 if x > 0 else 0)
 
     # ===============================
@@ -56,7 +61,8 @@ def run(df: pd.DataFrame):
     # ===============================
     st.subheader("🧭 Mapa de Positivação (VL.BRUTO)")
     tabela_heatmap = base.pivot_table(
-        index="CLIENTE", columns="ANO_MES", values="VL.BRUTO", aggfunc="sum"
+        index="CLIENTE", columns="ANO_MES", values="VL.BRUTO", aggfunc="sum",
+        observed=True
     ).fillna(0)
 
     st.dataframe(tabela_heatmap.style.background_gradient(cmap="Blues").format("R$ {:,.0f}".format))
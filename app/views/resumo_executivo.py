@@ -3,11 +3,15 @@ import pandas as pd
 import plotly.express as px
 from io import BytesIO
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
+from data.consulta import Consulta
 from data.processor import Agrupador
+from data.rollup import Rollup
 from layout.cards import IndicadoresResumo
 from layout.charts import ChartBuilder
 from layout.rankings import Rankings
+from data.indice_filtros import COLUNAS_FILTRO
+from layout.periodo import selecionar_periodo
 
 # Configurações
 CONFIG = {
@@ -23,6 +27,9 @@ CONFIG = {
     ],
 }
 
+# Colunas lidas do Parquet para esta página
+COLUNAS = CONFIG["REQUIRED_COLUMNS"] + COLUNAS_FILTRO
+
 class DataValidator:
     """Valida a integridade do DataFrame."""
     @staticmethod
@@ -31,7 +38,7 @@ class DataValidator:
         if missing_cols:
             st.error(f"⚠️ Colunas ausentes: {', '.join(missing_cols)}")
             return False
-        if not pd.api.types.is_datetime64_any_dtype(df["EMISSAO"]):
+        if df["EMISSAO"].dtype.kind != "M":  # datetime64 ou timestamp Arrow
             st.error("⚠️ Coluna 'EMISSAO' deve ser do tipo datetime.")
             return False
         mask_venda = df["NATUREZA"] == "VENDA"
@@ -42,15 +49,17 @@ class DataValidator:
 
 class ParetoAnalyzer:
     """Realiza análises 20/80."""
-    def __init__(self, df: pd.DataFrame, group_by: str, value_col: str = "VL.BRUTO"):
+    def __init__(self, df: pd.DataFrame, group_by: str, value_col: str = "VL.BRUTO", hierarquia: Optional[Rollup] = None):
         self.df = df
         self.group_by = group_by
         self.value_col = value_col
+        # Totais supervisor → vendedor → cliente já calculados para a mesma seleção (opcional)
+        self.hierarquia = hierarquia
     
     def analyze(self, threshold: float = 0.8) -> pd.DataFrame:
         if self.group_by == "VENDEDOR":
             # Para group_by="VENDEDOR", não precisamos selecionar um vendedor
-            grouped = self.df.groupby(self.group_by).agg({
+            grouped = self.df.groupby(self.group_by, observed=True).agg({
                 self.value_col: "sum",
                 "PRECO_UNIT": ["first", "last", "mean"],
                 "QTDE": "sum"
@@ -60,13 +69,17 @@ class ParetoAnalyzer:
             ]
         else:
             # Selecionar o vendedor com maior faturamento por group_by
-            vendedor_agg = self.df.groupby([self.group_by, "VENDEDOR"]).agg({
-                self.value_col: "sum"
-            }).reset_index()
-            vendedor_max = vendedor_agg.loc[vendedor_agg.groupby(self.group_by)[self.value_col].idxmax()]
+            if (self.hierarquia is not None and self.group_by in self.hierarquia.niveis
+                    and self.value_col in self.hierarquia.medidas):
+                vendedor_agg = self.hierarquia.agregar([self.group_by, "VENDEDOR"], {self.value_col: "sum"})
+            else:
+                vendedor_agg = self.df.groupby([self.group_by, "VENDEDOR"], observed=True).agg({
+                    self.value_col: "sum"
+                }).reset_index()
+            vendedor_max = vendedor_agg.loc[vendedor_agg.groupby(self.group_by, observed=True)[self.value_col].idxmax()]
             
             # Agregar métricas principais
-            grouped = self.df.groupby(self.group_by).agg({
+            grouped = self.df.groupby(self.group_by, observed=True).agg({
                 self.value_col: "sum",
                 "PRECO_UNIT": ["first", "last", "mean"],
                 "QTDE": "sum"
@@ -123,16 +136,18 @@ class ParetoAnalyzer:
 
 class VendedorAnalyzer:
     """Calcula métricas por vendedor."""
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, hierarquia: Optional[Rollup] = None):
         self.df = df
+        # Totais das vendas por supervisor → vendedor → cliente (Consulta.rollup); sem ele, calculados aqui
+        self.hierarquia = hierarquia
     
     def analyze(self) -> pd.DataFrame:
-        grouped = self.df[self.df["NATUREZA"] == "VENDA"].groupby("VENDEDOR").agg({
-            "VL.BRUTO": "sum",
-            "QTDE": "sum",
-            "CLIENTE": "nunique",
-            "PRECO_UNIT": ["first", "last"]
-        }).reset_index()
+        vendas = self.df[self.df["NATUREZA"] == "VENDA"]
+        hierarquia = self.hierarquia if self.hierarquia is not None else Rollup(vendas, ["VL.BRUTO", "QTDE"])
+        # Faturamento, volume e clientes saem do rollup; só primeiro/último preço dependem da ordem das notas
+        totais = hierarquia.agregar(["VENDEDOR"], {"VL.BRUTO": "sum", "QTDE": "sum", "CLIENTE": "nunique"})
+        precos = vendas.groupby("VENDEDOR", observed=True)["PRECO_UNIT"].agg(["first", "last"]).reset_index()
+        grouped = totais.merge(precos, on="VENDEDOR", how="left")
         grouped.columns = [
             "VENDEDOR", "FATURAMENTO", "VOLUME", "CLIENTES_DISTINTOS", "PRECO_INICIAL", "PRECO_FINAL"
         ]
@@ -150,32 +165,20 @@ class Dashboard:
         self.processor = Agrupador(df)
     
     def apply_filters(self) -> pd.DataFrame:
-        data_min = self.df["EMISSAO"].min()
-        data_max = self.df["EMISSAO"].max()
-        col1, col2 = st.sidebar.columns(2)
-        data_ini = col1.date_input(
-            "🗓️ Data Inicial", value=data_min, min_value=data_min, max_value=data_max
-        )
-        data_fim = col2.date_input(
-            "🗓️ Data Final", value=data_max, min_value=data_min, max_value=data_max
-        )
-    
-        # Primeiro aplica o filtro por data
-        df_filtered = self.df[
-            (self.df["EMISSAO"] >= pd.to_datetime(data_ini)) &
-            (self.df["EMISSAO"] <= pd.to_datetime(data_fim))
-        ]
-    
-        # Depois aplica os demais filtros
+        # Período e demais filtros, pelo cache compartilhado de linhas filtradas
+        periodo = selecionar_periodo(self.df)
         filtros = st.session_state.get("filtros", {})
-        df_filtered = Agrupador(df_filtered).filtrar(filtros)
-    
-        return df_filtered
+        # Totais mensais (indicadores, gráficos, rankings) saem do cubo mensal quando possível
+        self.consulta = Consulta(self.df, filtros, periodo)
+        # Totais por supervisor → vendedor → cliente, uma vez por rerun para todas as seções
+        self.hierarquia = self.consulta.rollup(["VL.BRUTO"])
+        self.hierarquia_vendas = Consulta(self.df, filtros, periodo, recorte={"NATUREZA": "VENDA"}).rollup(["VL.BRUTO", "QTDE"])
+        return self.consulta.linhas()
 
     
     def display_pareto(self, df: pd.DataFrame, group_by: str, title: str):
         st.subheader(title)
-        analyzer = ParetoAnalyzer(df, group_by=group_by)
+        analyzer = ParetoAnalyzer(df, group_by=group_by, hierarquia=self.hierarquia)
         top_80 = analyzer.analyze()
         if top_80.empty:
             st.warning(f"⚠️ Nenhum dado disponível para {group_by.lower()}.")
@@ -212,7 +215,8 @@ class Dashboard:
             index=["DESC", "COD.PRD", "VENDEDOR"],
             columns="ANO_MES",
             values="PRECO_UNIT",
-            aggfunc="mean"
+            aggfunc="mean",
+            observed=True
         ).sort_index(axis=1)
         variacao = tabela_preco.pct_change(axis=1) * 100
         variacao.columns = [f"{col} (%)" for col in variacao.columns]
@@ -227,7 +231,7 @@ class Dashboard:
     
     def display_vendedor_metrics(self, df: pd.DataFrame):
         st.subheader("📈 Métricas por Vendedor")
-        analyzer = VendedorAnalyzer(df)
+        analyzer = VendedorAnalyzer(df, self.hierarquia_vendas)
         metrics = analyzer.analyze()
         if metrics.empty:
             st.warning("⚠️ Nenhum dado disponível para análise de vendedores.")
@@ -271,9 +275,9 @@ class Dashboard:
             st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
             return
         
-        IndicadoresResumo(df_filtered).exibir()
+        IndicadoresResumo(self.consulta).exibir()
         
-        charts = ChartBuilder(df_filtered)
+        charts = ChartBuilder(self.consulta)
         charts.plot_preco_unitario()
         charts.plot_volume()
         
@@ -295,11 +299,11 @@ class Dashboard:
             with tabs[3]:
                 self.display_pareto(df_filtered, group_by="VENDEDOR", title="Top 80% Vendedores por Faturamento")
         
-        Rankings(df_filtered).exibir()
+        Rankings(self.consulta).exibir()
         
         export_dfs = {
             "Produtos": ParetoAnalyzer(df_filtered, group_by="COD.PRD").analyze(),
-            "Clientes": ParetoAnalyzer(df_filtered, group_by="CLIENTE").analyze(),
+            "Clientes": ParetoAnalyzer(df_filtered, group_by="CLIENTE", hierarquia=self.hierarquia).analyze(),
             "Vendedores": ParetoAnalyzer(df_filtered, group_by="VENDEDOR").analyze(),
         }
         if "REDE" in df_filtered.columns:
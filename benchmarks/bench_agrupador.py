@@ -0,0 +1,75 @@
+"""
+Benchmark: Agrupador.filtrar original (cópia da base + um recorte por coluna) x máscara única.
+
+Para seleções típicas da barra lateral, mede o tempo e o pico de memória
+alocada (tracemalloc) de cada implementação sobre a base completa.
+
+Uso:
+    python benchmarks/bench_agrupador.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from data.processor import Agrupador  # noqa: E402
+
+
+def filtrar_original(df, filtros):
+    """Implementação anterior: cópia defensiva e um DataFrame novo por coluna filtrada."""
+    df_filtrado = df.copy()
+    for coluna, valor in filtros.items():
+        if valor is not None:
+            if isinstance(valor, list):
+                df_filtrado = df_filtrado[df_filtrado[coluna].isin(valor)]
+            else:
+                df_filtrado = df_filtrado[df_filtrado[coluna] == valor]
+    return df_filtrado
+
+
+def medir(funcao, repeticoes: int = 5):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return melhor, pico, resultado
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    df = ler_particionado(diretorio, categorias=ler_categorias(diretorio))
+    naturezas = sorted(df["NATUREZA"].dropna().unique())
+    vendedores = list(df["VENDEDOR"].dropna().unique()[:2])
+    clientes = list(df["CLIENTE"].dropna().unique()[:5])
+    sem_selecao = {"SUPERVISOR": None, "VENDEDOR": None, "CLIENTE": None, "NATUREZA": naturezas}
+    cenarios = {
+        "Sem seleção (naturezas todas)": sem_selecao,
+        "2 vendedores": {**sem_selecao, "VENDEDOR": vendedores},
+        "Supervisor + 5 clientes + VENDA": {
+            **sem_selecao, "SUPERVISOR": df["SUPERVISOR"].dropna().iloc[0], "CLIENTE": clientes,
+            "NATUREZA": ["VENDA"],
+        },
+    }
+
+    print(f"{len(df):,} linhas, {len(df.columns)} colunas")
+    print(f"{'Cenário':<34} {'Linhas':>9} {'Original (ms)':>14} {'Máscara (ms)':>13} {'Pico orig. (MB)':>16} {'Pico másc. (MB)':>16}")
+    for nome, filtros in cenarios.items():
+        t_orig, pico_orig, _ = medir(lambda: filtrar_original(df, filtros))
+        t_novo, pico_novo, resultado = medir(lambda: Agrupador(df).filtrar(filtros))
+        print(f"{nome:<34} {len(resultado):>9,} {t_orig * 1000:>14.1f} {t_novo * 1000:>13.1f} "
+              f"{pico_orig / 1024 ** 2:>16.1f} {pico_novo / 1024 ** 2:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
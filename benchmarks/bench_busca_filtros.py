@@ -0,0 +1,56 @@
+"""
+Benchmark: listas completas de cliente/produto/SKU x busca com os melhores resultados.
+
+Para cada coluna de busca, compara o que vai para o navegador a cada rerun
+(quantidade de opções e tamanho em JSON) com a lista inteira e com a busca
+(IndiceFiltros.buscar, até LIMITE_OPCOES resultados), e mede o tempo das
+buscas por alguns termos tirados da própria base.
+
+Uso:
+    python benchmarks/bench_busca_filtros.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.indice_filtros import COLUNAS_BUSCA, COLUNAS_FILTRO, IndiceFiltros, normalizar_busca  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from layout.filters import LIMITE_OPCOES  # noqa: E402
+
+
+def medir(funcao, repeticoes: int = 20) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    df = ler_particionado(diretorio, colunas=COLUNAS_FILTRO, categorias=ler_categorias(diretorio))
+    inicio = time.perf_counter()
+    indice = IndiceFiltros(df)
+    print(f"{len(df):,} linhas; índice (1x por versão): {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+          f"{indice.nbytes / 1024 ** 2:.1f} MB")
+
+    print(f"{'Coluna':<8} {'Opções':>8} {'JSON (KB)':>10} {'Busca':>6} {'JSON (KB)':>10} {'Busca (ms)':>11}")
+    for coluna in COLUNAS_BUSCA:
+        opcoes = indice.valores(coluna)
+        # Termos: começo e meio de alguns valores da própria base
+        termos = [normalizar_busca(v)[i:i + 3] for v in opcoes[::max(1, len(opcoes) // 5)] for i in (0, 2)]
+        resultados = indice.buscar(coluna, termos[0], {}, LIMITE_OPCOES)
+        tempo = max(medir(lambda: indice.buscar(coluna, termo, {}, LIMITE_OPCOES)) for termo in termos)
+        print(f"{coluna:<8} {len(opcoes):>8,} {len(json.dumps(opcoes)) / 1024:>10.1f} "
+              f"{len(resultados):>6} {len(json.dumps(resultados)) / 1024:>10.1f} {tempo * 1000:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: colunas de dimensão como strings Python (object) x categóricas.
+
+Mostra a memória por coluna antes/depois e o tempo de um groupby e de um
+isin típicos do Agrupador/views.
+
+Uso:
+    python benchmarks/bench_categoricas.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+import pyarrow.dataset as ds
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.dataset import COLUNAS_CATEGORICAS, PARTICIONAMENTO, ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+
+
+def medir(funcao, repeticoes: int = 3):
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+
+    # Leitura anterior: strings materializadas como objetos Python
+    t_obj, df_obj = medir(
+        lambda: ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO).to_table().to_pandas()
+    )
+    t_cat, df_cat = medir(lambda: ler_particionado(diretorio, categorias=ler_categorias(diretorio)))
+
+    mem_obj = df_obj.memory_usage(deep=True)
+    mem_cat = df_cat.memory_usage(deep=True)
+    print(f"Linhas: {len(df_cat):,}")
+    print(f"{'Coluna':<14} {'object (MB)':>12} {'category (MB)':>14} {'Redução':>8}")
+    for coluna in COLUNAS_CATEGORICAS + ["NATUREZA"]:
+        if coluna in df_cat.columns:
+            antes, depois = mem_obj[coluna] / 1024 ** 2, mem_cat[coluna] / 1024 ** 2
+            print(f"{coluna:<14} {antes:>12.1f} {depois:>14.1f} {antes / depois:>7.0f}x")
+    total_obj, total_cat = mem_obj.sum() / 1024 ** 2, mem_cat.sum() / 1024 ** 2
+    print(f"{'TOTAL':<14} {total_obj:>12.1f} {total_cat:>14.1f} {total_obj / total_cat:>7.1f}x")
+    print()
+    print(f"{'Leitura':<20} {t_obj:7.3f} s (object) x {t_cat:7.3f} s (category)")
+
+    clientes = list(df_obj["CLIENTE"].dropna().unique()[:50])
+    t_isin_obj, _ = medir(lambda: df_obj[df_obj["CLIENTE"].isin(clientes)])
+    t_isin_cat, _ = medir(lambda: df_cat[df_cat["CLIENTE"].isin(clientes)])
+    print(f"{'isin(CLIENTE)':<20} {t_isin_obj:7.3f} s (object) x {t_isin_cat:7.3f} s (category)")
+
+    agrupar = ["VENDEDOR", "COD.PRD"]
+    t_gb_obj, _ = medir(lambda: df_obj.groupby(agrupar)["VL.BRUTO"].sum())
+    t_gb_cat, _ = medir(lambda: df_cat.groupby(agrupar, observed=True)["VL.BRUTO"].sum())
+    print(f"{'groupby(VEND, SKU)':<20} {t_gb_obj:7.3f} s (object) x {t_gb_cat:7.3f} s (category)")
+
+
+if __name__ == "__main__":
+    main()
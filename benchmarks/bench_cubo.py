@@ -0,0 +1,77 @@
+"""
+Benchmark: agregações das páginas sobre as notas filtradas x cubo mensal.
+
+Monta o CuboMensal da base (1x por versão) e compara, para algumas
+agregações típicas das páginas (totais, série mensal, ranking de clientes,
+produto x natureza), o caminho original (filtrar as notas com o Agrupador e
+agrupar) com a consulta ao cubo. O ganho depende de quantas notas caem em
+cada combinação de dimensões no mês: a razão linhas da base / linhas do cubo
+é mostrada junto.
+
+Uso:
+    python benchmarks/bench_cubo.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import numpy as np  # noqa: E402
+
+from data.cubo import DIMENSOES_CUBO, MEDIDAS_CUBO, CuboMensal  # noqa: E402
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from data.processor import Agrupador  # noqa: E402
+
+
+def medir(funcao, repeticoes: int = 5) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def agregar_notas(df, por, medidas, filtros):
+    linhas = Agrupador(df).filtrar(filtros)
+    if not por:
+        return linhas.agg(medidas).to_frame().T
+    return linhas.groupby(por, observed=True).agg(medidas).reset_index()
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    df = ler_particionado(diretorio, colunas=DIMENSOES_CUBO + MEDIDAS_CUBO, categorias=ler_categorias(diretorio))
+
+    inicio = time.perf_counter()
+    cubo = CuboMensal(df)
+    t_cubo = time.perf_counter() - inicio
+    print(f"{len(df):,} linhas; cubo (1x por versão): {len(cubo.fatos):,} linhas "
+          f"({len(df) / max(len(cubo.fatos), 1):.1f}x menos), {t_cubo * 1000:.1f} ms, "
+          f"{cubo.nbytes / 1024 ** 2:.1f} MB")
+
+    vendedores = list(df["VENDEDOR"].dropna().unique()[:3])
+    consultas = {
+        "Totais": ([], {"VL.BRUTO": "sum", "QTDE": "sum"}, {}),
+        "Série mensal": (["ANO_MES"], {"VL.BRUTO": "sum", "QTDE": "sum"}, {"NATUREZA": ["VENDA"]}),
+        "Clientes (vendedores)": (["CLIENTE"], {"VL.BRUTO": "sum"}, {"VENDEDOR": vendedores}),
+        "Produto x natureza": (["DESC", "NATUREZA"], {"QTDE": "sum", "PRECO_UNIT": "mean"}, {}),
+    }
+    print(f"{'Agregação':<22} {'Notas (ms)':>11} {'Cubo (ms)':>10} {'Ganho':>7}")
+    for nome, (por, medidas, filtros) in consultas.items():
+        esperado = agregar_notas(df, por, medidas, filtros)
+        resultado = cubo.consultar(por, medidas, [filtros])
+        assert len(resultado) == len(esperado)
+        for coluna in medidas:
+            assert np.allclose(resultado[coluna].to_numpy(float), esperado[coluna].to_numpy(float), equal_nan=True)
+        t_notas = medir(lambda: agregar_notas(df, por, medidas, filtros))
+        t_cubo = medir(lambda: cubo.consultar(por, medidas, [filtros]))
+        print(f"{nome:<22} {t_notas * 1000:>11.2f} {t_cubo * 1000:>10.2f} {t_notas / t_cubo:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: base carregada com colunas NumPy x colunas Arrow (DTYPE_BACKEND).
+
+Cada modo roda num processo separado, para que o RSS medido seja só o da
+leitura. Mostra o tempo de carga, o RSS do processo antes/depois e o pico,
+além da memória do DataFrame por coluna de texto.
+
+Uso:
+    python benchmarks/bench_dtype_backend.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+MODOS = ["numpy", "pyarrow"]
+
+
+def rss_mb() -> float:
+    """RSS atual do processo (Linux); em outros sistemas, o pico."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        return pico_rss_mb()
+
+
+def pico_rss_mb() -> float:
+    import resource
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+def medir_modo(diretorio: str, modo: str) -> None:
+    """Executado no processo filho: carrega a base uma vez no modo pedido."""
+    from data.dataset import ler_particionado
+    from data.ingestao import ler_categorias
+
+    categorias = ler_categorias(diretorio)
+    antes = rss_mb()
+    inicio = time.perf_counter()
+    df = ler_particionado(diretorio, categorias=categorias, dtype_backend=modo)
+    tempo = time.perf_counter() - inicio
+    depois = rss_mb()
+
+    memoria = df.memory_usage(deep=True)
+    print(f"[{modo}] {len(df):,} linhas; carga {tempo:.3f} s; "
+          f"RSS {antes:,.0f} -> {depois:,.0f} MB (+{depois - antes:,.0f}); pico {pico_rss_mb():,.0f} MB; "
+          f"DataFrame {memoria.sum() / 1024 ** 2:,.1f} MB")
+    for coluna in df.columns:
+        dtype = df[coluna].dtype
+        if dtype == object or str(dtype).startswith("string"):
+            print(f"    {coluna:<14} {str(dtype):<18} {memoria[coluna] / 1024 ** 2:>8.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--modo":
+        medir_modo(sys.argv[2], sys.argv[3])
+        return
+
+    from data.ingestao import ingerir
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    for modo in MODOS:
+        # Três execuções por modo, cada uma num processo novo
+        for _ in range(3):
+            subprocess.run([sys.executable, __file__, "--modo", diretorio, modo], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: período + filtros refeitos a cada rerun x cache compartilhado de linhas filtradas.
+
+Simula uma sessão que passa pelas páginas que leem a base inteira (mesmo
+período e mesmos filtros) e depois mexe várias vezes num controle que não
+muda a seleção (ex.: o slider de faixas da disparidade de preços). O modo
+original refaz fatiar_periodo + Agrupador.filtrar em cada rerun; o novo
+(loader.filtrar_base) filtra uma vez e reaproveita as posições das linhas.
+
+Uso:
+    python benchmarks/bench_filtrados.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import pandas as pd  # noqa: E402
+
+from data.ingestao import ingerir  # noqa: E402
+from data.processor import Agrupador, fatiar_periodo  # noqa: E402
+
+RERUNS_MESMO_ESTADO = 20
+
+
+def filtrar_original(df, filtros, periodo):
+    return Agrupador(fatiar_periodo(df, *periodo)).filtrar(filtros)
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    ingerir(caminho, aba=aba)
+    # O loader lê a origem da base das variáveis de ambiente ao ser importado
+    os.environ["CAMINHO_BASE_DADOS"], os.environ["ABA_EXCEL"] = caminho, aba
+    from data.loader import cache_filtrados, carregar_dados, filtrar_base
+    from data.indice_filtros import COLUNAS_FILTRO
+
+    # Colunas de páginas diferentes sobre as mesmas linhas (todas as naturezas)
+    paginas = {
+        "Cliente": ["EMISSAO", "ANO_MES", "VL.BRUTO", "QTDE", "PRECO_UNIT"] + COLUNAS_FILTRO,
+        "Rede": ["EMISSAO", "ANO_MES", "VL.BRUTO", "QTDE"] + COLUNAS_FILTRO,
+        "Vendedor": ["EMISSAO", "VL.BRUTO", "QTDE"] + COLUNAS_FILTRO,
+    }
+    bases = {nome: carregar_dados(colunas=colunas) for nome, colunas in paginas.items()}
+    df = next(iter(bases.values()))
+    data_max = df["EMISSAO"].max()
+    periodo = (data_max - pd.Timedelta(days=90), data_max)
+    filtros = {
+        "SUPERVISOR": None, "VENDEDOR": list(df["VENDEDOR"].dropna().unique()[:3]), "CLIENTE": None,
+        "NATUREZA": sorted(df["NATUREZA"].dropna().unique()),
+    }
+    reruns = [bases[nome] for nome in paginas] + [bases["Cliente"]] * RERUNS_MESMO_ESTADO
+
+    inicio = time.perf_counter()
+    for base in reruns:
+        esperado = filtrar_original(base, filtros, periodo)
+    t_orig = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for base in reruns:
+        resultado = filtrar_base(base, filtros, periodo)
+    t_novo = time.perf_counter() - inicio
+
+    assert resultado.index.equals(esperado.index)
+    stats = cache_filtrados.estatisticas()
+    print(f"{len(df):,} linhas; {len(resultado):,} após período + filtros; {len(reruns)} reruns")
+    print(f"Refiltrando a cada rerun:  {t_orig * 1000 / len(reruns):>8.3f} ms/rerun")
+    print(f"Cache de linhas filtradas: {t_novo * 1000 / len(reruns):>8.3f} ms/rerun")
+    print(f"Hits: {stats['hits']} · Misses: {stats['misses']} · Taxa de acerto: {stats['hit_rate']:.0%} "
+          f"· {stats['bytes_em_uso'] / 1024:,.0f} KB em cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: opções dos filtros da barra lateral recalculadas a cada rerun x índice por versão.
+
+O modo original refaz, em toda execução do script, o groupby supervisor →
+vendedores e um dropna().unique() + sorted por coluna de filtro (duas vezes
+na página de disparidade). O índice (IndiceFiltros) é construído uma vez por
+versão da base e depois só consultado.
+
+Uso:
+    python benchmarks/bench_indice_filtros.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.indice_filtros import COLUNAS_FILTRO, IndiceFiltros  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+
+
+def opcoes_por_rerun(df):
+    """Cálculo original do FiltroDinamico, repetido a cada rerun."""
+    supervisor_vendedores = df.groupby("SUPERVISOR", observed=True)["VENDEDOR"].unique().apply(list).to_dict()
+    opcoes = {c: sorted([x for x in df[c].dropna().unique() if x]) for c in COLUNAS_FILTRO}
+    return supervisor_vendedores, opcoes
+
+
+def medir(funcao, repeticoes: int = 5) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    df = ler_particionado(diretorio, colunas=COLUNAS_FILTRO, categorias=ler_categorias(diretorio))
+    indice = IndiceFiltros(df)
+
+    t_rerun = medir(lambda: opcoes_por_rerun(df))
+    t_construcao = medir(lambda: IndiceFiltros(df))
+    t_consulta = medir(lambda: [indice.valores(c) for c in COLUNAS_FILTRO] + [indice.opcoes_para("VENDEDOR", {})])
+    print(f"{len(df):,} linhas")
+    print(f"Opções recalculadas por rerun:      {t_rerun * 1000:>10.2f} ms")
+    print(f"Índice: construção (1x por versão): {t_construcao * 1000:>10.2f} ms")
+    print(f"Índice: consulta por rerun:         {t_consulta * 1000:>10.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
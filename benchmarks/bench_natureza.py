@@ -0,0 +1,56 @@
+"""
+Benchmark: classificação de NATUREZA linha a linha (apply) x vetorizada.
+
+Uso:
+    python benchmarks/bench_natureza.py [n_linhas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.loader import classificar_natureza  # noqa: E402
+from data.natureza import classificar_natureza_vetorizado  # noqa: E402
+
+
+def gerar_base(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    tps = np.array(["VS", "VJ", "V3", "VC", "FS", "FJ", "F3", "FC", "DS", "DJ", "D3", "DC", "XX"])
+    descricoes = np.array([f"PRODUTO {i}" for i in range(2000)] + [f"VERBA ACAO {i}" for i in range(50)], dtype=object)
+    desc = descricoes[rng.integers(0, len(descricoes), n)]
+    desc[rng.random(n) < 0.001] = None
+    return pd.DataFrame({"TP": tps[rng.integers(0, len(tps), n)], "DESC": desc})
+
+
+def medir(funcao, repeticoes: int = 1) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    df = gerar_base(n)
+
+    t_apply = medir(lambda: df.apply(lambda row: classificar_natureza(row["TP"], row["DESC"]), axis=1))
+    t_vetor = medir(lambda: classificar_natureza_vetorizado(df["TP"], df["DESC"]), repeticoes=3)
+
+    esperado = df.apply(lambda row: classificar_natureza(row["TP"], row["DESC"]), axis=1)
+    obtido = classificar_natureza_vetorizado(df["TP"], df["DESC"]).astype(str)
+    assert (esperado == obtido).all(), "Classificação vetorizada diverge da referência"
+
+    print(f"Linhas: {n:,}")
+    print(f"apply (linha a linha): {t_apply:8.3f} s")
+    print(f"vetorizado:            {t_vetor:8.3f} s")
+    print(f"Speedup:               {t_apply / t_vetor:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
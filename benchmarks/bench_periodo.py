@@ -0,0 +1,63 @@
+"""
+Benchmark: filtro de período por comparação da coluna inteira x busca binária na base ordenada.
+
+O modo original compara EMISSAO com as duas datas e recorta com a máscara
+(cópia das linhas); o novo (processor.fatiar_periodo) resolve o período com
+searchsorted sobre a base ordenada por EMISSAO e devolve um recorte contíguo.
+
+Uso:
+    python benchmarks/bench_periodo.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import pandas as pd  # noqa: E402
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from data.processor import fatiar_periodo  # noqa: E402
+
+
+def filtrar_original(df, data_ini, data_fim):
+    return df[(df["EMISSAO"] >= pd.to_datetime(data_ini)) & (df["EMISSAO"] <= pd.to_datetime(data_fim))]
+
+
+def medir(funcao, repeticoes: int = 20) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    df = ler_particionado(diretorio, categorias=ler_categorias(diretorio))
+    inicio = time.perf_counter()
+    df = df.sort_values("EMISSAO", kind="stable", ignore_index=True)
+    df.attrs["ordenado_por"] = "EMISSAO"
+    print(f"{len(df):,} linhas; ordenação por EMISSAO (uma vez por versão): {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    data_min, data_max = df["EMISSAO"].min(), df["EMISSAO"].max()
+    meio = data_min + (data_max - data_min) / 2
+    periodos = {
+        "Período inteiro (padrão)": (data_min, data_max),
+        "Último mês": (data_max - pd.Timedelta(days=30), data_max),
+        "Metade do período": (data_min, meio),
+    }
+    print(f"{'Período':<26} {'Linhas':>9} {'Comparação (ms)':>16} {'Busca binária (ms)':>19}")
+    for nome, (data_ini, data_fim) in periodos.items():
+        t_orig = medir(lambda: filtrar_original(df, data_ini, data_fim))
+        t_novo = medir(lambda: fatiar_periodo(df, data_ini, data_fim))
+        linhas = len(fatiar_periodo(df, data_ini, data_fim))
+        print(f"{nome:<26} {linhas:>9,} {t_orig * 1000:>16.2f} {t_novo * 1000:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
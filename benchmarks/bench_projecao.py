@@ -0,0 +1,78 @@
+"""
+Benchmark: leitura da base completa x leitura só das colunas de cada página.
+
+Mede, para cada página do dashboard, o tempo de leitura do dataset
+particionado e a memória do DataFrame resultante.
+
+Uso:
+    python benchmarks/bench_projecao.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir  # noqa: E402
+from data.indice_filtros import COLUNAS_FILTRO  # noqa: E402
+from views import (  # noqa: E402
+    analise_bonificacoes,
+    analise_cliente,
+    analise_contratos,
+    analise_devolucoes,
+    analise_disparidade_precos,
+    analise_produto,
+    analise_rede,
+    analise_vendedor,
+    analise_verba,
+    positivacao_clientes,
+    resumo_executivo,
+)
+
+PAGINAS = {
+    "Filtros (barra lateral)": COLUNAS_FILTRO,
+    "Resumo Executivo": resumo_executivo.COLUNAS,
+    "Análise por Produto": analise_produto.COLUNAS,
+    "Análise por Cliente": analise_cliente.COLUNAS,
+    "Análise por Rede": analise_rede.COLUNAS,
+    "Análise por Vendedor": analise_vendedor.COLUNAS,
+    "Análise de Devoluções": analise_devolucoes.COLUNAS,
+    "Análise de Contratos": analise_contratos.COLUNAS,
+    "Análise de Verbas": analise_verba.COLUNAS,
+    "Análise de Bonificações": analise_bonificacoes.COLUNAS,
+    "Análise de Disparidade de Preços": analise_disparidade_precos.COLUNAS,
+    "Positivação de Clientes": positivacao_clientes.COLUNAS,
+}
+
+
+def medir(funcao, repeticoes: int = 3):
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+
+    t_total, df_total = medir(lambda: ler_particionado(diretorio))
+    mb_total = df_total.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"Base completa: {len(df_total):,} linhas, {df_total.shape[1]} colunas, {mb_total:,.1f} MB, {t_total:.3f} s")
+    print()
+    print(f"{'Página':<34} {'Colunas':>7} {'MB':>9} {'% mem':>6} {'Leitura (s)':>12} {'Speedup':>8}")
+    for pagina, colunas in PAGINAS.items():
+        t, df = medir(lambda: ler_particionado(diretorio, colunas=colunas))
+        mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+        print(
+            f"{pagina:<34} {df.shape[1]:>7} {mb:>9,.1f} {mb / mb_total:>6.0%} "
+            f"{t:>12.3f} {t_total / t:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: um groupby por nível da hierarquia comercial x rollup numa passada.
+
+Reproduz os totais que as páginas pedem sobre supervisor, vendedor e
+cliente (totais gerais, top supervisores/vendedores/clientes, detalhamento
+por cliente, clientes distintos por vendedor e vendedor principal de cada
+cliente). O modo original faz um groupby sobre as notas para cada um; o novo
+(data.rollup.Rollup) agrupa uma vez no grão supervisor → vendedor → cliente
+e lê ou reagrupa os níveis a partir dele.
+
+Uso:
+    python benchmarks/bench_rollup.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import numpy as np  # noqa: E402
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from data.rollup import HIERARQUIA_COMERCIAL, Rollup  # noqa: E402
+
+MEDIDAS = {"VL.BRUTO": "sum", "QTDE": "sum"}
+
+
+def medir(funcao, repeticoes: int = 5) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def totais_original(df):
+    return {
+        "total": df.agg(MEDIDAS).to_frame().T,
+        "SUPERVISOR": df.groupby("SUPERVISOR", observed=True).agg(MEDIDAS).reset_index(),
+        "VENDEDOR": df.groupby("VENDEDOR", observed=True).agg(MEDIDAS).reset_index(),
+        "CLIENTE": df.groupby("CLIENTE", observed=True).agg(MEDIDAS).reset_index(),
+        "clientes por vendedor": df.groupby("VENDEDOR", observed=True).agg({"CLIENTE": "nunique"}).reset_index(),
+        "cliente x vendedor": df.groupby(["CLIENTE", "VENDEDOR"], observed=True).agg(MEDIDAS).reset_index(),
+    }
+
+
+def totais_rollup(df):
+    hierarquia = Rollup(df, list(MEDIDAS))
+    return {
+        "total": hierarquia.nivel(None, MEDIDAS),
+        "SUPERVISOR": hierarquia.nivel("SUPERVISOR", MEDIDAS),
+        "VENDEDOR": hierarquia.agregar(["VENDEDOR"], MEDIDAS),
+        "CLIENTE": hierarquia.agregar(["CLIENTE"], MEDIDAS),
+        "clientes por vendedor": hierarquia.agregar(["VENDEDOR"], {"CLIENTE": "nunique"}),
+        "cliente x vendedor": hierarquia.agregar(["CLIENTE", "VENDEDOR"], MEDIDAS),
+    }
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    df = ler_particionado(diretorio, colunas=HIERARQUIA_COMERCIAL + list(MEDIDAS), categorias=ler_categorias(diretorio))
+
+    esperado, resultado = totais_original(df), totais_rollup(df)
+    for nome, tabela in esperado.items():
+        assert len(tabela) == len(resultado[nome]), nome
+        for coluna in tabela.select_dtypes("number").columns:
+            assert np.allclose(tabela[coluna].to_numpy(float), resultado[nome][coluna].to_numpy(float)), (nome, coluna)
+
+    t_orig = medir(lambda: totais_original(df))
+    t_novo = medir(lambda: totais_rollup(df))
+    grao = len(Rollup(df, list(MEDIDAS)).nivel("CLIENTE", {"VL.BRUTO": "sum"}))
+    print(f"{len(df):,} linhas; grão supervisor → vendedor → cliente: {grao:,} combinações; {len(esperado)} consultas")
+    print(f"Um groupby por consulta: {t_orig * 1000:>8.2f} ms")
+    print(f"Rollup numa passada:     {t_novo * 1000:>8.2f} ms ({t_orig / t_novo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: primeira carga lendo o Parquet particionado x o snapshot Arrow (mmap).
+
+Cada medição roda num processo novo, como após reiniciar o container. Com
+--frio, os arquivos do dataset são antes retirados do cache de páginas do
+sistema (posix_fadvise, só Linux), simulando também um host recém-iniciado.
+
+Uso:
+    python benchmarks/bench_snapshot.py [caminho_excel_ou_diretorio] [aba] [--frio]
+"""
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+ORIGENS = ["parquet", "snapshot"]
+
+
+def descartar_cache(diretorio: str) -> None:
+    """Pede ao sistema para tirar do cache de páginas os arquivos do dataset."""
+    for raiz, _, arquivos in os.walk(diretorio):
+        for nome in arquivos:
+            fd = os.open(os.path.join(raiz, nome), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def medir_origem(diretorio: str, origem: str, dtype_backend: str) -> None:
+    """Executado no processo filho: primeira leitura da base e das colunas da barra lateral."""
+    from data import dataset
+    from data.ingestao import ler_categorias
+    from data.indice_filtros import COLUNAS_FILTRO
+
+    if origem == "parquet":
+        dataset.abrir_snapshot = lambda diretorio, filtro=None: None
+    categorias = ler_categorias(diretorio)
+
+    inicio = time.perf_counter()
+    df = dataset.ler_particionado(diretorio, categorias=categorias, dtype_backend=dtype_backend)
+    t_base = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    dataset.ler_particionado(diretorio, colunas=COLUNAS_FILTRO, categorias=categorias, dtype_backend=dtype_backend)
+    t_filtros = time.perf_counter() - inicio
+    print(f"{origem:<10} {dtype_backend:<8} {len(df):>10,} {t_base:>12.3f} {t_filtros:>14.3f}")
+
+
+def main():
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "--origem" in sys.argv:
+        medir_origem(*argumentos)
+        return
+
+    from data.dataset import NOME_SNAPSHOT
+    from data.ingestao import ingerir
+
+    caminho = argumentos[0] if argumentos else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = argumentos[1] if len(argumentos) > 1 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    tamanho = sum(
+        os.path.getsize(os.path.join(raiz, nome)) for raiz, _, arquivos in os.walk(diretorio) for nome in arquivos
+    )
+    snapshot = sum(
+        os.path.getsize(os.path.join(raiz, NOME_SNAPSHOT))
+        for raiz, _, arquivos in os.walk(diretorio) if NOME_SNAPSHOT in arquivos
+    )
+    print(f"Dataset: {(tamanho - snapshot) / 1024 ** 2:,.1f} MB em Parquet, snapshots {snapshot / 1024 ** 2:,.1f} MB")
+    print(f"{'Origem':<10} {'Backend':<8} {'Linhas':>10} {'Base (s)':>12} {'Filtros (s)':>14}")
+    for dtype_backend in ["numpy", "pyarrow"]:
+        for origem in ORIGENS:
+            for _ in range(3):
+                if "--frio" in sys.argv:
+                    descartar_cache(diretorio)
+                subprocess.run(
+                    [sys.executable, __file__, "--origem", diretorio, origem, dtype_backend], check=True
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: backend Parquet (lê e filtra/agrupa no pandas) x SQLite (WHERE e GROUP BY no banco).
+
+Para consultas típicas das páginas, mostra quantas linhas cada backend
+entrega à sessão e o tempo de cada um.
+
+Uso:
+    python benchmarks/bench_sqlite.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from data.banco import agregar_banco, consultar_banco, sincronizar_banco  # noqa: E402
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from data.processor import Agrupador  # noqa: E402
+from views import analise_vendedor, positivacao_clientes  # noqa: E402
+
+
+def medir(funcao, repeticoes: int = 3):
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    inicio = time.perf_counter()
+    sincronizar_banco(diretorio)
+    print(f"Sincronização do banco: {time.perf_counter() - inicio:.2f} s")
+    categorias = ler_categorias(diretorio)
+
+    base = ler_particionado(diretorio, colunas=["VENDEDOR", "CLIENTE"], categorias=categorias)
+    vendedores = list(base["VENDEDOR"].dropna().unique()[:2])
+    clientes = list(base["CLIENTE"].dropna().unique()[:5])
+    consultas = {
+        "Vendedor: 2 vendedores": (analise_vendedor.COLUNAS, {"VENDEDOR": vendedores}),
+        "Vendedor: 5 clientes": (analise_vendedor.COLUNAS, {"CLIENTE": clientes}),
+    }
+
+    print(f"{'Consulta':<34} {'Linhas Parquet':>15} {'Linhas SQLite':>14} {'Parquet (s)':>12} {'SQLite (s)':>11}")
+    for nome, (colunas, filtros) in consultas.items():
+        t_pq, _ = medir(
+            lambda: Agrupador(ler_particionado(diretorio, colunas=colunas, categorias=categorias)).filtrar(filtros)
+        )
+        t_sql, df_sql = medir(
+            lambda: consultar_banco(diretorio, colunas=colunas, filtros=filtros, categorias=categorias)
+        )
+        print(f"{nome:<34} {len(base):>15,} {len(df_sql):>14,} {t_pq:>12.3f} {t_sql:>11.3f}")
+
+    agregacao = positivacao_clientes.AGREGACAO
+    colunas = agregacao["por"] + list(agregacao["medidas"])
+    t_pq, _ = medir(
+        lambda: ler_particionado(diretorio, colunas=colunas, categorias=categorias)
+        .groupby(agregacao["por"], observed=True, dropna=False).agg(agregacao["medidas"]).reset_index()
+    )
+    t_sql, df_sql = medir(lambda: agregar_banco(diretorio, categorias=categorias, **agregacao))
+    print(f"{'Positivação: cliente x mês':<34} {len(base):>15,} {len(df_sql):>14,} {t_pq:>12.3f} {t_sql:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: groupby + sort/nlargest por ranking x Top N numa passada (bincount + seleção parcial).
+
+Reproduz os rankings das páginas (os quatro do Resumo/Cliente/Vendedor e os
+cinco da Análise de Contratos) sobre a base inteira: o modo original faz um
+groupby por ranking e ordena os grupos para ficar com 10; o novo
+(data.top_n.top_n) converte cada dimensão em códigos uma vez, soma com
+np.bincount e seleciona os 10 maiores com np.partition.
+
+Uso:
+    python benchmarks/bench_top_n.py [caminho_excel_ou_diretorio] [aba]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import numpy as np  # noqa: E402
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import ingerir, ler_categorias  # noqa: E402
+from data.top_n import top_n  # noqa: E402
+
+K = 10
+
+
+def medir(funcao, repeticoes: int = 5) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def rankings_original(df, pares):
+    return {
+        (dimensao, medida): df.groupby(dimensao, observed=True)[medida].sum().sort_values(ascending=True).tail(K).reset_index()
+        for dimensao, medida in pares
+    }
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    aba = sys.argv[2] if len(sys.argv) > 2 else os.getenv("ABA_EXCEL", "Planilha1")
+    diretorio = ingerir(caminho, aba=aba)
+    colunas = ["CLIENTE", "COD.PRD", "DESC", "REDE", "SUPERVISOR", "VENDEDOR", "VL.BRUTO", "QTDE", "CONTRATO"]
+    df = ler_particionado(diretorio, colunas=colunas, categorias=ler_categorias(diretorio))
+
+    cenarios = {
+        "Rankings (4)": [("COD.PRD", "VL.BRUTO"), ("CLIENTE", "VL.BRUTO"), ("COD.PRD", "QTDE"), ("SUPERVISOR", "VL.BRUTO")],
+        "Contratos (5)": [(c, "CONTRATO") for c in ["CLIENTE", "DESC", "REDE", "SUPERVISOR", "VENDEDOR"]],
+    }
+    print(f"{len(df):,} linhas; {df['CLIENTE'].nunique():,} clientes, {df['COD.PRD'].nunique():,} produtos")
+    print(f"{'Cenário':<15} {'groupby + sort (ms)':>20} {'Top N (ms)':>11} {'Ganho':>7}")
+    for nome, pares in cenarios.items():
+        esperado, resultado = rankings_original(df, pares), top_n(df, pares, K)
+        for par in pares:
+            # Mesmos totais (a ordem entre empates pode variar)
+            assert np.allclose(np.sort(esperado[par][par[1]]), np.sort(resultado[par][par[1]]))
+        t_orig = medir(lambda: rankings_original(df, pares))
+        t_novo = medir(lambda: top_n(df, pares, K))
+        print(f"{nome:<15} {t_orig * 1000:>20.2f} {t_novo * 1000:>11.2f} {t_orig / t_novo:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Produtor de lotes: simula o ERP enviando notas fiscais ao serviço de lotes.
+
+Sorteia linhas da base já ingerida (datas trocadas para o mês corrente),
+envia lotes de alguns tamanhos para POST /lotes e mostra a latência de cada
+um, do envio até a nova versão publicada. Com o serviço parado, aplica os
+lotes direto com ingerir_lote.
+
+Uso:
+    python benchmarks/produtor_lotes.py [caminho_excel_ou_diretorio] [url]
+"""
+import os
+import sys
+import json
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import pandas as pd  # noqa: E402
+
+from data.dataset import ler_particionado  # noqa: E402
+from data.ingestao import caminho_dataset, ingerir_lote  # noqa: E402
+from data.schema import SCHEMA_VENDAS  # noqa: E402
+
+TAMANHOS = [1, 10, 100, 1000, 10000]
+
+
+def sortear_linhas(base: pd.DataFrame, n: int, semente: int) -> list:
+    amostra = base.sample(n, replace=True, random_state=semente).copy()
+    amostra["EMISSAO"] = pd.Timestamp.now().normalize().strftime("%Y-%m-%d")
+    amostra = amostra.astype(object).where(amostra.notna(), None)
+    return amostra.to_dict("records")
+
+
+def enviar(url: str, linhas: list) -> dict:
+    requisicao = urllib.request.Request(
+        url, data=json.dumps({"linhas": linhas}).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(requisicao) as resposta:
+        return json.loads(resposta.read())
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAMINHO_BASE_DADOS", "dados_.xlsx")
+    url = sys.argv[2] if len(sys.argv) > 2 else f"http://localhost:{os.getenv('PORTA_LOTES', '8502')}/lotes"
+    colunas = [c for c in SCHEMA_VENDAS if c != "EMISSAO"]
+    base = ler_particionado(caminho_dataset(caminho), colunas=colunas)
+    base = base[[c for c in colunas if c in base.columns]].astype(object)
+    try:
+        urllib.request.urlopen(url.rsplit("/", 1)[0], timeout=1)
+    except urllib.error.HTTPError:
+        pass
+    except OSError:
+        print(f"Serviço fora do ar em {url}; aplicando os lotes direto no dataset.")
+        url = None
+
+    print(f"{'Linhas':>8} {'Lote':>6} {'Latência (s)':>13} {'Linhas/s':>10}")
+    for semente, tamanho in enumerate(TAMANHOS):
+        linhas = sortear_linhas(base, tamanho, semente)
+        inicio = time.perf_counter()
+        resumo = enviar(url, linhas) if url else ingerir_lote(caminho, pd.DataFrame.from_records(linhas))
+        tempo = time.perf_counter() - inicio
+        print(f"{tamanho:>8,} {resumo['lote']:>6} {tempo:>13.3f} {tamanho / tempo:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
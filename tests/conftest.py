@@ -0,0 +1,80 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+# (supervisor, vendedor): V1 atende dois supervisores; há supervisor e vendedor nulos
+EQUIPES = [("S1", "V1"), ("S1", "V2"), ("S2", "V1"), ("S2", "V3"), (None, "V4"), ("S3", None)]
+CLIENTES = ["C01", "C02", "C03", "C04", "C05", "C06", "C07", "C08", None]
+PRODUTOS = {"P1": "CAFE 500G", "P2": "CAFE 1KG", "P3": "FILTRO", "P4": "ACUCAR"}
+
+
+def exportacao_erp(linhas: int = 60, inicio: str = "2024-01-01", dias: int = 90, semente: int = 1) -> pd.DataFrame:
+    """Linhas no formato da planilha exportada pelo ERP (colunas da aba Planilha1)."""
+    rng = np.random.default_rng(semente)
+    qtde = rng.integers(1, 30, linhas).astype(float)
+    return pd.DataFrame({
+        "EMISSAO": pd.Timestamp(inicio) + pd.to_timedelta(np.sort(rng.integers(0, dias, linhas)), unit="D"),
+        "TP": rng.choice(["VS", "VJ", "FS", "DS", "XX"], linhas),
+        "CLIENTE": rng.choice(["MERCADO A", "MERCADO B", " mercado c ", "PADARIA D"], linhas),
+        "COD.PRD": rng.choice([101, 102, 103], linhas),
+        "DESC": rng.choice(["CAFE 500G", "CAFE 1KG", "VERBA ACAO"], linhas),
+        "SUPERVISOR": rng.choice(["ANA", "BRUNO"], linhas),
+        "VENDEDOR": rng.choice(["CARLOS", "DIANA", "EDU"], linhas),
+        "REDE": rng.choice(["REDE 1", "REDE 2"], linhas),
+        "QTDE": qtde,
+        "VL.BRUTO": np.round(qtde * rng.uniform(10, 20, linhas), 2),
+    })
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    """Grava as linhas numa planilha .xlsx (aba Planilha1) e devolve o caminho."""
+    def gravar(df: pd.DataFrame, nome: str = "dados.xlsx") -> str:
+        caminho = str(tmp_path / nome)
+        df.to_excel(caminho, sheet_name="Planilha1", index=False)
+        return caminho
+    return gravar
+
+
+@pytest.fixture
+def notas() -> pd.DataFrame:
+    """
+    Notas de três meses, ordenadas por EMISSAO, como as devolvidas pelo loader.
+
+    Dimensões categóricas com uma categoria sem linhas (as categorias estáveis
+    da base inteira), nulos nas dimensões e nas medidas.
+    """
+    rng = np.random.default_rng(7)
+    n = 240
+    emissao = np.sort(pd.Timestamp("2024-01-01").to_datetime64() + rng.integers(0, 91, n).astype("timedelta64[D]"))
+    equipes = [EQUIPES[i] for i in rng.integers(0, len(EQUIPES), n)]
+    produtos = rng.choice(list(PRODUTOS), n)
+    qtde = rng.integers(1, 40, n)
+    valor = np.round(qtde * rng.uniform(5, 30, n), 2)
+    valor[[3, 50]] = np.nan
+    df = pd.DataFrame({
+        "EMISSAO": pd.to_datetime(emissao),
+        "NATUREZA": rng.choice(["VENDA", "VENDA", "VENDA", "BONIFICACAO", "DEVOLUCAO"], n),
+        "SUPERVISOR": [s for s, _ in equipes],
+        "VENDEDOR": [v for _, v in equipes],
+        "REDE": rng.choice(["R1", "R2", None], n),
+        "CLIENTE": [CLIENTES[i] for i in rng.integers(0, len(CLIENTES), n)],
+        "COD.PRD": produtos,
+        "DESC": [PRODUTOS[p] for p in produtos],
+        "VL.BRUTO": valor,
+        "QTDE": qtde,
+        "CONTRATO": np.where(rng.random(n) < 0.3, np.nan, np.round(rng.uniform(0, 50, n), 2)),
+    })
+    df["ANO_MES"] = df["EMISSAO"].dt.strftime("%Y-%m")
+    df["PRECO_UNIT"] = df["VL.BRUTO"] / df["QTDE"]
+    for coluna in ["NATUREZA", "SUPERVISOR", "VENDEDOR", "REDE", "CLIENTE", "COD.PRD", "DESC"]:
+        valores = sorted(df[coluna].dropna().unique())
+        df[coluna] = pd.Categorical(df[coluna], categories=valores + ["SEM LINHAS"])
+    return df
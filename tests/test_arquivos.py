@@ -0,0 +1,87 @@
+# tests/test_arquivos.py
+
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from conftest import exportacao_erp
+from utils import conversor
+from utils.arquivos import gravar_atomico, trava_exclusiva
+
+
+def test_trava_exclusiva_serializa_quem_usa_o_mesmo_arquivo(tmp_path):
+    trava = str(tmp_path / "base.lock")
+    dentro, eventos = [], []
+
+    def trabalhar(nome):
+        with trava_exclusiva(trava):
+            dentro.append(nome)
+            eventos.append(len(dentro))
+            time.sleep(0.02)
+            dentro.remove(nome)
+
+    threads = [threading.Thread(target=trabalhar, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert eventos == [1] * 5
+
+
+def test_gravar_atomico_substitui_sem_deixar_temporario(tmp_path):
+    caminho = str(tmp_path / "base.hash")
+    gravar_atomico(caminho, "antigo")
+    gravar_atomico(caminho, "novo")
+    with open(caminho) as f:
+        assert f.read() == "novo"
+    assert os.listdir(tmp_path) == ["base.hash"]
+
+
+def test_conversoes_concorrentes_convertem_uma_vez(planilha, monkeypatch):
+    caminho = planilha(exportacao_erp())
+    conversoes = []
+    original = conversor.converter_excel_pandas
+
+    def converter(*args, **kwargs):
+        conversoes.append(threading.get_ident())
+        time.sleep(0.05)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(conversor, "converter_excel_pandas", converter)
+    resultados = []
+    threads = [
+        threading.Thread(target=lambda: resultados.append(conversor.converter_para_parquet(caminho)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(conversoes) == 1
+    assert len(set(resultados)) == 1 and len(pd.read_parquet(resultados[0])) == 60
+    assert not [n for n in os.listdir(os.path.dirname(caminho)) if n.endswith(".tmp")]
+
+
+def test_falha_na_conversao_mantem_a_versao_publicada(planilha, monkeypatch):
+    caminho = planilha(exportacao_erp())
+    parquet = conversor.converter_para_parquet(caminho)
+    with open(caminho.replace(".xlsx", ".hash")) as f:
+        hash_publicado = f.read()
+
+    def falhar(caminho_excel, caminho_parquet, **kwargs):
+        with open(caminho_parquet, "wb") as f:
+            f.write(b"metade de um parquet")
+        raise RuntimeError("conversão interrompida")
+
+    monkeypatch.setattr(conversor, "converter_excel_pandas", falhar)
+    planilha(exportacao_erp(semente=9))
+    with pytest.raises(RuntimeError):
+        conversor.converter_para_parquet(caminho)
+
+    assert len(pd.read_parquet(parquet)) == 60
+    with open(caminho.replace(".xlsx", ".hash")) as f:
+        assert f.read() == hash_publicado
+    assert not [n for n in os.listdir(os.path.dirname(caminho)) if n.endswith(".tmp")]
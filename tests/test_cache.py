@@ -0,0 +1,92 @@
+# tests/test_cache.py
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.cache import CacheLRU, tamanho_em_bytes
+
+
+def quadro(linhas: int) -> pd.DataFrame:
+    return pd.DataFrame({"VL.BRUTO": np.zeros(linhas)})
+
+
+def test_constroi_uma_vez_por_chave():
+    cache = CacheLRU("teste", 10 * 1024 ** 2)
+    chamadas = []
+    construir = lambda: chamadas.append(1) or quadro(10)
+
+    primeiro = cache.obter("a", construir)
+    assert cache.obter("a", construir) is primeiro
+    assert len(chamadas) == 1
+    estatisticas = cache.estatisticas()
+    assert (estatisticas["hits"], estatisticas["misses"], estatisticas["entradas"]) == (1, 1, 1)
+    assert estatisticas["bytes_em_uso"] == tamanho_em_bytes(primeiro)
+
+
+def test_descarta_as_menos_usadas_acima_do_teto():
+    tamanho = tamanho_em_bytes(quadro(1000))
+    cache = CacheLRU("teste", int(tamanho * 2.5))
+    cache.obter("a", lambda: quadro(1000))
+    cache.obter("b", lambda: quadro(1000))
+    cache.obter("a", lambda: quadro(1000))  # "a" passa a ser a mais recente
+    cache.obter("c", lambda: quadro(1000))
+
+    assert cache.estatisticas()["evictions"] == 1
+    assert cache.bytes_em_uso <= cache.limite_bytes
+    chamadas = []
+    cache.obter("a", lambda: chamadas.append("a") or quadro(1000))
+    cache.obter("b", lambda: chamadas.append("b") or quadro(1000))
+    assert chamadas == ["b"]
+
+
+def test_entrada_maior_que_o_teto_fica_sozinha():
+    cache = CacheLRU("teste", 1)
+    cache.obter("a", lambda: quadro(10))
+    grande = cache.obter("b", lambda: quadro(10_000))
+    assert cache.estatisticas()["entradas"] == 1
+    assert cache.obter("b", lambda: quadro(1)) is grande
+
+
+def test_invalidar():
+    cache = CacheLRU("teste", 10 * 1024 ** 2)
+    cache.obter("a", lambda: quadro(10))
+    cache.obter("b", lambda: quadro(10))
+    cache.invalidar("a")
+    assert cache.estatisticas()["entradas"] == 1
+    cache.invalidar()
+    assert cache.estatisticas()["entradas"] == 0
+    assert cache.bytes_em_uso == 0
+
+
+def test_migrar_troca_chaves_e_mantem_a_ordem_de_uso():
+    cache = CacheLRU("teste", 10 * 1024 ** 2)
+    for chave in ["a", "b", "c"]:
+        cache.obter(chave, lambda: quadro(10))
+    cache.obter("a", lambda: quadro(10))
+    cache.migrar(lambda chave, valor: None if chave == "b" else (chave.upper(), quadro(20)))
+
+    assert list(cache._entradas) == ["C", "A"]
+    assert cache.bytes_em_uso == 2 * tamanho_em_bytes(quadro(20))
+    assert len(cache.obter("A", lambda: quadro(1))) == 20
+
+
+def test_sessoes_concorrentes_constroem_uma_vez():
+    cache = CacheLRU("teste", 10 * 1024 ** 2)
+    chamadas = []
+
+    def construir():
+        chamadas.append(1)
+        time.sleep(0.05)
+        return quadro(10)
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter("a", construir))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(chamadas) == 1
+    assert all(r is resultados[0] for r in resultados)
@@ -0,0 +1,78 @@
+# tests/test_consulta.py
+
+import uuid
+
+import pandas as pd
+import pytest
+
+from data import consulta, loader
+from data.cache import CacheLRU
+from data.consulta import Consulta
+from data.cubo import CuboMensal
+from data.processor import Agrupador
+from test_cubo import MEDIDAS, agrupar, comparar
+
+
+@pytest.fixture
+def leitura(notas, monkeypatch):
+    """As notas como uma leitura do loader (versão própria) e as consultas ao cubo da versão."""
+    df = notas.copy()
+    df.attrs["ordenado_por"] = "EMISSAO"
+    df.attrs["origem_linhas"] = (uuid.uuid4().hex, len(df), "EMISSAO", None, None, None, None)
+    cubo = CuboMensal(df)
+    versoes = []
+
+    def cubo_mensal(versao):
+        versoes.append(versao)
+        return cubo
+
+    monkeypatch.setattr(loader, "cache_filtrados", CacheLRU("filtrados", 64 * 1024 ** 2))
+    monkeypatch.setattr(loader, "cubo_mensal", cubo_mensal)
+    monkeypatch.setattr(consulta, "cubo_mensal", cubo_mensal)
+    return df, versoes
+
+
+def selecionar(df, filtros, periodo, recorte):
+    linhas = Agrupador(df).filtrar(recorte)
+    linhas = Agrupador(linhas).filtrar(filtros)
+    if periodo is not None:
+        linhas = linhas[linhas["EMISSAO"].between(*pd.to_datetime(list(periodo)))]
+    return linhas
+
+
+@pytest.mark.parametrize("periodo, pelo_cubo", [
+    (None, True),
+    (("2024-01-01", "2024-02-29"), True),
+    (("2024-01-10", "2024-02-15"), False),
+    (("2024-02-01", "2024-03-20"), False),
+])
+def test_consulta_pelo_cubo_e_pelas_linhas(leitura, periodo, pelo_cubo):
+    df, versoes = leitura
+    filtros = {"VENDEDOR": ["V1", "V3"]}
+    selecao = Consulta(df, filtros, periodo, recorte={"NATUREZA": "VENDA"})
+    linhas = selecionar(df, filtros, periodo, {"NATUREZA": "VENDA"})
+
+    for por in [[], ["SUPERVISOR", "VENDEDOR"], ["ANO_MES", "COD.PRD"]]:
+        comparar(selecao.agregar(por, MEDIDAS), agrupar(linhas, por, MEDIDAS), por)
+    ranking = selecao.ranking([("CLIENTE", "VL.BRUTO"), ("DESC", "VL.BRUTO")], k=3)
+    for dimensao in ["CLIENTE", "DESC"]:
+        esperado = linhas.groupby(dimensao, observed=True)["VL.BRUTO"].sum().nlargest(3)[::-1].reset_index()
+        comparar(ranking[(dimensao, "VL.BRUTO")], esperado, [])
+
+    somas = {"VL.BRUTO": "sum", "QTDE": "sum"}
+    rollup = selecao.rollup(["VL.BRUTO", "QTDE"])
+    comparar(rollup.nivel("VENDEDOR", somas), agrupar(linhas, ["SUPERVISOR", "VENDEDOR"], somas), ["SUPERVISOR", "VENDEDOR"])
+
+    pd.testing.assert_frame_equal(selecao.linhas(), linhas)
+    assert bool(versoes) == pelo_cubo
+
+
+def test_consulta_fora_do_cubo_agrupa_as_linhas(leitura):
+    df, versoes = leitura
+    # Coluna fora do cubo, variante de coluna e leitura limitada por período vão às linhas
+    comparar(Consulta(df).agregar(["EMISSAO"], {"VL.BRUTO": "sum"}), agrupar(df, ["EMISSAO"], {"VL.BRUTO": "sum"}), ["EMISSAO"])
+    comparar(Consulta(df, variante="CLIENTE_NORM").agregar([], MEDIDAS), agrupar(df, [], MEDIDAS), [])
+    recortada = df.copy()
+    recortada.attrs["origem_linhas"] = df.attrs["origem_linhas"][:3] + ("2024-01-01", None, None, None)
+    comparar(Consulta(recortada).agregar(["VENDEDOR"], MEDIDAS), agrupar(df, ["VENDEDOR"], MEDIDAS), ["VENDEDOR"])
+    assert versoes == [df.attrs["origem_linhas"][0]]
@@ -0,0 +1,92 @@
+# tests/test_conversor.py
+
+import hashlib
+import os
+import zlib
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import exportacao_erp
+from data.schema import COLUNA_LINHA
+from utils import conversor
+from utils.conversor import hash_arquivo, hash_com_manifesto
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = tmp_path / "dados.bin"
+    caminho.write_bytes(os.urandom(300_000))
+    return str(caminho)
+
+
+def test_hash_em_blocos_igual_ao_do_arquivo_inteiro(arquivo):
+    with open(arquivo, "rb") as f:
+        conteudo = f.read()
+    assert hash_arquivo(arquivo, "md5", tamanho_bloco=4096) == hashlib.md5(conteudo).hexdigest()
+    assert hash_arquivo(arquivo, "blake2b", tamanho_bloco=4096) == hashlib.blake2b(conteudo).hexdigest()
+    assert hash_arquivo(arquivo, "crc32", tamanho_bloco=4096) == f"{zlib.crc32(conteudo):08x}"
+    with pytest.raises(ValueError):
+        hash_arquivo(arquivo, "sha0")
+
+
+def test_manifesto_evita_reler_arquivo_inalterado(arquivo, tmp_path, monkeypatch):
+    manifesto = str(tmp_path / "dados.manifest.json")
+    calculados = []
+    original = conversor.hash_arquivo
+    monkeypatch.setattr(conversor, "hash_arquivo", lambda *a, **k: calculados.append(a[0]) or original(*a, **k))
+
+    primeiro = hash_com_manifesto(arquivo, manifesto)
+    assert hash_com_manifesto(arquivo, manifesto) == primeiro
+    assert len(calculados) == 1
+
+    # Conteúdo novo muda tamanho/mtime: o hash é recalculado
+    with open(arquivo, "ab") as f:
+        f.write(b"mais")
+    assert hash_com_manifesto(arquivo, manifesto) != primeiro
+    assert len(calculados) == 2
+    # Outro algoritmo não reaproveita o hash gravado
+    hash_com_manifesto(arquivo, manifesto, algoritmo="crc32")
+    assert len(calculados) == 3
+
+
+def test_conversao_so_quando_o_excel_muda(planilha, monkeypatch):
+    caminho = planilha(exportacao_erp())
+    leituras = []
+    original = pd.read_excel
+    monkeypatch.setattr(pd, "read_excel", lambda *a, **k: leituras.append(a[0]) or original(*a, **k))
+
+    parquet = conversor.converter_para_parquet(caminho)
+    conversor.converter_para_parquet(caminho)
+    assert len(leituras) == 1
+    assert len(pd.read_parquet(parquet)) == 60
+
+    planilha(exportacao_erp(semente=2))
+    conversor.converter_para_parquet(caminho)
+    assert len(leituras) == 2
+
+
+def test_streaming_igual_a_leitura_inteira(planilha, tmp_path):
+    exportacao = exportacao_erp(linhas=60)
+    exportacao.loc[[5, 40], "VL.BRUTO"] = None  # linhas rejeitadas, uma em cada lote
+    caminho = planilha(exportacao)
+    destino, inteira = str(tmp_path / "streaming.parquet"), str(tmp_path / "pandas.parquet")
+
+    relatorio = conversor.converter_excel_streaming(caminho, destino, tamanho_lote=7)
+    assert relatorio == conversor.converter_excel_pandas(caminho, inteira)
+    assert (relatorio["linhas_entrada"], relatorio["linhas_rejeitadas"]) == (60, 2)
+    # Um row group por lote: o pico de memória é o de um lote
+    assert pq.ParquetFile(destino).metadata.num_row_groups == 9
+    assert pq.read_schema(destino) == pq.read_schema(inteira)
+    pd.testing.assert_frame_equal(pd.read_parquet(destino), pd.read_parquet(inteira))
+    # Número da linha na planilha (cabeçalho na linha 1), sem as rejeitadas
+    linhas = pd.read_parquet(destino)[COLUNA_LINHA].tolist()
+    assert linhas == [n for n in range(2, 62) if n not in (7, 42)]
+
+
+def test_streaming_so_com_cabecalho(planilha, tmp_path):
+    caminho = planilha(exportacao_erp().iloc[:0])
+    destino = str(tmp_path / "vazio.parquet")
+    assert conversor.converter_excel_streaming(caminho, destino)["linhas_entrada"] == 0
+    assert list(pd.read_parquet(destino).columns) == list(exportacao_erp().columns) + [COLUNA_LINHA]
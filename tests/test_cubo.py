@@ -0,0 +1,88 @@
+# tests/test_cubo.py
+
+"""O cubo mensal contra o groupby do pandas sobre as mesmas notas."""
+
+import pandas as pd
+import pytest
+
+from data.cubo import CuboMensal, fatos_mensais, somar_fatos_mensais
+from data.processor import Agrupador
+
+MEDIDAS = {"VL.BRUTO": "sum", "QTDE": "sum", "CONTRATO": "mean", "PRECO_UNIT": "count", "CLIENTE": "size"}
+AGRUPAMENTOS = [
+    [],
+    ["NATUREZA"],
+    ["SUPERVISOR", "VENDEDOR"],
+    ["VENDEDOR"],
+    ["ANO_MES", "CLIENTE"],
+    ["REDE", "COD.PRD", "DESC"],
+]
+
+
+def agrupar(df: pd.DataFrame, por, medidas) -> pd.DataFrame:
+    """O resultado de referência: groupby(observed=True).agg, ou os totais sem `por`."""
+    if not por:
+        return df.agg(medidas).to_frame().T.reset_index(drop=True)
+    return df.groupby(por, observed=True).agg(medidas).reset_index()
+
+
+def comparar(obtido: pd.DataFrame, esperado: pd.DataFrame, por) -> None:
+    """Mesmos grupos e valores, sem depender da ordem das linhas nem do tipo numérico."""
+    if por:
+        obtido = obtido.sort_values(por).reset_index(drop=True)
+        esperado = esperado.sort_values(por).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        obtido[list(esperado.columns)], esperado, check_dtype=False, check_categorical=False
+    )
+
+
+def medidas_sem(coluna: str) -> dict:
+    """MEDIDAS, contando linhas por outra coluna quando `coluna` é de agrupamento."""
+    return {c: f for c, f in MEDIDAS.items() if c != coluna} | ({"VL.BRUTO": "size"} if coluna == "CLIENTE" else {})
+
+
+@pytest.mark.parametrize("por", AGRUPAMENTOS)
+def test_cubo_igual_ao_groupby(notas, por):
+    medidas = medidas_sem("CLIENTE") if "CLIENTE" in por else MEDIDAS
+    comparar(CuboMensal(notas).consultar(por, medidas), agrupar(notas, por, medidas), por)
+
+
+def test_cubo_com_filtros_e_meses(notas):
+    selecoes = [{"NATUREZA": ["VENDA", "BONIFICACAO"]}, {"VENDEDOR": "V1", "REDE": ["R1"]}]
+    linhas = notas
+    for selecao in selecoes:
+        linhas = Agrupador(linhas).filtrar(selecao)
+    linhas = linhas[linhas["ANO_MES"].between("2024-02", "2024-03")]
+
+    cubo = CuboMensal(notas)
+    for por in [[], ["SUPERVISOR"], ["CLIENTE", "COD.PRD"]]:
+        medidas = medidas_sem("CLIENTE") if "CLIENTE" in por else MEDIDAS
+        obtido = cubo.consultar(por, medidas, selecoes, meses=("2024-02", "2024-03"))
+        comparar(obtido, agrupar(linhas, por, medidas), por)
+
+
+def test_responde(notas):
+    cubo = CuboMensal(notas)
+    assert cubo.linhas_base == len(notas)
+    assert cubo.responde(["SUPERVISOR", "ANO_MES"], {"VL.BRUTO": "sum", "CONTRATO": "mean"})
+    assert not cubo.responde(["EMISSAO"], {"VL.BRUTO": "sum"})
+    assert not cubo.responde([], {"VL.BRUTO": "median"})
+
+
+def test_fatos_gravados_somam_lotes(notas):
+    # O lote começa no meio de fevereiro: o mês aparece nos fatos gravados e no lote
+    corte = int(notas["EMISSAO"].searchsorted(pd.Timestamp("2024-02-15")))
+    gravados = fatos_mensais(notas.iloc[:corte])
+    somados = somar_fatos_mensais(gravados, fatos_mensais(notas.iloc[corte:]))
+
+    inteiros = fatos_mensais(notas)
+    dimensoes = [c for c in inteiros.columns if c in CuboMensal(notas).dimensoes]
+    comparar(somados, inteiros, dimensoes)
+    assert somados.dtypes.equals(gravados.dtypes)
+
+    cubo = CuboMensal.dos_fatos(somados)
+    assert cubo.linhas_base == len(notas)
+    texto = notas.astype({c: object for c in dimensoes})
+    for por in AGRUPAMENTOS:
+        medidas = medidas_sem("CLIENTE") if "CLIENTE" in por else MEDIDAS
+        comparar(cubo.consultar(por, medidas), agrupar(texto, por, medidas), por)
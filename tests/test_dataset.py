@@ -0,0 +1,101 @@
+# tests/test_dataset.py
+
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from pandas.testing import assert_frame_equal
+
+from conftest import exportacao_erp
+from data.dataset import LOTES_POR_SNAPSHOT, NOME_SNAPSHOT, ler_particionado
+from data.ingestao import ingerir, ingerir_lote, ler_categorias
+
+
+@pytest.fixture
+def dataset(tmp_path, planilha):
+    planilha(exportacao_erp(linhas=120, inicio="2024-01-01", dias=90))
+    return ingerir(str(tmp_path))
+
+
+def snapshots(diretorio):
+    return sorted(glob.glob(os.path.join(diretorio, "ANO_MES=*", "NATUREZA=*", NOME_SNAPSHOT)))
+
+
+def lote_do_snapshot(caminho):
+    with pa.memory_map(caminho, "r") as arquivo:
+        return int(pa.ipc.open_file(arquivo).schema.metadata[b"lote"])
+
+
+def _ler_do_parquet(diretorio, **kwargs):
+    """Mesma leitura sem os snapshots (os arquivos voltam no fim)."""
+    caminhos = snapshots(diretorio)
+    for caminho in caminhos:
+        os.rename(caminho, caminho + ".bak")
+    try:
+        return ler_particionado(diretorio, **kwargs)
+    finally:
+        for caminho in caminhos:
+            os.rename(caminho + ".bak", caminho)
+
+
+def _ordenado(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("filtro", [
+    {},
+    {"data_ini": "2024-02-01", "data_fim": "2024-02-20", "colunas": ["EMISSAO", "CLIENTE", "VL.BRUTO"]},
+    {"naturezas": ["VENDA"], "colunas": ["CLIENTE", "NATUREZA", "QTDE"]},
+])
+def test_snapshot_igual_ao_parquet(dataset, filtro):
+    pastas = glob.glob(os.path.join(dataset, "ANO_MES=*", "NATUREZA=*"))
+    assert len(snapshots(dataset)) == len(pastas) > 1
+    categorias = ler_categorias(dataset)
+    do_snapshot = ler_particionado(dataset, categorias=categorias, **filtro)
+    do_parquet = _ler_do_parquet(dataset, categorias=categorias, **filtro)
+    assert len(do_snapshot) > 0
+    assert_frame_equal(_ordenado(do_snapshot), _ordenado(do_parquet))
+
+
+def test_snapshot_ausente_e_regravado(tmp_path, dataset):
+    removido = snapshots(dataset)[0]
+    os.remove(removido)
+    assert len(ler_particionado(dataset)) == 120
+    for caminho in snapshots(dataset):
+        os.remove(caminho)
+    assert len(ler_particionado(dataset)) == 120
+    ingerir(str(tmp_path))
+    assert os.path.exists(removido)
+    assert len(ler_particionado(dataset)) == 120
+
+
+def test_pyarrow_referencia_o_snapshot(dataset):
+    df = ler_particionado(dataset, colunas=["CLIENTE", "VL.BRUTO"], dtype_backend="pyarrow")
+    assert isinstance(df["VL.BRUTO"].dtype, pd.ArrowDtype)
+    assert isinstance(df["CLIENTE"].dtype, pd.CategoricalDtype)
+
+
+def test_snapshot_soma_os_lotes_pendentes(tmp_path, dataset):
+    ingerir_lote(str(tmp_path), exportacao_erp(linhas=15, inicio="2024-02-01", dias=10, semente=3))
+    ingerir_lote(str(tmp_path), exportacao_erp(linhas=5, inicio="2024-05-01", dias=10, semente=4))
+    categorias = ler_categorias(dataset)
+    do_snapshot = ler_particionado(dataset, categorias=categorias)
+    assert len(do_snapshot) == 140
+    assert_frame_equal(_ordenado(do_snapshot), _ordenado(_ler_do_parquet(dataset, categorias=categorias)))
+    filtrado = ler_particionado(dataset, data_ini="2024-05-01", colunas=["EMISSAO", "VL.BRUTO"])
+    assert len(filtrado) == 5
+
+
+def test_snapshot_da_particao_regravado_a_cada_lotes_por_snapshot(tmp_path, dataset):
+    pasta = os.path.join(dataset, "ANO_MES=2024-03", "NATUREZA=VENDA")
+    linhas = exportacao_erp(linhas=4, inicio="2024-03-05", dias=1, semente=8).assign(TP="VS")
+    for _ in range(LOTES_POR_SNAPSHOT - 1):
+        ingerir_lote(str(tmp_path), linhas)
+    assert lote_do_snapshot(os.path.join(pasta, NOME_SNAPSHOT)) == 0
+    ingerir_lote(str(tmp_path), linhas)
+    assert lote_do_snapshot(os.path.join(pasta, NOME_SNAPSHOT)) == LOTES_POR_SNAPSHOT
+    # Partições que o lote não tocou ficam como estavam
+    assert lote_do_snapshot(os.path.join(dataset, "ANO_MES=2024-01", "NATUREZA=VENDA", NOME_SNAPSHOT)) == 0
+    assert len(ler_particionado(dataset, data_ini="2024-03-05", data_fim="2024-03-05")) >= 4 * LOTES_POR_SNAPSHOT
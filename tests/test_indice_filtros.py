@@ -0,0 +1,98 @@
+# tests/test_indice_filtros.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.indice_filtros import COLUNAS_BUSCA, COLUNAS_FILTRO, IndiceFiltros, normalizar_busca
+
+
+def test_valores_iguais_ao_unique(notas):
+    indice = IndiceFiltros(notas)
+    for coluna in COLUNAS_FILTRO:
+        assert indice.valores(coluna) == sorted(notas[coluna].dropna().unique())
+    assert "SEM LINHAS" not in indice.valores("CLIENTE")
+    texto = IndiceFiltros(notas.astype({c: object for c in COLUNAS_FILTRO}))
+    assert texto.opcoes == indice.opcoes
+
+
+def test_hierarquia_supervisor_vendedores(notas):
+    indice = IndiceFiltros(notas)
+    # O supervisor nulo (vendedor V4) não entra na hierarquia
+    esperado = {
+        str(sup): sorted(grupo.dropna().astype(str).unique())
+        for sup, grupo in notas.groupby("SUPERVISOR", observed=True)["VENDEDOR"]
+    }
+    assert "V4" in indice.valores("VENDEDOR")
+    assert all("V4" not in vendedores for vendedores in esperado.values())
+    assert indice.supervisor_vendedores == esperado
+    assert "V1" in esperado["S1"] and "V1" in esperado["S2"]
+    assert indice.opcoes_para("VENDEDOR", {"SUPERVISOR": "S1"}) == esperado["S1"]
+
+
+def test_base_vazia():
+    vazia = pd.DataFrame({c: pd.Categorical([], categories=["A"]) for c in COLUNAS_FILTRO})
+    indice = IndiceFiltros(vazia)
+    assert indice.valores("CLIENTE") == [] and indice.supervisor_vendedores == {}
+
+
+def opcoes_esperadas(df: pd.DataFrame, coluna: str, selecao: dict) -> list:
+    """
+    Valores não vazios da coluna nas linhas que atendem à seleção das demais colunas.
+
+    Todas as opções de uma coluna selecionadas não a restringem (mantém as linhas com nulo).
+    """
+    mascara = np.ones(len(df), dtype=bool)
+    for outra, valor in selecao.items():
+        valor = valor if isinstance(valor, list) or valor is None else [valor]
+        if outra == coluna or valor is None or set(df[outra].dropna()) <= set(valor):
+            continue
+        mascara &= df[outra].isin(valor).to_numpy()
+    return sorted(v for v in df.loc[mascara, coluna].dropna().unique() if v)
+
+
+@pytest.mark.parametrize("selecao", [
+    {},
+    {"VENDEDOR": ["V1"]},
+    {"SUPERVISOR": "S1", "REDE": ["R1"]},
+    {"CLIENTE": ["C01", "C02"], "NATUREZA": "VENDA", "COD.PRD": None},
+    {"SUPERVISOR": ["S1", "S2", "S3"], "DESC": ["FILTRO"]},
+    {"CLIENTE": ["C99"]},
+])
+def test_opcoes_em_cascata_iguais_ao_filtro(notas, selecao):
+    indice = IndiceFiltros(notas)
+    for coluna in COLUNAS_FILTRO:
+        assert indice.opcoes_para(coluna, selecao) == opcoes_esperadas(notas, coluna, selecao)
+    assert indice.opcoes_para("SUPERVISOR", {"VENDEDOR": ["V1"]}) == ["S1", "S2"]
+
+
+def test_linhas_selecionadas(notas):
+    indice = IndiceFiltros(notas)
+    assert indice.linhas_selecionadas({}) is None
+    assert indice.linhas_selecionadas({"NATUREZA": ["BONIFICACAO", "DEVOLUCAO", "VENDA"]}) is None
+    linhas = indice.linhas_selecionadas({"VENDEDOR": ["V1", "V2"], "REDE": "R1"}, exceto="REDE")
+    assert np.all(np.diff(linhas) > 0)
+    assert linhas.tolist() == indice.linhas_com("VENDEDOR", ["V1", "V2"]).tolist()
+
+
+def busca_esperada(opcoes: list, termo: str, limite: int) -> list:
+    termo = normalizar_busca(termo)
+    prefixo = [v for v in opcoes if normalizar_busca(v).startswith(termo)]
+    contem = [v for v in opcoes if termo in normalizar_busca(v) and v not in prefixo]
+    return (prefixo + contem)[:limite]
+
+
+@pytest.mark.parametrize("termo", ["", "c0", "CAFE", "afé", "1kg", "p", "nada"])
+def test_buscar_igual_a_varredura(notas, termo):
+    notas = notas.assign(DESC=notas["DESC"].cat.rename_categories({"CAFE 1KG": "CAFÉ 1KG"}))
+    indice = IndiceFiltros(notas)
+    for coluna in COLUNAS_BUSCA:
+        for selecao in [{}, {"VENDEDOR": ["V2"], "NATUREZA": "VENDA"}]:
+            opcoes = indice.opcoes_para(coluna, selecao)
+            for limite in (2, 50):
+                assert indice.buscar(coluna, termo, selecao, limite) == busca_esperada(opcoes, termo, limite)
+
+
+def test_normalizar_busca():
+    assert normalizar_busca("  café São João ") == "CAFE SAO JOAO"
+    assert normalizar_busca(101) == "101"
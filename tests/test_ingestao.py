@@ -0,0 +1,166 @@
+# tests/test_ingestao.py
+
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import exportacao_erp
+from data import ingestao
+from data.cubo import DIMENSOES_CUBO
+from data.dataset import ler_particionado
+from data.ingestao import caminho_dataset, ingerir
+
+COLUNAS = ["EMISSAO", "ANO_MES", "NATUREZA", "CLIENTE", "COD.PRD", "QTDE", "VL.BRUTO"]
+
+
+def conteudo(df: pd.DataFrame) -> pd.DataFrame:
+    """Linhas comparáveis entre leituras, sem depender da ordem das partições."""
+    df = df[COLUNAS].astype({"NATUREZA": str, "CLIENTE": str, "COD.PRD": str})
+    return df.sort_values(COLUNAS).reset_index(drop=True)
+
+
+@pytest.fixture
+def regravados(monkeypatch):
+    """Meses regravados no dataset em cada ingestão (chamadas de gravar_particionado)."""
+    meses = []
+    original = ingestao.gravar_particionado
+    monkeypatch.setattr(
+        ingestao, "gravar_particionado", lambda df, diretorio: meses.extend(sorted(df["ANO_MES"].unique())) or original(df, diretorio)
+    )
+    return meses
+
+
+def test_regrava_so_os_meses_alterados(tmp_path, planilha, regravados):
+    bimestre = exportacao_erp(linhas=80, inicio="2024-01-01", dias=59)
+    marco = exportacao_erp(linhas=40, inicio="2024-03-01", dias=31, semente=2)
+    planilha(bimestre, "2024-01.xlsx")
+    planilha(marco, "2024-03.xlsx")
+    diretorio = ingerir(str(tmp_path))
+    assert diretorio == caminho_dataset(str(tmp_path))
+    assert regravados == ["2024-01", "2024-02", "2024-03"]
+    esperado = pd.concat([bimestre, marco], ignore_index=True)
+    lido = ler_particionado(diretorio)
+    assert len(lido) == len(esperado)
+    assert lido["VL.BRUTO"].sum() == pytest.approx(esperado["VL.BRUTO"].sum())
+
+    # Nada mudou: nenhum mês é regravado
+    regravados.clear()
+    ingerir(str(tmp_path))
+    assert regravados == []
+
+    # Só fevereiro mudou no arquivo do bimestre
+    fevereiro = bimestre["EMISSAO"] >= "2024-02-01"
+    bimestre.loc[fevereiro, "VL.BRUTO"] += 1
+    planilha(bimestre, "2024-01.xlsx")
+    antes = conteudo(ler_particionado(diretorio))
+    ingerir(str(tmp_path))
+    assert regravados == ["2024-02"]
+    depois = conteudo(ler_particionado(diretorio))
+    mudou = (depois["VL.BRUTO"] != antes["VL.BRUTO"])
+    assert (depois.loc[mudou, "ANO_MES"] == "2024-02").all()
+    assert depois["VL.BRUTO"].sum() == pytest.approx(antes["VL.BRUTO"].sum() + fevereiro.sum())
+
+
+def test_mes_em_dois_arquivos_fica_com_o_ultimo(tmp_path, planilha, regravados):
+    janeiro = exportacao_erp(linhas=30, inicio="2024-01-01", dias=31)
+    reexportado = exportacao_erp(linhas=20, inicio="2024-01-01", dias=31, semente=5)
+    planilha(janeiro, "a.xlsx")
+    planilha(reexportado, "b.xlsx")
+    diretorio = ingerir(str(tmp_path))
+    assert len(ler_particionado(diretorio)) == 20
+
+    # Sem o arquivo posterior, o mês volta ao anterior; o que sai leva seus meses
+    os.remove(tmp_path / "b.xlsx")
+    ingerir(str(tmp_path))
+    assert len(ler_particionado(diretorio)) == 30
+    os.remove(tmp_path / "a.xlsx")
+    planilha(exportacao_erp(linhas=10, inicio="2024-05-01", dias=30), "c.xlsx")
+    ingerir(str(tmp_path))
+    lido = ler_particionado(diretorio)
+    assert sorted(lido["ANO_MES"].unique()) == ["2024-05"]
+    assert [n for n in os.listdir(diretorio) if n.startswith("ANO_MES=")] == ["ANO_MES=2024-05"]
+
+
+def _ordenar(df: pd.DataFrame, chaves) -> pd.DataFrame:
+    return df.astype({c: str for c in chaves}).sort_values(chaves).reset_index(drop=True)
+
+
+def test_lote_soma_aos_agregados_o_mesmo_que_recalcular(tmp_path, planilha):
+    planilha(exportacao_erp(linhas=80, inicio="2024-01-01", dias=59))
+    diretorio = ingerir(str(tmp_path))
+    versao = ingestao.versao_publicada(str(tmp_path))
+
+    lote = exportacao_erp(linhas=25, inicio="2024-02-15", dias=45, semente=7)
+    lote.loc[:4, "CLIENTE"] = "PADARIA NOVA"
+    lote.loc[5, "VL.BRUTO"] = None
+    resumo = ingestao.ingerir_lote(str(tmp_path), lote)
+    assert resumo["lote"] == 1 and resumo["linhas"] == 24 and resumo["rejeitadas"] == 1
+    assert resumo["meses"] == sorted(lote["EMISSAO"].dt.strftime("%Y-%m").unique())
+    assert resumo["versao"] == f"{versao}{ingestao.SEPARADOR_LOTES}1"
+    assert ingestao.origem_da_versao(resumo["versao"]) == versao
+    assert len(ler_particionado(diretorio)) == 80 + 24
+
+    ticket = ingestao.ler_ticket_medio(diretorio)
+    mensal = ingestao.ler_mensal(diretorio)
+    cubo = ingestao.ler_cubo(diretorio)
+    categorias = ingestao.ler_categorias(diretorio)
+    assert "PADARIA NOVA" in categorias["CLIENTE"]
+
+    ingestao._atualizar_ticket_medio(diretorio)
+    ingestao._atualizar_mensal(diretorio)
+    ingestao._atualizar_cubo(diretorio)
+    ingestao._atualizar_categorias(diretorio)
+    pd.testing.assert_frame_equal(
+        _ordenar(ticket, ["CLIENTE"]), _ordenar(ingestao.ler_ticket_medio(diretorio), ["CLIENTE"]),
+        check_dtype=False,
+    )
+    chaves = ["ANO_MES", "NATUREZA", "CLIENTE"]
+    pd.testing.assert_frame_equal(
+        _ordenar(mensal, chaves), _ordenar(ingestao.ler_mensal(diretorio), chaves), check_dtype=False,
+    )
+    dimensoes = [c for c in DIMENSOES_CUBO if c in cubo.columns]
+    pd.testing.assert_frame_equal(
+        _ordenar(cubo, dimensoes), _ordenar(ingestao.ler_cubo(diretorio), dimensoes), check_dtype=False,
+    )
+    assert {c: set(v) for c, v in categorias.items()} == {c: set(v) for c, v in ingestao.ler_categorias(diretorio).items()}
+
+
+def test_exportacao_posterior_substitui_as_linhas_do_lote(tmp_path, planilha):
+    planilha(exportacao_erp(linhas=40, inicio="2024-01-01", dias=31))
+    diretorio = ingerir(str(tmp_path))
+    ingestao.ingerir_lote(str(tmp_path), exportacao_erp(linhas=10, inicio="2024-01-10", dias=5, semente=3))
+    assert len(ler_particionado(diretorio)) == 50
+
+    planilha(exportacao_erp(linhas=45, inicio="2024-01-01", dias=31, semente=4))
+    ingerir(str(tmp_path))
+    assert len(ler_particionado(diretorio)) == 45
+
+
+def test_lote_acrescenta_categorias_no_fim(tmp_path, planilha):
+    planilha(exportacao_erp(linhas=40, inicio="2024-01-01", dias=31))
+    diretorio = ingerir(str(tmp_path))
+    antes = ingestao.ler_categorias(diretorio)
+
+    lote = exportacao_erp(linhas=6, inicio="2024-01-20", dias=5, semente=3)
+    lote.loc[:2, "CLIENTE"] = ["ACOUGUE NOVO", "ZEBU", "ACOUGUE NOVO"]
+    ingestao.ingerir_lote(str(tmp_path), lote)
+    depois = ingestao.ler_categorias(diretorio)
+    assert depois["CLIENTE"] == antes["CLIENTE"] + ["ACOUGUE NOVO", "ZEBU"]
+    assert depois["VENDEDOR"] == antes["VENDEDOR"]
+
+    lido = ler_particionado(diretorio, categorias=depois)
+    assert list(lido["CLIENTE"].cat.categories[:len(antes["CLIENTE"])]) == antes["CLIENTE"]
+
+
+def test_linha_nova_num_mes_nao_regrava_os_outros(tmp_path, planilha, regravados):
+    bimestre = exportacao_erp(linhas=80, inicio="2024-01-01", dias=59)
+    planilha(bimestre)
+    ingerir(str(tmp_path))
+    regravados.clear()
+
+    # Uma nota a mais no começo de janeiro desloca as linhas de fevereiro na planilha
+    nova = bimestre.iloc[[0]].assign(**{"VL.BRUTO": 1.0})
+    planilha(pd.concat([nova, bimestre], ignore_index=True))
+    ingerir(str(tmp_path))
+    assert regravados == ["2024-01"]
@@ -0,0 +1,188 @@
+# tests/test_loader.py
+
+import uuid
+
+import pandas as pd
+import pytest
+
+from conftest import exportacao_erp
+from data import loader
+from data.cache import CacheLRU
+from data.ingestao import ingerir, ingerir_lote, versao_publicada
+from data.processor import Agrupador
+from data.schema import COLUNA_LINHA
+
+
+@pytest.fixture
+def filtrados(monkeypatch):
+    """Cache de filtrar_base vazio, só deste teste."""
+    cache = CacheLRU("filtrados", 64 * 1024 ** 2)
+    monkeypatch.setattr(loader, "cache_filtrados", cache)
+    return cache
+
+
+@pytest.fixture
+def lida(notas):
+    """As notas como uma leitura do loader (versão própria)."""
+    notas.attrs["ordenado_por"] = "EMISSAO"
+    notas.attrs["origem_linhas"] = (uuid.uuid4().hex, len(notas), "EMISSAO", None, None, None, None)
+    return notas
+
+
+def esperado(df, filtros=None, periodo=None, recorte=None):
+    if periodo is not None:
+        df = df[df["EMISSAO"].between(*pd.to_datetime(list(periodo)))]
+    for selecao in (recorte, filtros):
+        if selecao:
+            df = Agrupador(df).filtrar(selecao)
+    return df
+
+
+def contadores(cache):
+    estatisticas = cache.estatisticas()
+    return estatisticas["misses"], estatisticas["hits"]
+
+
+def test_mesma_selecao_em_qualquer_ordem_e_colunas_reaproveita(lida, filtrados):
+    periodo = ("2024-01-10", "2024-02-20")
+    filtros = {"VENDEDOR": ["V1", "V3"], "REDE": None}
+    primeiro = loader.filtrar_base(lida, filtros, periodo, recorte={"NATUREZA": "VENDA"})
+    pd.testing.assert_frame_equal(primeiro, esperado(lida, filtros, periodo, {"NATUREZA": "VENDA"}))
+
+    # Mesmos valores em outra ordem, sem a chave nula, e outra projeção das mesmas linhas
+    colunas = lida[["EMISSAO", "NATUREZA", "VENDEDOR", "VL.BRUTO"]]
+    assert colunas.attrs["origem_linhas"] == lida.attrs["origem_linhas"]
+    segundo = loader.filtrar_base(colunas, {"VENDEDOR": ["V3", "V1"]}, periodo, recorte={"NATUREZA": "VENDA"})
+    assert contadores(filtrados) == (1, 1)
+    pd.testing.assert_frame_equal(segundo, primeiro[colunas.columns])
+
+
+def test_chave_separa_periodo_recorte_variante_e_leitura(lida, filtrados):
+    loader.filtrar_base(lida, {"VENDEDOR": ["V1"]})
+    loader.filtrar_base(lida, {"VENDEDOR": ["V1"]}, periodo=("2024-01-01", "2024-01-31"))
+    loader.filtrar_base(lida, {"VENDEDOR": ["V1"]}, recorte={"NATUREZA": "VENDA"})
+    loader.filtrar_base(lida, {"VENDEDOR": ["V1"]}, variante="CLIENTE_NORM")
+    outra = lida.copy()
+    outra.attrs["origem_linhas"] = (uuid.uuid4().hex,) + lida.attrs["origem_linhas"][1:]
+    loader.filtrar_base(outra, {"VENDEDOR": ["V1"]})
+    assert contadores(filtrados) == (5, 0)
+
+
+def test_so_periodo_devolve_recorte_continuo(lida, filtrados):
+    periodo = ("2024-02-01", "2024-02-29")
+    for _ in range(2):
+        obtido = loader.filtrar_base(lida, periodo=periodo)
+        pd.testing.assert_frame_equal(obtido, esperado(lida, periodo=periodo))
+    assert contadores(filtrados) == (1, 1)
+    tudo = loader.filtrar_base(lida)
+    assert len(tudo) == len(lida) and tudo is not lida
+
+
+def test_recortes_fora_da_leitura_nao_usam_o_cache(lida, filtrados):
+    vendas = lida[lida["NATUREZA"] == "VENDA"]
+    obtido = loader.filtrar_base(vendas, {"VENDEDOR": ["V2"]})
+    pd.testing.assert_frame_equal(obtido, esperado(vendas, {"VENDEDOR": ["V2"]}))
+    sem_marca = lida.copy()
+    sem_marca.attrs.clear()
+    loader.filtrar_base(sem_marca, {"VENDEDOR": ["V2"]})
+    assert contadores(filtrados) == (0, 0)
+
+
+@pytest.fixture
+def base(tmp_path, planilha, monkeypatch):
+    """Dataset ingerido de uma exportação, lido pelo loader (backend Parquet)."""
+    exportacao = exportacao_erp(linhas=120, inicio="2024-01-01", dias=20)
+    caminho = planilha(exportacao)
+    ingerir(caminho)
+    monkeypatch.setattr(loader, "CAMINHO_EXCEL", caminho)
+    monkeypatch.setattr(loader, "BACKEND_DADOS", "parquet")
+    return caminho, exportacao
+
+
+def test_notas_do_mesmo_dia_na_ordem_da_planilha(base):
+    caminho, exportacao = base
+    lido = loader._ler_base("v1", colunas=["EMISSAO", "VL.BRUTO"])
+    assert list(lido.columns) == ["EMISSAO", "VL.BRUTO"]
+    assert lido["VL.BRUTO"].tolist() == exportacao["VL.BRUTO"].tolist()
+
+    # Linhas de lotes entram depois das da exportação no mesmo dia, na ordem do lote
+    lote = exportacao_erp(linhas=6, inicio="2024-01-05", dias=1, semente=9)
+    versao = ingerir_lote(caminho, lote)["versao"]
+    lido = loader._ler_base(versao, colunas=["EMISSAO", "VL.BRUTO", COLUNA_LINHA])
+    dia = lido[lido["EMISSAO"] == "2024-01-05"]
+    do_dia = exportacao.loc[exportacao["EMISSAO"] == "2024-01-05", "VL.BRUTO"].tolist()
+    assert dia["VL.BRUTO"].tolist() == do_dia + lote["VL.BRUTO"].tolist()
+    assert dia[COLUNA_LINHA].is_monotonic_increasing
+
+
+@pytest.fixture
+def versoes(base, filtrados, monkeypatch):
+    """Cache de dados vazio e a versão servida pelo loader, trocada pelo teste."""
+    monkeypatch.setattr(loader, "cache_dados", CacheLRU("dados", 256 * 1024 ** 2))
+    servida = [versao_publicada(base[0])]
+    monkeypatch.setattr(loader.atualizador, "versao_disponivel", lambda: servida[0])
+    return servida
+
+
+CONSULTAS = [
+    {},
+    {"colunas": ["EMISSAO", "CLIENTE", "VL.BRUTO"]},
+    {"data_ini": "2024-01-06", "data_fim": "2024-01-12", "naturezas": ["VENDA"], "colunas": ["EMISSAO", "TICKET_MEDIO"]},
+    {"filtros": {"VENDEDOR": ["DIANA"]}, "colunas": ["EMISSAO", "VENDEDOR", "QTDE"]},
+]
+
+
+def publicar_lote(caminho, versoes, lote):
+    anterior = versoes[0]
+    versoes[0] = ingerir_lote(caminho, lote)["versao"]
+    loader._ao_publicar(anterior, versoes[0])
+
+
+def test_lote_soma_as_linhas_novas_as_bases_em_cache(base, versoes):
+    caminho, _ = base
+    for consulta in CONSULTAS:
+        loader.carregar_dados(**consulta)
+    periodo = ("2024-01-08", "2024-01-15")
+    tudo = loader.carregar_dados()
+    loader.filtrar_base(tudo, {"CLIENTE": ["PADARIA D", "ACOUGUE NOVO"]}, periodo, recorte={"NATUREZA": "VENDA"})
+    loader.filtrar_base(tudo, {"CLIENTE": ["PADARIA D"]}, variante="CLIENTE_NORM")
+    loader.agregar_dados(["VENDEDOR"], {"QTDE": "sum"}, data_ini="2024-01-02")
+
+    lote = exportacao_erp(linhas=30, inicio="2024-01-04", dias=12, semente=5)
+    no_periodo = lote["EMISSAO"].between(*periodo)
+    lote.loc[no_periodo, ["CLIENTE", "TP", "DESC"]] = ["ACOUGUE NOVO", "VS", "CAFE 500G"]
+    publicar_lote(caminho, versoes, lote)
+    publicar_lote(caminho, versoes, exportacao_erp(linhas=8, inicio="2024-01-10", dias=2, semente=6))
+
+    dados = loader.cache_dados.estatisticas()
+    assert dados["entradas"] == len(CONSULTAS)
+    assert contadores(loader.cache_filtrados) == (2, 0) and loader.cache_filtrados.estatisticas()["entradas"] == 1
+    for consulta in CONSULTAS:
+        migrada = loader.carregar_dados(**consulta)
+        lida = loader._ler_base(versoes[0], **consulta)
+        pd.testing.assert_frame_equal(migrada, lida)
+        assert migrada.attrs == lida.attrs
+    assert loader.cache_dados.estatisticas()["misses"] == dados["misses"]
+
+    tudo = loader.carregar_dados()
+    filtrado = loader.filtrar_base(tudo, {"CLIENTE": ["PADARIA D", "ACOUGUE NOVO"]}, periodo, recorte={"NATUREZA": "VENDA"})
+    assert contadores(loader.cache_filtrados) == (2, 1)
+    esperadas = esperado(tudo, {"CLIENTE": ["PADARIA D", "ACOUGUE NOVO"]}, periodo, {"NATUREZA": "VENDA"})
+    pd.testing.assert_frame_equal(filtrado, esperadas)
+    assert (filtrado["CLIENTE"] == "ACOUGUE NOVO").any()
+
+
+def test_exportacao_nova_descarta_o_cache(base, versoes, planilha):
+    caminho, _ = base
+    loader.carregar_dados(colunas=["EMISSAO", "VL.BRUTO"])
+    planilha(exportacao_erp(linhas=60, inicio="2024-01-01", dias=20, semente=3))
+    ingerir(caminho)
+    loader._ao_publicar(versoes[0], versao_publicada(caminho))
+    assert loader.cache_dados.estatisticas()["entradas"] == 0
+
+
+def test_leitura_nao_inclui_lotes_posteriores_a_versao(base):
+    caminho, exportacao = base
+    v1 = ingerir_lote(caminho, exportacao_erp(linhas=5, inicio="2024-01-03", dias=3, semente=2))["versao"]
+    ingerir_lote(caminho, exportacao_erp(linhas=7, inicio="2024-01-03", dias=3, semente=4))
+    assert len(loader._ler_base(v1, colunas=["EMISSAO"])) == len(exportacao) + 5
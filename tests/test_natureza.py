@@ -0,0 +1,32 @@
+# tests/test_natureza.py
+
+import numpy as np
+import pandas as pd
+
+from data.loader import classificar_natureza
+from data.natureza import carregar_regras, categorias_natureza, classificar_natureza_vetorizado
+
+
+def test_vetorizado_igual_a_referencia_linha_a_linha():
+    rng = np.random.default_rng(3)
+    tps = ["VS", "VJ", "V3", "VC", "FS", "FJ", "F3", "FC", "DS", "DJ", "D3", "DC", "XX", None]
+    descricoes = ["CAFE 500G", "VERBA ACAO", "verba loja", " VERBA", "FILTRO", None]
+    df = pd.DataFrame({
+        "TP": rng.choice(np.array(tps, dtype=object), 500),
+        "DESC": rng.choice(np.array(descricoes, dtype=object), 500),
+    }, index=np.arange(1000, 1500))
+
+    obtido = classificar_natureza_vetorizado(df["TP"], df["DESC"])
+    esperado = df.apply(lambda row: classificar_natureza(row["TP"], row["DESC"]), axis=1)
+    assert obtido.index.equals(df.index)
+    assert (obtido.astype(str) == esperado).all()
+    assert list(obtido.cat.categories) == categorias_natureza(carregar_regras())
+
+
+def test_regras_novas_sem_mudar_o_codigo():
+    regras = {"prefixos_desc": {"BRINDE": "BONIFICACAO"}, "tp": {"VENDA": ["VS"], "TROCA": ["TR"]}, "padrao": "OUTROS"}
+    tp = pd.Series(["VS", "TR", "VS", "ZZ"])
+    desc = pd.Series(["CAFE", "CAFE", "BRINDE LOJA", None])
+    obtido = classificar_natureza_vetorizado(tp, desc, regras)
+    assert obtido.tolist() == ["VENDA", "TROCA", "BONIFICACAO", "OUTROS"]
+    assert list(obtido.cat.categories) == ["BONIFICACAO", "VENDA", "TROCA", "OUTROS"]
@@ -0,0 +1,63 @@
+# tests/test_processor.py
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.processor import fatiar_periodo, ordenado_por
+
+
+def por_mascara(df: pd.DataFrame, ini, fim) -> pd.DataFrame:
+    return df[df["EMISSAO"].between(pd.to_datetime(ini), pd.to_datetime(fim))]
+
+
+@pytest.fixture
+def lida(notas):
+    """As notas como o loader as entrega: ordenadas e marcadas."""
+    notas.attrs["ordenado_por"] = "EMISSAO"
+    return notas
+
+
+@pytest.mark.parametrize("ini, fim", [
+    ("2024-01-01", "2024-03-31"),
+    ("2024-02-10", "2024-02-20"),
+    (datetime.date(2024, 1, 15), datetime.date(2024, 1, 15)),
+    ("2023-01-01", "2023-12-31"),
+    ("2024-03-01", "2024-01-01"),
+])
+def test_fatiar_igual_a_mascara(lida, ini, fim):
+    obtido = fatiar_periodo(lida, ini, fim)
+    pd.testing.assert_frame_equal(obtido, por_mascara(lida, ini, fim))
+
+    embaralhada = lida.sample(frac=1, random_state=3)
+    assert not ordenado_por(embaralhada, "EMISSAO")
+    pd.testing.assert_frame_equal(fatiar_periodo(embaralhada, ini, fim), por_mascara(embaralhada, ini, fim))
+
+
+def test_marca_so_vale_com_o_indice_da_leitura(lida):
+    assert ordenado_por(lida, "EMISSAO")
+    recorte = lida[lida["NATUREZA"] == "VENDA"]
+    assert recorte.attrs.get("ordenado_por") == "EMISSAO"
+    # Recorte por máscara continua ordenado: a coluna é verificada
+    assert ordenado_por(recorte, "EMISSAO")
+    invertida = lida.iloc[::-1]
+    assert not ordenado_por(invertida, "EMISSAO")
+    pd.testing.assert_frame_equal(
+        fatiar_periodo(invertida, "2024-02-01", "2024-02-29"), por_mascara(invertida, "2024-02-01", "2024-02-29")
+    )
+
+
+def test_datas_nulas_usam_a_comparacao(lida):
+    lida.loc[5, "EMISSAO"] = pd.NaT
+    lida.attrs.pop("ordenado_por")
+    obtido = fatiar_periodo(lida, "2024-01-01", "2024-03-31")
+    assert len(obtido) == len(lida) - 1
+    assert not obtido["EMISSAO"].isna().any()
+
+
+def test_recorte_nao_altera_a_base(lida):
+    recorte = fatiar_periodo(lida, "2024-02-01", "2024-02-29")
+    recorte["NOVA"] = np.arange(len(recorte))
+    assert "NOVA" not in lida.columns
@@ -0,0 +1,32 @@
+# tests/test_rollup.py
+
+import pytest
+
+from data.cubo import CuboMensal
+from data.rollup import Rollup
+from test_cubo import agrupar, comparar
+
+
+@pytest.mark.parametrize("origem", ["notas", "cubo"])
+def test_rollup_igual_ao_groupby(notas, origem):
+    medidas = ["VL.BRUTO", "QTDE"]
+    base = notas if origem == "notas" else CuboMensal(notas).selecionar()
+    rollup = Rollup(base, medidas)
+
+    somas = {"VL.BRUTO": "sum", "QTDE": "sum", "CONTRATO": "size"}
+    comparar(rollup.nivel(None, somas), agrupar(notas, [], somas), [])
+    for por in [["SUPERVISOR"], ["SUPERVISOR", "VENDEDOR"], ["SUPERVISOR", "VENDEDOR", "CLIENTE"]]:
+        obtido = rollup.nivel(por[-1], somas)
+        comparar(obtido, agrupar(notas, por, somas), por)
+
+    # Fora do prefixo da hierarquia: V1 soma as notas dos dois supervisores
+    comparar(rollup.agregar(["VENDEDOR"], somas), agrupar(notas, ["VENDEDOR"], somas), ["VENDEDOR"])
+    v1 = rollup.agregar(["VENDEDOR"], {"VL.BRUTO": "sum"}).set_index("VENDEDOR")["VL.BRUTO"]
+    por_supervisor = rollup.nivel("VENDEDOR", {"VL.BRUTO": "sum"})
+    assert v1["V1"] == pytest.approx(por_supervisor.loc[por_supervisor["VENDEDOR"] == "V1", "VL.BRUTO"].sum())
+    assert (por_supervisor["VENDEDOR"] == "V1").sum() == 2
+
+    distintos = {"VENDEDOR": "nunique", "VL.BRUTO": "sum"}
+    comparar(rollup.nivel("SUPERVISOR", distintos), agrupar(notas, ["SUPERVISOR"], distintos), ["SUPERVISOR"])
+    distintos = {"CLIENTE": "nunique"}
+    comparar(rollup.agregar(["VENDEDOR"], distintos), agrupar(notas, ["VENDEDOR"], distintos), ["VENDEDOR"])
@@ -0,0 +1,62 @@
+# tests/test_schema.py
+
+import numpy as np
+import pandas as pd
+
+from data.schema import aplicar_schema, combinar_relatorios, schema_arrow
+
+
+def bruta() -> pd.DataFrame:
+    """Células como vêm do Excel: números em colunas de texto, texto em colunas numéricas."""
+    return pd.DataFrame({
+        "EMISSAO": [pd.Timestamp("2024-01-02"), "2024-01-03", "ontem", pd.Timestamp("2024-01-05")],
+        "CLIENTE": ["MERCADO A", 123.0, "MERCADO C", None],
+        "COD.PRD": [101.0, 102.0, np.nan, 104.0],
+        "QTDE": [1, "2", 3, 4],
+        "VL.BRUTO": [10.5, "dez", 30.0, 40.0],
+        "OBS": [1.5, 2.0, None, 3.0],
+    })
+
+
+def test_tipos_declarados_e_linhas_rejeitadas():
+    df, relatorio = aplicar_schema(bruta())
+
+    # Só a primeira linha tem todos os obrigatórios válidos
+    assert relatorio["linhas_entrada"] == 4
+    assert relatorio["linhas_rejeitadas"] == 3
+    assert df.to_dict("records") == [{
+        "EMISSAO": pd.Timestamp("2024-01-02"), "CLIENTE": "MERCADO A", "COD.PRD": "101",
+        "QTDE": 1.0, "VL.BRUTO": 10.5, "OBS": 1.5,
+    }]
+    assert df["EMISSAO"].dtype == "datetime64[ns]"
+    assert df["QTDE"].dtype == "float64"
+    assert df["CLIENTE"].dtype == object
+
+    colunas = relatorio["colunas"]
+    assert (colunas["EMISSAO"]["coagidos"], colunas["EMISSAO"]["exemplos"]) == (1, ["ontem"])
+    assert (colunas["VL.BRUTO"]["coagidos"], colunas["VL.BRUTO"]["exemplos"]) == (1, ["dez"])
+    assert colunas["CLIENTE"]["tipo"] == "string" and colunas["CLIENTE"]["coagidos"] == 0
+    # Códigos numéricos inteiros viram texto sem ".0"
+    assert aplicar_schema(bruta().fillna({"COD.PRD": 0}))[0]["COD.PRD"].tolist() == ["101"]
+    assert colunas["OBS"]["tipo"] == "float64"
+    assert relatorio["colunas_ausentes"] == []
+
+
+def test_tipos_fixos_para_colunas_nao_declaradas():
+    df, relatorio = aplicar_schema(bruta(), tipos={"OBS": "string"})
+    assert relatorio["colunas"]["OBS"]["tipo"] == "string"
+    assert df["OBS"].tolist() == ["1.5"]
+    assert schema_arrow(relatorio).field("OBS").type == "string"
+
+
+def test_colunas_obrigatorias_ausentes():
+    _, relatorio = aplicar_schema(bruta().drop(columns=["VL.BRUTO", "QTDE"]))
+    assert relatorio["colunas_ausentes"] == ["QTDE", "VL.BRUTO"]
+
+
+def test_relatorio_em_lotes_igual_ao_inteiro():
+    inteiro = aplicar_schema(bruta())[1]
+    combinado = {}
+    for inicio in range(0, 4, 2):
+        combinado = combinar_relatorios(combinado, aplicar_schema(bruta().iloc[inicio:inicio + 2])[1])
+    assert combinado == inteiro
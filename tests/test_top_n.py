@@ -0,0 +1,41 @@
+# tests/test_top_n.py
+
+import pandas as pd
+import pytest
+
+from data.cubo import CuboMensal
+from data.top_n import top_n
+from test_cubo import comparar
+
+
+def nlargest(df: pd.DataFrame, dimensao: str, medida: str, k: int) -> pd.Series:
+    return df.groupby(dimensao, observed=True)[medida].sum().nlargest(k)[::-1]
+
+
+@pytest.mark.parametrize("dimensao", ["CLIENTE", "VENDEDOR", "COD.PRD", "ANO_MES"])
+def test_top_n_igual_ao_nlargest(notas, dimensao):
+    resultado = top_n(notas, [(dimensao, "VL.BRUTO"), (dimensao, "QTDE")], k=4)
+
+    comparar(resultado[(dimensao, "VL.BRUTO")], nlargest(notas, dimensao, "VL.BRUTO", 4).reset_index(), [])
+    # Com empates nas somas inteiras, só os totais são garantidos
+    assert resultado[(dimensao, "QTDE")]["QTDE"].tolist() == nlargest(notas, dimensao, "QTDE", 4).tolist()
+    assert resultado[(dimensao, "QTDE")]["QTDE"].dtype == "int64"
+
+
+def test_menos_grupos_que_k(notas):
+    resultado = top_n(notas, [("SUPERVISOR", "VL.BRUTO")], k=50)[("SUPERVISOR", "VL.BRUTO")]
+    comparar(resultado, nlargest(notas, "SUPERVISOR", "VL.BRUTO", 50).reset_index(), [])
+    assert "SEM LINHAS" not in resultado["SUPERVISOR"].tolist()
+
+
+def test_empates_ficam_com_os_primeiros_grupos():
+    df = pd.DataFrame({"CLIENTE": list("ABCDE"), "VL.BRUTO": [5.0, 7.0, 5.0, 5.0, 1.0]})
+    obtido = top_n(df, [("CLIENTE", "VL.BRUTO")], k=3)[("CLIENTE", "VL.BRUTO")]
+    pd.testing.assert_frame_equal(obtido, nlargest(df, "CLIENTE", "VL.BRUTO", 3).reset_index())
+
+
+def test_top_n_sobre_fatos_do_cubo(notas):
+    fatos = CuboMensal(notas).selecionar([{"NATUREZA": "VENDA"}], ("2024-01", "2024-02"))
+    linhas = notas[(notas["NATUREZA"] == "VENDA") & (notas["ANO_MES"] <= "2024-02")]
+    esperado = nlargest(linhas, "CLIENTE", "VL.BRUTO", 5).reset_index()
+    comparar(top_n(fatos, [("CLIENTE", "VL.BRUTO")], k=5)[("CLIENTE", "VL.BRUTO")], esperado, [])